@@ -0,0 +1,55 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+from tests.mock_server import MockTorchServe
+
+# Sizes of the "at scale" fixtures
+FLEET_MODELS = 2000
+FLEET_WORKFLOWS = 200
+STORE_ARCHIVES = 1000
+
+
+def write_mar(path: str, model_name: str, version: str = "1.0", payload: bytes = b"") -> str:
+    """Write a minimal ``.mar``: a manifest plus an optional fake weights file."""
+    manifest = {
+        "createdOn": "01/01/2022 00:00:00",
+        "runtime": "python",
+        "model": {
+            "modelName": model_name,
+            "serializedFile": "model.pt",
+            "handler": "image_classifier",
+            "modelVersion": version,
+        },
+        "archiverVersion": "0.5.0",
+    }
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("MAR-INF/MANIFEST.json", json.dumps(manifest))
+        zf.writestr("model.pt", payload)
+    return path
+
+
+@pytest.fixture
+def mock_ts():
+    """Small mock server whose state each test may change."""
+    with MockTorchServe(models=3, versions=2, workflows=2) as ts:
+        yield ts
+
+
+@pytest.fixture(scope="session")
+def fleet_ts():
+    """Large, read-only mock server shared by the benchmarks."""
+    with MockTorchServe(models=FLEET_MODELS, workflows=FLEET_WORKFLOWS) as ts:
+        for i in range(FLEET_MODELS):
+            ts._record(f"model-{i}", "1.0", 2500.0)
+        yield ts
+
+
+@pytest.fixture(scope="session")
+def model_store(tmp_path_factory):
+    store = tmp_path_factory.mktemp("model_store")
+    for i in range(STORE_ARCHIVES):
+        write_mar(os.path.join(store, f"model-{i}.mar"), f"model-{i}", payload=os.urandom(4096))
+    return str(store)
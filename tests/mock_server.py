@@ -0,0 +1,474 @@
+"""In-process stand-in for a TorchServe server.
+
+Serves the management, inference and metrics APIs on three local ports with
+enough fidelity for the dashboard clients: paginated listings, model
+versions and defaults, asynchronous worker scaling, workflows, predictions
+and Prometheus counters that move with the predictions served. Latency and
+failures can be injected per request to exercise the error paths. With
+``grpc=True`` the gRPC management and inference services are served too,
+from the same state.
+
+Run it standalone to point a dashboard at it::
+
+    python -m tests.mock_server --models 5000 --latency 0.01
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+_NOT_FOUND = "Requested resource is not found, please refer to API document."
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Benchmarks open hundreds of connections at once
+    request_queue_size = 1024
+
+
+class MockModel(NamedTuple):
+    name: str
+    version: str
+    url: str
+    min_workers: int = 1
+    max_workers: int = 1
+    batch_size: int = 1
+    max_batch_delay: int = 100
+
+    def describe(self, is_default: bool) -> Dict[str, Any]:
+        return {
+            "modelName": self.name,
+            "modelVersion": self.version,
+            "modelUrl": self.url,
+            "runtime": "python",
+            "minWorkers": self.min_workers,
+            "maxWorkers": self.max_workers,
+            "batchSize": self.batch_size,
+            "maxBatchDelay": self.max_batch_delay,
+            "loadedAtStartup": False,
+            "isDefault": is_default,
+            "workers": [{
+                "id": str(9000 + i),
+                "startTime": "2022-01-01T00:00:00.000Z",
+                "status": "READY",
+                "memoryUsage": 0,
+                "pid": 10000 + i,
+                "gpu": False,
+                "gpuUsage": "N/A",
+            } for i in range(self.min_workers)],
+        }
+
+
+class MockTorchServe:
+    """Fake TorchServe with ``models`` models of ``versions`` versions each and ``workflows`` workflows.
+
+    ``latency`` (seconds) is added to every request and ``failure_rate`` is
+    the fraction of requests answered with a 500; both can be changed while
+    the server runs.
+    """
+
+    def __init__(self,
+                 models: int = 10,
+                 versions: int = 1,
+                 workflows: int = 0,
+                 workers: int = 1,
+                 latency: float = 0.0,
+                 failure_rate: float = 0.0,
+                 host: str = "127.0.0.1",
+                 seed: Optional[int] = None,
+                 grpc: bool = False) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.host = host
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # name -> version -> model, plus the default version of each name
+        self.models: Dict[str, Dict[str, MockModel]] = {}
+        self.defaults: Dict[str, str] = {}
+        for i in range(models):
+            for v in range(versions):
+                self._add(MockModel(f"model-{i}", f"{v + 1}.0", f"model-{i}.mar", workers, workers))
+        self.workflows: Dict[str, str] = {f"workflow-{i}": f"workflow-{i}.war" for i in range(workflows)}
+        # (model, version) -> [requests, inference us, queue us]
+        self.counters: Dict[Tuple[str, str], List[float]] = {}
+        self._servers: List[_Server] = []
+        self.grpc = grpc
+        self._grpc_server: Optional[Any] = None
+        self._grpc_ports: Dict[str, int] = {}
+
+    # State
+
+    def _add(self, model: MockModel) -> None:
+        self.models.setdefault(model.name, {})[model.version] = model
+        self.defaults.setdefault(model.name, model.version)
+
+    def _lookup(self, name: str, version: Optional[str]) -> Optional[MockModel]:
+        versions = self.models.get(name)
+        if not versions:
+            return None
+        return versions.get(version or self.defaults[name])
+
+    def _record(self, name: str, version: str, latency_us: float) -> None:
+        counter = self.counters.setdefault((name, version), [0.0, 0.0, 0.0])
+        counter[0] += 1
+        counter[1] += latency_us
+        counter[2] += latency_us / 10
+
+    def metrics_text(self) -> str:
+        """Current counters in the Prometheus text format of the TorchServe metrics API."""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+        for metric, i, help_text in (("ts_inference_requests_total", 0, "Total number of inference requests."),
+                                     ("ts_inference_latency_microseconds", 1,
+                                      "Cumulative inference duration in microseconds"),
+                                     ("ts_queue_latency_microseconds", 2, "Cumulative queue duration in microseconds")):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (name, version), values in counters:
+                lines.append(f'{metric}{{uuid="d1b7a3c4-0000-4000-8000-000000000000",model_name="{name}",'
+                             f'model_version="{version}",}} {values[i]:.1f}')
+        return "\n".join(lines) + "\n"
+
+    # Management API
+
+    @staticmethod
+    def _error(code: int, type_: str, message: str) -> Tuple[int, Any]:
+        return code, {"code": code, "type": type_, "message": message}
+
+    @staticmethod
+    def _page(items: List[Dict[str, Any]], key: str, query: Dict[str, str]) -> Dict[str, Any]:
+        limit = int(query.get("limit") or 100)
+        start = int(query.get("next_page_token") or 0)
+        page = {key: items[start:start + limit]}
+        if start + limit < len(items):
+            page["nextPageToken"] = str(start + limit)
+        return page
+
+    def management(self, method: str, parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+        with self._lock:
+            if parts[:1] == ["models"]:
+                return self._models(method, parts[1:], query)
+            if parts[:1] == ["workflows"]:
+                return self._workflows(method, parts[1:], query)
+        return self._error(404, "ResourceNotFoundException", _NOT_FOUND)
+
+    def _models(self, method: str, parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+        if not parts:
+            if method == "GET":
+                return 200, self._page([{"modelName": n, "modelUrl": self._lookup(n, None).url}
+                                        for n in sorted(self.models)], "models", query)
+            if method == "POST":
+                return self._register(query)
+            return self._error(405, "MethodNotAllowedException", "Requested method is not allowed")
+        name = parts[0]
+        version = parts[1] if len(parts) > 1 and parts[1] not in ("all", "set-default") else None
+        if name not in self.models:
+            return self._error(404, "ModelNotFoundException", f"Model not found: {name}")
+        if version and version not in self.models[name]:
+            return self._error(404, "ModelVersionNotFoundException",
+                               f"Model version: {version} does not exist for model: {name}")
+        if method == "GET":
+            if parts[1:2] == ["all"]:
+                return 200, [m.describe(v == self.defaults[name]) for v, m in self.models[name].items()]
+            model = self._lookup(name, version)
+            return 200, [model.describe(model.version == self.defaults[name])]
+        if method == "PUT" and parts[-1] == "set-default":
+            self.defaults[name] = version or self.defaults[name]
+            return 200, {"status": f'Default vesion succsesfully updated for model "{name}" to "{version}"'}
+        if method == "PUT":
+            model = self._lookup(name, version)
+            min_workers = int(query.get("min_worker") or model.min_workers)
+            max_workers = int(query.get("max_worker") or max(min_workers, model.max_workers))
+            self.models[name][model.version] = model._replace(min_workers=min_workers, max_workers=max_workers)
+            return 202, {"status": "Processing worker updates..."}
+        if method == "DELETE":
+            model = self._lookup(name, version)
+            if model.version == self.defaults[name] and len(self.models[name]) > 1:
+                return self._error(400, "InternalServerException",
+                                   f"Cannot remove default version {model.version} for model {name}")
+            del self.models[name][model.version]
+            if not self.models[name]:
+                del self.models[name]
+                del self.defaults[name]
+            return 200, {"status": f'Model "{name}" unregistered'}
+        return self._error(405, "MethodNotAllowedException", "Requested method is not allowed")
+
+    def _register(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        url = query.get("url")
+        if not url:
+            return self._error(400, "BadRequestException", "Parameter url is required.")
+        name = query.get("model_name") or os.path.splitext(os.path.basename(url))[0]
+        # Real archives carry their version in the manifest, here it's the next free one
+        version = f"{len(self.models.get(name, {})) + 1}.0"
+        workers = int(query.get("initial_workers") or 0)
+        self._add(MockModel(name, version, url, workers, workers, int(query.get("batch_size") or 1),
+                            int(query.get("max_batch_delay") or 100)))
+        if workers and query.get("synchronous", "true") == "false":
+            # Like TorchServe, an asynchronous register with workers doesn't say what it registered
+            return 202, {"status": "Processing worker updates..."}
+        return 200, {"status": f'Model "{name}" Version: {version} registered with {workers} initial workers'}
+
+    def _workflows(self, method: str, parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+        if not parts:
+            if method == "GET":
+                items = [{"workflowName": n, "workflowUrl": u} for n, u in sorted(self.workflows.items())]
+                return 200, self._page(items, "workflows", query)
+            if method == "POST":
+                url = query.get("url")
+                if not url:
+                    return self._error(400, "BadRequestException", "Parameter url is required.")
+                name = query.get("workflow_name") or os.path.splitext(os.path.basename(url))[0]
+                self.workflows[name] = url
+                return 200, {"status": f"Workflow {name} has been registered and scaled successfully."}
+            return self._error(405, "MethodNotAllowedException", "Requested method is not allowed")
+        name = parts[0]
+        if name not in self.workflows:
+            return self._error(404, "WorkflowNotFoundException", f"Workflow not found: {name}")
+        if method == "GET":
+            return 200, [{"workflowName": name, "workflowUrl": self.workflows[name], "minWorkers": 1, "maxWorkers": 1,
+                          "batchSize": 1, "maxBatchDelay": 100, "workflowDag": "{}"}]
+        if method == "DELETE":
+            del self.workflows[name]
+            return 200, {"status": f"Workflow \"{name}\" unregistered"}
+        return self._error(405, "MethodNotAllowedException", "Requested method is not allowed")
+
+    # Inference API
+
+    def inference(self, method: str, parts: List[str], body: bytes) -> Tuple[int, Any]:
+        if parts == ["ping"]:
+            return 200, {"status": "Healthy"}
+        if parts[:1] == ["predictions"] and len(parts) in (2, 3) and method in ("POST", "PUT"):
+            with self._lock:
+                model = self._lookup(parts[1], parts[2] if len(parts) == 3 else None)
+                if model is None:
+                    return self._error(404, "ModelNotFoundException", f"Model not found: {parts[1]}")
+                if not model.min_workers:
+                    return self._error(503, "ServiceUnavailableException",
+                                       f"Model \"{model.name}\" has no worker to serve inference request.")
+                self._record(model.name, model.version, 1000 + self.latency * 1e6)
+            return 200, {"model": model.name, "version": model.version, "size": len(body)}
+        return self._error(404, "ResourceNotFoundException", _NOT_FOUND)
+
+    def _inject(self) -> bool:
+        """Count the request, apply the latency and say whether it should fail."""
+        with self._lock:
+            self.requests += 1
+            fail = self.failure_rate and self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        return bool(fail)
+
+    # HTTP plumbing
+
+    def _handler(self, kind: str) -> type:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment, or delayed ACKs add ~40 ms to every keep-alive request
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, code: int, payload: Any) -> None:
+                if isinstance(payload, str):
+                    body, content_type = payload.encode(), "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    body, content_type = json.dumps(payload).encode(), "application/json"
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _dispatch(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                split = urlsplit(self.path)
+                parts = [unquote(p) for p in split.path.split("/") if p]
+                query = {k: v[-1] for k, v in parse_qs(split.query).items()}
+                if mock._inject():
+                    self._reply(*mock._error(500, "InternalServerException", "Injected failure"))
+                elif kind == "management":
+                    self._reply(*mock.management(self.command, parts, query))
+                elif kind == "inference":
+                    self._reply(*mock.inference(self.command, parts, body))
+                elif parts == ["metrics"]:
+                    self._reply(200, mock.metrics_text())
+                else:
+                    self._reply(404, "Not found")
+
+            do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+        return Handler
+
+    # gRPC plumbing
+
+    def _grpc_management(self, rpc: str, request: bytes, context: Any) -> bytes:
+        import grpc
+
+        from torchserve_dashboard.grpc_api import MANAGEMENT_RPCS, MESSAGES, decode, encode
+
+        fields = decode(MESSAGES[MANAGEMENT_RPCS[rpc]], request)
+        name, version = fields.get("model_name"), fields.get("model_version")
+        model = ["models", name] + ([version] if version else [])
+        if rpc == "DescribeModel":
+            call = ("GET", model, {})
+        elif rpc == "ListModels":
+            call = ("GET", ["models"], {k: str(fields[k]) for k in ("limit", "next_page_token") if fields[k]})
+        elif rpc == "RegisterModel":
+            call = ("POST", ["models"], {k: str(v) for k, v in fields.items() if v and not isinstance(v, bool)})
+            # synchronous defaults to false over gRPC
+            call[2]["synchronous"] = "true" if fields.get("synchronous") else "false"
+        elif rpc == "ScaleWorker":
+            call = ("PUT", model, {k: str(fields[k]) for k in ("min_worker", "max_worker") if fields[k]})
+        elif rpc == "SetDefault":
+            call = ("PUT", model + ["set-default"], {})
+        else:
+            call = ("DELETE", model, {})
+        if self._inject():
+            context.abort(grpc.StatusCode.INTERNAL, "Injected failure")
+        code, payload = self.management(*call)
+        if code >= 400:
+            status = {400: grpc.StatusCode.INVALID_ARGUMENT, 404: grpc.StatusCode.NOT_FOUND}
+            context.abort(status.get(code, grpc.StatusCode.INTERNAL), payload["message"])
+        return encode(MESSAGES["ManagementResponse"], {"msg": json.dumps(payload)})
+
+    def _grpc_predict(self, request: bytes, context: Any) -> bytes:
+        import grpc
+
+        from torchserve_dashboard.grpc_api import MESSAGES, decode, encode
+
+        fields = decode(MESSAGES["PredictionsRequest"], request)
+        parts = ["predictions", fields["model_name"]] + ([fields["model_version"]] if fields["model_version"] else [])
+        if self._inject():
+            context.abort(grpc.StatusCode.INTERNAL, "Injected failure")
+        code, payload = self.inference("POST", parts, fields["input"].get("data", b""))
+        if code >= 400:
+            status = {404: grpc.StatusCode.NOT_FOUND, 503: grpc.StatusCode.UNAVAILABLE}
+            context.abort(status.get(code, grpc.StatusCode.INTERNAL), payload["message"])
+        return encode(MESSAGES["PredictionResponse"], {"prediction": json.dumps(payload).encode()})
+
+    def _grpc_stream(self, request: bytes, context: Any) -> Iterator[bytes]:
+        # Like a streaming handler sending a few partial responses
+        for _ in range(3):
+            yield self._grpc_predict(request, context)
+
+    def _start_grpc(self) -> None:
+        import grpc
+
+        from torchserve_dashboard.grpc_api import (INFERENCE_SERVICE, MANAGEMENT_RPCS, MANAGEMENT_SERVICE, MESSAGES,
+                                                   encode)
+
+        health = encode(MESSAGES["TorchServeHealthResponse"], {"health": json.dumps({"status": "Healthy"})})
+        management = {
+            rpc: grpc.unary_unary_rpc_method_handler(lambda req, ctx, rpc=rpc: self._grpc_management(rpc, req, ctx))
+            for rpc in MANAGEMENT_RPCS
+        }
+        inference = {
+            "Ping": grpc.unary_unary_rpc_method_handler(lambda req, ctx: health),
+            "Predictions": grpc.unary_unary_rpc_method_handler(self._grpc_predict),
+            "StreamPredictions": grpc.unary_stream_rpc_method_handler(self._grpc_stream),
+        }
+        # TorchServe serves each service on its own port
+        self._grpc_server = grpc.server(ThreadPoolExecutor(max_workers=32))
+        self._grpc_server.add_generic_rpc_handlers((
+            grpc.method_handlers_generic_handler(MANAGEMENT_SERVICE, management),
+            grpc.method_handlers_generic_handler(INFERENCE_SERVICE, inference),
+        ))
+        for kind in ("inference", "management"):
+            self._grpc_ports[kind] = self._grpc_server.add_insecure_port(f"{self.host}:0")
+        self._grpc_server.start()
+
+    def start(self) -> "MockTorchServe":
+        for kind in ("inference", "management", "metrics"):
+            server = _Server((self.host, 0), self._handler(kind))
+            threading.Thread(target=server.serve_forever, name=f"mock-torchserve-{kind}", daemon=True).start()
+            self._servers.append(server)
+        if self.grpc:
+            self._start_grpc()
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+        if self._grpc_server is not None:
+            self._grpc_server.stop(grace=None)
+            self._grpc_server = None
+
+    def __enter__(self) -> "MockTorchServe":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _address(self, i: int) -> str:
+        return f"http://{self.host}:{self._servers[i].server_address[1]}"
+
+    @property
+    def inference_address(self) -> str:
+        return self._address(0)
+
+    @property
+    def management_address(self) -> str:
+        return self._address(1)
+
+    @property
+    def metrics_address(self) -> str:
+        return self._address(2)
+
+    @property
+    def grpc_inference_target(self) -> str:
+        return f"{self.host}:{self._grpc_ports['inference']}"
+
+    @property
+    def grpc_management_target(self) -> str:
+        return f"{self.host}:{self._grpc_ports['management']}"
+
+    def write_config(self, path: str, model_store: Optional[str] = None) -> str:
+        """Write a ``config.properties`` pointing at this server, for the dashboard and ``ctl --config``."""
+        with open(path, "w") as f:
+            f.write(f"inference_address={self.inference_address}\n")
+            f.write(f"management_address={self.management_address}\n")
+            f.write(f"metrics_address={self.metrics_address}\n")
+            if self._grpc_ports:
+                f.write(f"grpc_inference_port={self._grpc_ports['inference']}\n")
+                f.write(f"grpc_management_port={self._grpc_ports['management']}\n")
+            if model_store:
+                f.write(f"model_store={model_store}\n")
+        return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock TorchServe server")
+    parser.add_argument("--models", type=int, default=100, help="Number of registered models")
+    parser.add_argument("--versions", type=int, default=1, help="Versions per model")
+    parser.add_argument("--workflows", type=int, default=10, help="Number of registered workflows")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--failure_rate", type=float, default=0.0, help="Fraction of requests failing with a 500")
+    parser.add_argument("--grpc", action="store_true", help="Also serve the gRPC APIs (needs grpcio)")
+    parser.add_argument("--config", default="mock.torchserve.properties",
+                        help="Where to write a config.properties pointing at the server")
+    args = parser.parse_args()
+    with MockTorchServe(args.models, args.versions, args.workflows, latency=args.latency,
+                        failure_rate=args.failure_rate, grpc=args.grpc) as ts:
+        ts.write_config(args.config)
+        print(f"inference {ts.inference_address}, management {ts.management_address}, "
+              f"metrics {ts.metrics_address}; config written to {args.config}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
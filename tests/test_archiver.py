@@ -0,0 +1,98 @@
+import json
+import os
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from torchserve_dashboard import archiver
+from torchserve_dashboard.archiver import ArchiveMember, build_mar, write_archive
+from torchserve_dashboard.catalog import ModelStoreCatalog
+from torchserve_dashboard.ctl import ctl
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    weights = tmp_path / "model.pt"
+    # Compressible, with a random tail so chunks don't all look alike
+    weights.write_bytes(b"".join(b"layer %d " % i * 500 + os.urandom(64) for i in range(2000)))
+    (tmp_path / "handler.py").write_text("def handle(data, context):\n    return data\n")
+    (tmp_path / "extra" / "vocab").mkdir(parents=True)
+    (tmp_path / "extra" / "vocab" / "words.txt").write_text("a\nb\n")
+    (tmp_path / "packed.bin").write_bytes(os.urandom(3 << 20))
+    return tmp_path
+
+
+def test_build_mar(model_files, tmp_path):
+    store = tmp_path / "store"
+    result = build_mar("resnet", "2.0", str(store), str(model_files / "handler.py"),
+                       serialized_file=str(model_files / "model.pt"),
+                       extra_files=[str(model_files / "extra"), str(model_files / "packed.bin")],
+                       workers=4)
+    methods = {name: method for name, _, _, method in result.members}
+    assert methods == {"model.pt": "deflate", "handler.py": "deflate", "vocab/words.txt": "deflate",
+                       "packed.bin": "store", "MAR-INF/MANIFEST.json": "deflate"}
+    with zipfile.ZipFile(result.path) as zf:
+        assert zf.testzip() is None
+        assert zf.read("model.pt") == (model_files / "model.pt").read_bytes()
+        assert json.loads(zf.read("MAR-INF/MANIFEST.json"))["model"] == {
+            "modelName": "resnet", "handler": "handler.py", "modelVersion": "2.0", "serializedFile": "model.pt"}
+    # Shows up in the store like any other archive, and nothing else is left behind
+    catalog = ModelStoreCatalog(str(store), str(tmp_path / "index.sqlite"))
+    catalog.refresh()
+    assert [(e.file, e.model_version, e.error) for e in catalog.entries()] == [("resnet.mar", "2.0", None)]
+    assert os.listdir(store) == ["resnet.mar"]
+
+    with pytest.raises(FileExistsError):
+        build_mar("resnet", "2.0", str(store), "image_classifier", serialized_file=str(model_files / "model.pt"))
+
+
+def test_chunked_deflate_matches_input(model_files, tmp_path):
+    data = (model_files / "model.pt").read_bytes()
+    path = str(tmp_path / "x.zip")
+    write_archive(path, [ArchiveMember("w", str(model_files / "model.pt"))], compression="deflate",
+                  workers=3, chunk_size=100_000)
+    with zipfile.ZipFile(path) as zf:
+        assert zf.read("w") == data
+        assert zf.getinfo("w").compress_size < len(data) / 4
+
+
+def test_zip64(model_files, tmp_path, monkeypatch):
+    monkeypatch.setattr(archiver, "_ZIP64_LIMIT", 1000)
+    monkeypatch.setattr(archiver, "_ZIP64_COUNT_LIMIT", 2)
+    path = str(tmp_path / "x.zip")
+    members = [ArchiveMember(f"f{i}", str(model_files / "packed.bin")) for i in range(3)]
+    write_archive(path, members + [ArchiveMember("small", data=b"abc")])
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["f0", "f1", "f2", "small"]
+        assert zf.getinfo("f2").header_offset > 6 << 20
+
+
+def test_failed_build_leaves_nothing(model_files, tmp_path):
+    store = tmp_path / "store"
+    with pytest.raises(FileNotFoundError):
+        build_mar("m", "1.0", str(store), "image_classifier", serialized_file=str(model_files / "model.pt"),
+                  extra_files=[str(model_files / "missing")])
+    with pytest.raises(ValueError):
+        write_archive(str(store / "dup.zip"), [ArchiveMember("a", data=b"1"), ArchiveMember("a", data=b"2")])
+    assert not store.exists() or os.listdir(store) == []
+
+
+def test_ctl_archive(model_files, tmp_path):
+    res = CliRunner().invoke(ctl, ["--json", "archive", "--model-name", "m", "--version", "1.0",
+                                   "--handler", "image_classifier", "--serialized-file", str(model_files / "model.pt"),
+                                   "--model-store", str(tmp_path / "store"), "--compression", "store"])
+    assert res.exit_code == 0, res.output
+    assert json.loads(res.output)["archive"] == "m.mar"
+
+
+def test_aborted_build_cancels_pending_chunks(model_files, tmp_path):
+    def abort(done, total):
+        if done > 200_000:
+            raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError, match="cancelled"):
+        write_archive(str(tmp_path / "x.zip"), [ArchiveMember("w", str(model_files / "model.pt"))],
+                      compression="deflate", workers=2, chunk_size=50_000, progress=abort)
+    assert not [n for n in os.listdir(tmp_path) if "x.zip" in n]
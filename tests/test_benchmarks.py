@@ -0,0 +1,123 @@
+"""Performance benchmarks, run against :class:`tests.mock_server.MockTorchServe`.
+
+Run with ``pytest tests/test_benchmarks.py --benchmark-autosave`` and compare
+against an earlier run with ``--benchmark-compare --benchmark-compare-fail=mean:20%``.
+"""
+import asyncio
+
+import pytest
+
+from tests.conftest import FLEET_MODELS, STORE_ARCHIVES
+from tests.mock_server import MockTorchServe
+from torchserve_dashboard.api import AsyncManagementAPI, ManagementAPI
+from torchserve_dashboard.cache import CachedManagementAPI, TTLCache
+from torchserve_dashboard.catalog import ModelStoreCatalog
+from torchserve_dashboard.metrics import MetricsScraper, MetricsStore
+
+
+@pytest.mark.benchmark(group="management")
+def test_describe(benchmark, fleet_ts):
+    api = ManagementAPI(fleet_ts.management_address)
+    res = benchmark(api.get_model, "model-1")
+    assert res[0]["modelName"] == "model-1"
+
+
+@pytest.mark.benchmark(group="management")
+def test_describe_cached(benchmark, fleet_ts):
+    api = CachedManagementAPI(ManagementAPI(fleet_ts.management_address), TTLCache())
+    res = benchmark(api.get_model, "model-1")
+    assert res[0]["modelName"] == "model-1"
+
+
+@pytest.mark.benchmark(group="management")
+def test_list_all_models(benchmark, fleet_ts):
+    api = ManagementAPI(fleet_ts.management_address)
+    models = benchmark(lambda: list(api.iter_models(limit=100)))
+    assert len(models) == FLEET_MODELS
+
+
+@pytest.mark.benchmark(group="management")
+def test_describe_all_concurrently(benchmark, fleet_ts):
+    names = [f"model-{i}" for i in range(500)]
+
+    async def describe_all():
+        async with AsyncManagementAPI(fleet_ts.management_address) as api:
+            return await api.describe_all(names)
+
+    described = benchmark.pedantic(lambda: asyncio.run(describe_all()), rounds=3)
+    assert all(described.values())
+
+
+@pytest.mark.benchmark(group="management")
+def test_describe_with_latency(benchmark):
+    # A slow server is where concurrency should pay off: 200 x 10 ms serially would take 2 s
+    names = [f"model-{i}" for i in range(200)]
+
+    async def describe_all(address):
+        async with AsyncManagementAPI(address) as api:
+            return await api.describe_all(names)
+
+    with MockTorchServe(models=len(names), latency=0.01) as ts:
+        described = benchmark.pedantic(lambda: asyncio.run(describe_all(ts.management_address)), rounds=3)
+    assert all(described.values())
+    if benchmark.stats is not None:  # None under --benchmark-disable
+        assert benchmark.stats.stats.mean < 1.0
+
+
+@pytest.mark.benchmark(group="grpc")
+@pytest.mark.parametrize("transport", ["rest", "grpc"])
+def test_describe_all_transport(benchmark, transport):
+    pytest.importorskip("grpc")
+    from torchserve_dashboard.grpc_api import AsyncGrpcManagementAPI
+
+    names = [f"model-{i}" for i in range(500)]
+
+    async def describe_all(ts):
+        if transport == "grpc":
+            api = AsyncGrpcManagementAPI(ts.management_address, ts.grpc_management_target)
+        else:
+            api = AsyncManagementAPI(ts.management_address)
+        async with api:
+            return await api.describe_all(names)
+
+    with MockTorchServe(models=len(names), grpc=True) as ts:
+        described = benchmark.pedantic(lambda: asyncio.run(describe_all(ts)), rounds=3)
+    assert all(isinstance(d, list) for d in described.values())
+
+
+@pytest.mark.benchmark(group="model-store")
+def test_catalog_cold_scan(benchmark, model_store, tmp_path):
+    indexes = iter(range(1000))
+
+    def setup():
+        return (ModelStoreCatalog(model_store, str(tmp_path / f"index-{next(indexes)}.sqlite")),), {}
+
+    updated, removed = benchmark.pedantic(ModelStoreCatalog.refresh, setup=setup, rounds=5)
+    assert (updated, removed) == (STORE_ARCHIVES, 0)
+
+
+@pytest.mark.benchmark(group="model-store")
+def test_catalog_warm_scan(benchmark, model_store, tmp_path):
+    catalog = ModelStoreCatalog(model_store, str(tmp_path / "index.sqlite"))
+    catalog.refresh()
+    assert benchmark(catalog.refresh) == (0, 0)
+
+
+@pytest.mark.benchmark(group="model-store")
+def test_catalog_entries(benchmark, model_store, tmp_path):
+    catalog = ModelStoreCatalog(model_store, str(tmp_path / "index.sqlite"))
+    catalog.refresh()
+    assert len(benchmark(catalog.entries)) == STORE_ARCHIVES
+
+
+@pytest.mark.benchmark(group="metrics")
+def test_metrics_parse(benchmark, fleet_ts):
+    lines = fleet_ts.metrics_text().splitlines()
+    store = MetricsStore(max_series=4 * FLEET_MODELS)
+    assert benchmark(store.ingest, lines) == 3 * FLEET_MODELS
+
+
+@pytest.mark.benchmark(group="metrics")
+def test_metrics_scrape(benchmark, fleet_ts):
+    scraper = MetricsScraper(fleet_ts.metrics_address, MetricsStore(max_series=4 * FLEET_MODELS))
+    assert benchmark(scraper.scrape) == 3 * FLEET_MODELS
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from torchserve_dashboard.api import AsyncManagementAPI, ManagementAPI
+from torchserve_dashboard.archiver import build_mar
+from torchserve_dashboard.bulk import BulkItem, _with_retries, bulk_register, load_manifest
+from torchserve_dashboard.catalog import ModelStoreCatalog
+
+
+def test_manifest_reports_every_bad_entry():
+    assert load_manifest("url,batch_size\na.mar,4\n", "csv") == [BulkItem("a.mar", batch_size=4)]
+    with pytest.raises(ValueError) as e:
+        load_manifest("url,batch_size\na.mar,4\nb.mar,four\n,2\n", "csv")
+    assert str(e.value) == ("entry 2: batch_size is not an integer: 'four'; "
+                            "entry 3: no url: {'url': '', 'batch_size': '2'}")
+
+
+def test_register_is_only_retried_when_it_cannot_have_gone_through():
+    async def retries(error, idempotent):
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise error
+            return {"status": "ok"}
+
+        async def on_retry(attempt, reason):
+            pass
+
+        try:
+            await _with_retries(call, 3, 0, on_retry, idempotent)
+        except httpx.TransportError:
+            pass
+        return len(attempts) - 1
+
+    assert asyncio.run(retries(httpx.ReadTimeout("slow"), idempotent=True)) == 1
+    assert asyncio.run(retries(httpx.ReadTimeout("slow"), idempotent=False)) == 0
+    assert asyncio.run(retries(httpx.ConnectError("refused"), idempotent=False)) == 1
+
+
+def test_version_comes_from_the_manifest(tmp_path):
+    store = tmp_path / "store"
+    (tmp_path / "model.pt").write_bytes(b"weights")
+    build_mar("resnet", "2.0", str(store), "image_classifier", serialized_file=str(tmp_path / "model.pt"))
+    catalog = ModelStoreCatalog(str(store), str(tmp_path / "index.sqlite"))
+    catalog.refresh()
+    calls = []
+
+    class Api:
+        async def register_model(self, url, model_name=None, **kwargs):
+            return {"status": "Processing worker updates..."}
+
+        async def change_model_workers(self, model_name, version=None, **kwargs):
+            calls.append((model_name, version))
+            return {"status": "Processing worker updates..."}
+
+        async def get_model(self, model_name, version=None, list_all=False):
+            return [{"modelVersion": version, "workers": [{"status": "READY"}] * 2}]
+
+    async def run():
+        item = BulkItem("resnet.mar", "resnet-prod", initial_workers=1, min_worker=2)
+        return [p async for p in bulk_register(Api(), [item], poll_interval=0, catalog=catalog)]
+
+    assert asyncio.run(run())[-1].state == "ready"
+    assert calls == [("resnet-prod", "2.0")]
+
+
+def test_second_version_registered_with_workers(mock_ts):
+    async def run():
+        async with AsyncManagementAPI(mock_ts.management_address) as api:
+            item = BulkItem("model-0.mar", initial_workers=1, min_worker=3, max_worker=3)
+            return [p async for p in bulk_register(api, [item], poll_interval=0.01)]
+
+    assert asyncio.run(run())[-1].state == "ready"
+    described = ManagementAPI(mock_ts.management_address).get_model("model-0", list_all=True)
+    assert [(d["modelVersion"], d["minWorkers"], d["isDefault"]) for d in described] == [
+        ("1.0", 1, True), ("2.0", 1, False), ("3.0", 3, False)]
@@ -0,0 +1,17 @@
+import os
+
+from torchserve_dashboard.config import TorchServeConfig
+
+
+def test_address_changes_since_connected(tmp_path):
+    path = tmp_path / "config.properties"
+    path.write_text("management_address=http://0.0.0.0:8081\nnumber_of_gpu=0\n")
+    config = TorchServeConfig(str(path))
+    config.mark_connected()
+    assert config.address_changes() == []
+
+    path.write_text("management_address=http://0.0.0.0:9081\nnumber_of_gpu=1\n")
+    os.utime(path, ns=(1, 1))
+    assert config.reload()
+    # Only the port moved; the gRPC target follows the host, which didn't
+    assert config.address_changes() == [("management_address", "http://127.0.0.1:8081", "http://127.0.0.1:9081")]
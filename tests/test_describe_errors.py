@@ -0,0 +1,53 @@
+"""Snapshot consumers must cope with models whose describe failed.
+
+A model unregistered between listing and describing it, or a describe that
+returns 500, leaves an error body (or ``None``) where a list of versions
+is expected; the other models must still be handled.
+"""
+import time
+
+from torchserve_dashboard.autoscaler import Autoscaler, ScalingBounds
+from torchserve_dashboard.fleet import _model_rows
+from torchserve_dashboard.health import WorkerHealthMonitor
+from torchserve_dashboard.history import HistoryStore, layout_of
+from torchserve_dashboard.metrics import MetricsStore
+from torchserve_dashboard.poller import StateSnapshot
+
+_ERROR = {"code": 404, "type": "ModelNotFoundException", "message": "Model not found: gone"}
+
+
+def _snapshot():
+    ok = [{"modelVersion": "1.0", "modelUrl": "ok.mar", "minWorkers": 1, "maxWorkers": 1,
+           "workers": [{"id": "9000", "status": "READY", "memoryUsage": 2 ** 20, "pid": 1}]}]
+    descriptions = {"ok": ok, "gone": _ERROR, "down": None}
+    return StateSnapshot(time.time(), "0.7.0", None, {"models": [{"modelName": m} for m in descriptions]},
+                         descriptions, descriptions, [])
+
+
+def test_health_skips_failed_describes():
+    health = WorkerHealthMonitor()
+    health.record(_snapshot())
+    assert list(health.index) == [("ok", "1.0", "9000")]
+    assert health.count == 1
+
+
+def test_layout_skips_failed_describes(tmp_path):
+    snapshot = _snapshot()
+    assert [(e.model, e.version, e.is_default) for e in layout_of(snapshot)] == [("ok", "1.0", 1)]
+    history = HistoryStore(str(tmp_path / "history.sqlite"))
+    snapshot_id = history.record_snapshot(snapshot)
+    assert [e.model for e in history.layout(snapshot_id)] == ["ok"]
+
+
+def test_fleet_rows_report_failed_describes():
+    rows = _model_rows("http://node:8081", _snapshot().all_descriptions)
+    assert [(r["model"], r["status"]) for r in rows] == [("ok", "ok"), ("gone", "describe failed"),
+                                                         ("down", "describe failed")]
+
+
+def test_autoscaler_skips_failed_describes():
+    snapshot = _snapshot()
+    scaler = Autoscaler(None, MetricsStore(), lambda: snapshot)
+    for model in ("ok", "gone", "down"):
+        scaler.set_bounds(model, ScalingBounds())
+    assert [d.model for d in scaler.step()] == ["ok"]
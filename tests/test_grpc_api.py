@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from torchserve_dashboard.grpc_api import MESSAGES, decode, encode, http_status
+
+grpc = pytest.importorskip("grpc")
+
+from tests.mock_server import MockTorchServe  # noqa: E402
+from torchserve_dashboard.benchmark import run_benchmark  # noqa: E402
+from torchserve_dashboard.grpc_api import (AsyncGrpcManagementAPI, GrpcInferenceClient,  # noqa: E402
+                                           GrpcManagementAPI)
+
+
+@pytest.fixture
+def grpc_ts():
+    with MockTorchServe(models=3, versions=2, workflows=2, grpc=True) as ts:
+        yield ts
+
+
+def test_codec_round_trip():
+    schema = MESSAGES["ScaleWorkerRequest"]
+    fields = decode(schema, encode(schema, {"model_name": "résnet", "min_worker": -1, "max_worker": 300,
+                                            "synchronous": True, "model_version": None}))
+    assert fields == {"model_name": "résnet", "model_version": "", "min_worker": -1, "max_worker": 300,
+                      "number_gpu": 0, "synchronous": True, "timeout": 0}
+    schema = MESSAGES["PredictionsRequest"]
+    request = {"model_name": "m", "input": {"data": b"\x00\xff", "extra": b""}}
+    assert decode(schema, encode(schema, request))["input"] == request["input"]
+    # Unknown fields are skipped
+    assert decode(MESSAGES["ManagementResponse"], encode(schema, request) + encode(MESSAGES["ManagementResponse"],
+                                                                                   {"msg": "ok"}))["msg"] == "ok"
+    assert http_status(grpc.StatusCode.NOT_FOUND) == 404
+
+
+def test_management_over_grpc(grpc_ts):
+    api = GrpcManagementAPI(grpc_ts.management_address, grpc_ts.grpc_management_target)
+    assert len(list(api.iter_models(limit=2))) == 3
+    assert [d["modelVersion"] for d in api.get_model("model-0", list_all=True)] == ["1.0", "2.0"]
+    assert api.register_model("new.mar", initial_workers=1) == {"status": "Processing worker updates..."}
+    assert "registered" in api.register_model("other.mar")["status"]
+    api.change_model_workers("new", min_worker=2, max_worker=2)
+    assert api.get_model("new")[0]["minWorkers"] == 2
+    assert api.get_model("missing") == {"code": 404, "type": "NOT_FOUND", "message": "Model not found: missing"}
+    # No gRPC workflow API, these stay on REST
+    assert len(list(api.iter_workflows())) == 2
+    api.close()
+
+    dead = GrpcManagementAPI("http://127.0.0.1:9", "127.0.0.1:9", timeout=5)
+    assert dead.get_loaded_models() is None
+    with pytest.raises(httpx.ConnectError):
+        dead.get_model("model-0")
+
+
+def test_async_management_and_inference(grpc_ts):
+    async def run():
+        async with AsyncGrpcManagementAPI(grpc_ts.management_address, grpc_ts.grpc_management_target) as api:
+            described = await api.describe_all(["model-0", "model-1", "missing"])
+            await api.change_model_default("model-1", "2.0")
+            default = (await api.get_model("model-1"))[0]["modelVersion"]
+        async with GrpcInferenceClient(grpc_ts.grpc_inference_target) as client:
+            health = await client.ping()
+            chunks = [c async for c in client.stream_predictions("model-0", b"x")]
+        return described, default, health, chunks
+
+    described, default, health, chunks = asyncio.run(run())
+    assert described["missing"]["code"] == 404 and len(described["model-0"]) == 1
+    assert (default, health, len(chunks)) == ("2.0", "Healthy", 3)
+
+
+def test_benchmark_over_grpc(grpc_ts):
+    result = asyncio.run(run_benchmark(grpc_ts.inference_address, "model-0", [b"x"], duration=0.5,
+                                       concurrency=4, grpc_target=grpc_ts.grpc_inference_target))
+    assert result.requests > 0 and set(result.status_codes) == {200}
+    grpc_ts.failure_rate = 1.0
+    result = asyncio.run(run_benchmark(grpc_ts.inference_address, "model-0", [b"x"], max_requests=5,
+                                       grpc_target=grpc_ts.grpc_inference_target))
+    assert result.failures == 5 and set(result.status_codes) == {500}
+    assert result.throughput == 0 and result.histogram.total == 0
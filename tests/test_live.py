@@ -0,0 +1,97 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+
+from tests.mock_server import MockTorchServe
+from torchserve_dashboard.fleet import FleetPoller, poll_node
+from torchserve_dashboard.live import SNAPSHOT_KEY, ChangeFeed, EventStreamServer, snapshot_rows
+from torchserve_dashboard.pagination import PAGE_SIZE
+from torchserve_dashboard.poller import StateSnapshot
+
+
+def _snapshot(workers):
+    descriptions = {name: [{"modelVersion": "1.0", "minWorkers": n, "maxWorkers": n,
+                            "workers": [{"status": "READY"}] * n}] for name, n in workers.items()}
+    return StateSnapshot(time.time(), "0.7.0", None, {"models": [{"modelName": m} for m in workers]},
+                         descriptions, descriptions, [])
+
+
+def test_feed_deltas():
+    feed = ChangeFeed(SNAPSHOT_KEY, max_deltas=2)
+    first = feed.update(snapshot_rows(_snapshot({"a": 1, "b": 1})))
+    assert first.structural and len(first.added) == 2
+    assert feed.update(snapshot_rows(_snapshot({"a": 1, "b": 1}))) is None
+
+    scaled = feed.update(snapshot_rows(_snapshot({"a": 3, "b": 1})))
+    assert not scaled.structural and [r["workers"] for r in scaled.changed] == [3]
+    assert feed.since(1) == [scaled]
+
+    gone = feed.update(snapshot_rows(_snapshot({"a": 3})))
+    assert gone.removed == [("b", "1.0")]
+    # Delta 1 was dropped, so a reader that far behind gets the full state instead
+    reset, = feed.since(0)
+    assert reset.reset and reset.version == 3 and [r["model"] for r in reset.added] == ["a"]
+
+
+def test_client_ahead_of_a_restarted_feed_gets_a_reset():
+    feed = ChangeFeed(SNAPSHOT_KEY)
+    feed.update(snapshot_rows(_snapshot({"a": 1})))
+    # Last-Event-ID from before the dashboard restarted
+    reset, = feed.wait(40, timeout=0.5)
+    assert reset.reset and reset.version == 1 and [r["model"] for r in reset.added] == ["a"]
+
+
+def test_wait_wakes_on_update():
+    feed = ChangeFeed(SNAPSHOT_KEY)
+    assert feed.wait(0, timeout=0.01) == []
+    timer = threading.Timer(0.05, feed.update, [snapshot_rows(_snapshot({"a": 1}))])
+    timer.start()
+    deltas = feed.wait(0, timeout=5)
+    assert deltas and deltas[-1].version == 1
+
+
+def test_event_stream():
+    feed = ChangeFeed(SNAPSHOT_KEY)
+    feed.update(snapshot_rows(_snapshot({"a": 1})))
+    server = EventStreamServer(feed, 0, keepalive=0.1).start()
+    url = f"http://127.0.0.1:{server.server.server_address[1]}"
+    try:
+        assert httpx.get(url + "/state").json()["version"] == 1
+        events = []
+        with httpx.stream("GET", url + "/events", headers={"Last-Event-ID": "0"}, timeout=5) as res:
+            threading.Timer(0.1, feed.update, [snapshot_rows(_snapshot({"a": 2}))]).start()
+            for line in res.iter_lines():
+                if line.startswith("event:") or line.startswith("data:"):
+                    events.append(line.split(":", 1)[1].strip())
+                if len(events) == 4:
+                    break
+        assert events[0] == "reset" and events[2] == "delta"
+        assert json.loads(events[3])["changed"][0]["workers"] == 2
+    finally:
+        server.stop()
+
+
+def test_fleet_poller_shares_one_poll():
+    with MockTorchServe(models=2) as node1, MockTorchServe(models=3) as node2:
+        poller = FleetPoller([node1.management_address, node2.management_address], interval=60).start()
+        try:
+            deadline = time.time() + 10
+            while poller.rounds == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            version, rows = poller.feed.rows()
+            assert len(rows) == 5 and poller.nodes_answered == 2
+            node2.models.pop("model-0")
+            poller.refresh()
+            delta = poller.feed.wait(version, timeout=10)[-1]
+            assert delta.removed == [(node2.management_address, "model-0", "1.0")]
+        finally:
+            poller.stop()
+
+
+def test_fleet_node_listing_follows_pages():
+    with MockTorchServe(models=PAGE_SIZE + 20) as node:
+        rows = asyncio.run(poll_node(node.management_address, timeout=30))
+    assert len({r["model"] for r in rows}) == PAGE_SIZE + 20
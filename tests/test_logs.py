@@ -0,0 +1,19 @@
+from torchserve_dashboard.logs import LogTailer
+
+
+def test_catch_up_indexes_to_the_end(tmp_path):
+    path = tmp_path / "model_log.log"
+    path.write_text("".join(f"2024-01-01 [INFO ] W-9000-model-{i % 3}_1.0 line {i}\n" for i in range(1000)))
+    tailer = LogTailer(str(path), max_bytes_per_refresh=4096)
+    assert 0 < tailer.refresh() < 1000
+
+    windows = []
+    tailer.catch_up(lambda done, total: windows.append(done))
+    assert len(tailer) == 1000 and len(windows) > 1
+    lines, total = tailer.page(page_size=2, model="model-0")
+    assert total == 334 and [text[-8:] for _, text in lines] == ["line 999", "line 996"]
+
+    with path.open("a") as f:
+        f.write("2024-01-01 [ERROR] W-9000-model-1_1.0 partial")
+    assert tailer.catch_up() == 0
+    assert tailer.page(min_level="ERROR")[1] == 0
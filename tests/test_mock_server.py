@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+
+import httpx
+from click.testing import CliRunner
+
+from torchserve_dashboard.api import AsyncManagementAPI, LocalTS, ManagementAPI
+from torchserve_dashboard.benchmark import run_benchmark
+from torchserve_dashboard.bulk import _REGISTERED
+from torchserve_dashboard.cache import CachedManagementAPI, TTLCache
+from torchserve_dashboard.ctl import ctl
+from torchserve_dashboard.metrics import REQUESTS_METRIC, MetricsScraper
+from torchserve_dashboard.poller import StatePoller
+
+
+def test_pagination(fleet_ts):
+    api = ManagementAPI(fleet_ts.management_address)
+    models = list(api.iter_models(limit=300))
+    assert len(models) == len(fleet_ts.models)
+    assert len({m["modelName"] for m in models}) == len(models)
+    assert len(list(api.iter_workflows(limit=64))) == len(fleet_ts.workflows)
+
+
+def test_model_lifecycle(mock_ts):
+    api = ManagementAPI(mock_ts.management_address)
+    res = api.register_model("new.mar")
+    assert _REGISTERED.search(res["status"]).groups() == ("new", "1.0")
+    # Registering with workers returns before they start, without naming the version
+    assert api.register_model("new.mar", initial_workers=2) == {"status": "Processing worker updates..."}
+    assert len(api.get_model("new", "2.0")[0]["workers"]) == 2
+
+    api.change_model_workers("model-0", "2.0", min_worker=3, max_worker=3)
+    assert api.get_model("model-0", "2.0")[0]["minWorkers"] == 3
+    assert api.get_model("model-0")[0]["modelVersion"] == "1.0"
+
+    # The default version can't be removed while others exist
+    assert api.delete_model("model-0", "1.0")["code"] == 400
+    api.change_model_default("model-0", "2.0")
+    assert api.delete_model("model-0", "1.0")["status"] == 'Model "model-0" unregistered'
+    assert [d["modelVersion"] for d in api.get_model("model-0", list_all=True)] == ["2.0"]
+    assert api.get_model("missing")["code"] == 404
+
+
+def test_failure_injection(mock_ts):
+    statuses = []
+    api = ManagementAPI(mock_ts.management_address, error_callback=lambda r: statuses.append(r.status_code))
+    mock_ts.failure_rate = 1.0
+    assert api.get_loaded_models()["code"] == 500
+    assert statuses == [500]
+    mock_ts.failure_rate = 0.0
+    assert "models" in api.get_loaded_models()
+
+
+def test_poller_fetches_fresh_state_and_fills_cache(mock_ts, tmp_path):
+    cache = TTLCache()
+    cached = CachedManagementAPI(ManagementAPI(mock_ts.management_address), cache)
+    poller = StatePoller(AsyncManagementAPI(mock_ts.management_address), LocalTS(str(tmp_path)), cache=cache).start()
+    try:
+        assert poller.wait_for_update(timeout=10).descriptions["model-0"][0]["minWorkers"] == 1
+        # Readers are served what the poller fetched
+        requests = mock_ts.requests
+        assert cached.get_model("model-0")[0]["minWorkers"] == 1
+        assert mock_ts.requests == requests
+        # A change made elsewhere shows up on the next refresh, whatever the cache TTLs are
+        ManagementAPI(mock_ts.management_address).change_model_workers("model-0", "1.0", min_worker=3)
+        assert poller.refresh(wait=10).descriptions["model-0"][0]["minWorkers"] == 3
+        assert cached.get_model("model-0")[0]["minWorkers"] == 3
+    finally:
+        poller.stop()
+
+
+def test_async_describe_all(mock_ts):
+    async def describe():
+        async with AsyncManagementAPI(mock_ts.management_address) as api:
+            return await api.describe_all(["model-0", "model-1"], list_all=True)
+
+    described = asyncio.run(describe())
+    assert {m: len(d) for m, d in described.items()} == {"model-0": 2, "model-1": 2}
+
+
+def test_predictions_move_metrics(mock_ts):
+    for _ in range(3):
+        httpx.post(mock_ts.inference_address + "/predictions/model-1", content=b"x").raise_for_status()
+    scraper = MetricsScraper(mock_ts.metrics_address)
+    assert scraper.scrape() == 3
+    _, values = scraper.store.series(REQUESTS_METRIC, "model-1", "1.0")
+    assert values[-1] == 3
+
+
+def test_benchmark_only_times_successes(mock_ts):
+    mock_ts.failure_rate = 0.5
+    result = asyncio.run(run_benchmark(mock_ts.inference_address, "model-0", [b"x"], max_requests=40))
+    assert result.requests == 40 and 0 < result.successes < 40
+    assert result.histogram.total == result.successes == result.status_codes[200]
+    assert result.throughput < result.attempted_rate
+
+
+def test_scraper_survives_unexpected_errors(mock_ts, monkeypatch):
+    scraper = MetricsScraper(mock_ts.metrics_address, interval=0.01)
+    monkeypatch.setattr(scraper.store, "ingest", lambda lines: 1 / 0)
+    scraper.start()
+    time.sleep(0.1)
+    assert scraper._thread.is_alive() and scraper.last_error == "division by zero"
+    monkeypatch.undo()
+    time.sleep(0.1)
+    scraper.stop()
+    assert scraper.last_error is None
+
+
+def test_ctl_against_mock(mock_ts, tmp_path):
+    config = mock_ts.write_config(str(tmp_path / "config.properties"))
+    res = CliRunner().invoke(ctl, ["--config", config, "--json", "describe", "model-2", "--all"])
+    assert res.exit_code == 0, res.output
+    assert [d["modelVersion"] for d in json.loads(res.output)] == ["1.0", "2.0"]
+
+    res = CliRunner().invoke(ctl, ["--address", "http://127.0.0.1:9", "list"])
+    assert res.exit_code == 2
+
+    lines = '[1]\n"x"\n{"op": "describe", "model_name": "model-1"}\n'
+    res = CliRunner().invoke(ctl, ["--config", config, "batch", "--keep-going"], input=lines)
+    results = [json.loads(line)["result"] for line in res.output.splitlines()]
+    assert res.exit_code == 1 and [r.get("code") for r in results[:2]] == [400, 400]
+    assert "expected a JSON object, got list" in results[0]["message"]
+    assert results[2][0]["modelName"] == "model-1"
+
+
+def test_describe_concurrency(mock_ts):
+    async def peak(concurrency):
+        in_flight, seen = 0, []
+        api = AsyncManagementAPI(mock_ts.management_address)
+        get_model = api.get_model
+
+        async def counted(*args, **kwargs):
+            nonlocal in_flight
+            in_flight += 1
+            seen.append(in_flight)
+            try:
+                return await get_model(*args, **kwargs)
+            finally:
+                in_flight -= 1
+
+        api.get_model = counted
+        async with api:
+            described = await api.describe_all([f"model-{i % 3}" for i in range(12)], concurrency=concurrency)
+        assert len(described) == 3
+        return max(seen)
+
+    assert asyncio.run(peak(None)) == 12
+    assert asyncio.run(peak(2)) == 2
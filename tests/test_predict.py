@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from tests.mock_server import MockTorchServe
+from torchserve_dashboard import predict
+from torchserve_dashboard.predict import ResponseCache, Sample, compare, find_samples, run_predictions
+
+
+def _run(ts, samples, version="1.0", **kwargs):
+    async def run():
+        return [r async for r in run_predictions(ts.inference_address, "model-0", version, samples, **kwargs)]
+
+    return {r.name: r for r in asyncio.run(run())}
+
+
+def test_predictions_are_cached_per_version(mock_ts, tmp_path):
+    for i in range(20):
+        (tmp_path / "samples" / str(i % 2)).mkdir(parents=True, exist_ok=True)
+        (tmp_path / "samples" / str(i % 2) / f"{i}.bin").write_bytes(bytes([i]) * (i + 1))
+    (tmp_path / "samples" / ".hidden").write_bytes(b"x")
+    samples = find_samples([str(tmp_path / "samples")])
+    assert len(samples) == 20
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+
+    first = _run(mock_ts, samples, concurrency=4, cache=cache)
+    assert len(first) == 20 and all(r.ok and not r.cached for r in first.values())
+    assert json.loads(first["1/3.bin"].body) == {"model": "model-0", "version": "1.0", "size": 4}
+    served = mock_ts.requests
+
+    again = _run(mock_ts, samples, concurrency=4, cache=cache)
+    assert all(r.cached for r in again.values()) and mock_ts.requests == served
+    assert compare(first, again) == []
+
+    other = _run(mock_ts, samples, version="2.0", cache=cache)
+    assert not any(r.cached for r in other.values()) and mock_ts.requests == served + 20
+    assert len(compare(first, other)) == 20
+    assert cache.clear("model-0", "1.0") == 20 and cache.stats()["responses"] == 20
+
+
+def test_large_files_are_streamed(mock_ts, tmp_path, monkeypatch):
+    monkeypatch.setattr(predict, "STREAM_THRESHOLD", 1024)
+    monkeypatch.setattr(predict, "CHUNK_SIZE", 1000)
+    path = tmp_path / "big.bin"
+    path.write_bytes(b"a" * 10_000)
+    results = _run(mock_ts, find_samples([str(path)]) + [Sample("small", 3, data=b"abc")])
+    assert json.loads(results["big.bin"].body)["size"] == 10_000
+    assert json.loads(results["small"].body)["size"] == 3
+
+
+def test_errors_are_results(tmp_path):
+    with MockTorchServe(models=1, failure_rate=1.0) as ts:
+        results = _run(ts, [Sample("x", 1, data=b"x"), Sample("gone", 1, path=str(tmp_path / "missing"))],
+                       cache=ResponseCache(str(tmp_path / "cache.sqlite")))
+    assert results["x"].status == 500 and not results["x"].ok
+    assert results["gone"].status == 0 and results["gone"].error
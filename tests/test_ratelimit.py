@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+from torchserve_dashboard.api import AsyncManagementAPI, ManagementAPI
+from torchserve_dashboard.cache import CachedManagementAPI, TTLCache
+from torchserve_dashboard.ratelimit import RateLimitedManagementAPI, TokenBucket
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=0.001, burst=2)
+    assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 100
+    assert TokenBucket(rate=1000, burst=1).tokens == 1
+
+
+def test_sessions_are_limited_separately(mock_ts):
+    client = ManagementAPI(mock_ts.management_address)
+    cache = TTLCache()
+    spammer = CachedManagementAPI(RateLimitedManagementAPI(client, TokenBucket(0.001, 2)), cache)
+    other = CachedManagementAPI(RateLimitedManagementAPI(client, TokenBucket(0.001, 2)), cache)
+
+    results = [spammer.change_model_workers("model-0", "1.0", min_worker=2) for _ in range(5)]
+    assert [r.get("code") for r in results] == [None, None, 429, 429, 429]
+    assert spammer.api.rejected == 3
+    assert "code" not in other.change_model_workers("model-1", "1.0", min_worker=2)
+    # Reads aren't limited
+    assert all(spammer.get_model("model-0") for _ in range(5))
+
+
+def test_async_jobs_wait_on_the_session_bucket(mock_ts):
+    bucket = TokenBucket(rate=20, burst=2)
+    clicks = RateLimitedManagementAPI(ManagementAPI(mock_ts.management_address), bucket)
+    assert "code" not in clicks.change_model_workers("model-0", "1.0", min_worker=2)
+
+    async def job():
+        async with RateLimitedManagementAPI(AsyncManagementAPI(mock_ts.management_address), bucket,
+                                            wait=True) as api:
+            return [await api.change_model_workers("model-1", "1.0", min_worker=n) for n in range(1, 6)]
+
+    started = time.perf_counter()
+    results = asyncio.run(job())
+    # One token left from the burst, the other four are waited for at 20/s
+    assert all("code" not in r for r in results)
+    assert time.perf_counter() - started >= 0.15
+    # The job used up the session's budget for its clicks too
+    assert clicks.change_model_workers("model-0", "1.0", min_worker=3)["code"] == 429
+
+
+def test_concurrent_misses_share_one_request(mock_ts):
+    api = CachedManagementAPI(ManagementAPI(mock_ts.management_address), TTLCache())
+    mock_ts.latency = 0.2
+    before = mock_ts.requests
+    start = threading.Barrier(8)
+    results = []
+
+    def describe():
+        start.wait()
+        results.append(api.get_model("model-2"))
+
+    threads = [threading.Thread(target=describe) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 8 and all(r == results[0] for r in results)
+    assert mock_ts.requests - before == 1
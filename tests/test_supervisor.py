@@ -0,0 +1,41 @@
+import os
+import threading
+import time
+
+from torchserve_dashboard.supervisor import FAILED, READY, STARTING, TorchServeSupervisor
+
+CLOSED = "http://127.0.0.1:9"
+
+
+class _TS:
+    def __init__(self):
+        self.starts = 0
+
+    def start_torchserve(self):
+        self.starts += 1
+        return "Torchserve is starting"
+
+
+def test_start_attaches_to_a_running_server(mock_ts, tmp_path):
+    pid_file = tmp_path / "ts.pid"
+    ts = _TS()
+    supervisor = TorchServeSupervisor(ts, mock_ts.inference_address, mock_ts.management_address,
+                                      pid_file=str(pid_file))
+    assert supervisor.start().startswith("Something is already listening on")
+    pid_file.write_text(str(os.getpid()))
+    assert supervisor.start() == f"Torchserve is already running (PID: {os.getpid()})"
+    assert ts.starts == 0 and supervisor.state == READY and supervisor.cold_start is None
+    supervisor._stopping.set()
+
+
+def test_readiness_wait_does_not_hold_the_lock(tmp_path):
+    supervisor = TorchServeSupervisor(_TS(), CLOSED, CLOSED, ready_timeout=2, pid_file=str(tmp_path / "ts.pid"))
+    starting = threading.Thread(target=supervisor.start)
+    starting.start()
+    time.sleep(0.3)
+    assert supervisor.state == STARTING
+    assert supervisor._lock.acquire(timeout=0.5)
+    supervisor._lock.release()
+    assert supervisor.start() == "Torchserve is already starting"
+    starting.join()
+    assert supervisor.state == FAILED
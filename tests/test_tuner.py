@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from torchserve_dashboard.tuner import TuningPoint, TuningResult, apply_point, pareto_front
+
+
+class _Api:
+    def __init__(self, delete_code):
+        self.delete_code = delete_code
+        self.calls = []
+
+    async def delete_model(self, model_name, version=None):
+        self.calls.append("delete")
+        return {"code": self.delete_code, "message": "Cannot remove the model"}
+
+    async def register_model(self, url, model_name, **kwargs):
+        self.calls.append("register")
+        return {"code": 500, "message": "stop here"}
+
+
+def test_failed_unregister_fails_the_point():
+    point = TuningPoint(4, 100, 1)
+    api = _Api(409)
+    with pytest.raises(RuntimeError, match="unregister failed: Cannot remove the model"):
+        asyncio.run(apply_point(api, "m", None, "m.mar", point, TuningPoint(1, 100, 1)))
+    assert api.calls == ["delete"]
+    # Nothing to unregister before the first point
+    api = _Api(404)
+    with pytest.raises(RuntimeError, match="stop here"):
+        asyncio.run(apply_point(api, "m", None, "m.mar", point, None))
+    assert api.calls == ["delete", "register"]
+
+
+def test_failing_points_are_not_on_the_pareto_front():
+    fast_errors = TuningResult(TuningPoint(8, 10, 4), throughput=900, p99_ms=2, failures=300)
+    good = TuningResult(TuningPoint(4, 50, 2), throughput=200, p99_ms=40)
+    assert pareto_front([fast_errors, good]) == [good]
@@ -1,7 +1,7 @@
 """Root package info."""
 import logging as __logging
 import os
-from  datetime import date
+from datetime import date
 
 __version__ = 'v0.6.0'
 
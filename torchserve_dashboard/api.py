@@ -1,10 +1,17 @@
+import asyncio
 import os
+import socket
 import subprocess
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
 
 import httpx
 from httpx import Response
 
+from torchserve_dashboard.catalog import ModelStoreCatalog
+from torchserve_dashboard.instrumentation import AsyncInstrumentedTransport, InstrumentedTransport
+
 import logging
 
 ENVIRON_WHITELIST = [
@@ -15,6 +22,33 @@ ENVIRON_WHITELIST = [
 
 log = logging.getLogger(__name__)
 
+# Requests in flight per describe_all. None sends them all at once, so a poll costs about one
+# round-trip however many models there are (the client's connection pool still caps it).
+# A limit trades poll latency for load on the frontend: against the mock server, which starts
+# a thread per connection, 500 models took ~7s unbounded but ~0.8s at 8, while with 10ms per
+# request 8 at a time took ~1s and a serial loop ~6s.
+DESCRIBE_CONCURRENCY: Optional[int] = None
+
+
+def port_in_use(address: str) -> bool:
+    """Whether something still accepts connections on ``address``'s host and port."""
+    parts = urlsplit(address if "//" in address else "//" + address)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parts.hostname or "127.0.0.1", port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def wait_for_port_release(addresses: Sequence[str], timeout: float = 30.0, interval: float = 0.25) -> bool:
+    deadline = time.monotonic() + timeout
+    while any(port_in_use(a) for a in addresses):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
 
 class LocalTS:
     def __init__(self,
@@ -45,6 +79,13 @@ class LocalTS:
         self.metrics_location = metrics_location
         self.log_config = log_config
         self.env = new_env
+        self._catalog: Optional[ModelStoreCatalog] = None
+
+    @property
+    def catalog(self) -> ModelStoreCatalog:
+        if self._catalog is None:
+            self._catalog = ModelStoreCatalog(self.model_store)
+        return self._catalog
 
     def check_version(self) -> Tuple[str, Union[str, Exception]]:
         try:
@@ -84,45 +125,39 @@ class LocalTS:
         else:
             return f"Torchserve is already started. Check {dashboard_log_path} for errors"
 
-    def stop_torchserve(self) -> Union[str, Exception]:
+    def stop_torchserve(self, wait_for: Sequence[str] = (), timeout: float = 30.0) -> Union[str, Exception]:
+        """Stop TorchServe. With ``wait_for`` addresses, only return once
+        their ports are released (or ``timeout`` runs out), so an immediate
+        restart doesn't fail to bind."""
         try:
             p = subprocess.run(["torchserve", "--stop"],
                                check=True,
                                stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE,
                                universal_newlines=True)
-            return p.stdout
         except (subprocess.CalledProcessError, OSError) as e:
             return e
+        if wait_for and not wait_for_port_release(wait_for, timeout):
+            return p.stdout + f"Ports still in use after {timeout:.0f}s: {', '.join(wait_for)}"
+        return p.stdout
 
     def get_model_store(self) -> List[str]:
-        return os.listdir(self.model_store)
+        # Only .mar archives, and only changed ones are re-opened
+        self.catalog.refresh()
+        return [e.file for e in self.catalog.entries()]
 
 
-class ManagementAPI:
-    def __init__(self, address: str, error_callback: Callable = None) -> None:
-        self.address = address
-        if not error_callback:
-            error_callback=self.default_error_callback
-        self.client = httpx.Client(timeout=1000,
-                                   event_hooks={"response": [error_callback]})
-    @staticmethod
-    def default_error_callback(response: Response) -> None:
-        if response.status_code != 200:
-            log.info(f"Warn - status code: {response.status_code},{response}")
+class _ManagementURLs:
+    """URL construction shared by the sync and async management clients."""
 
-    def get_loaded_models(self) -> Optional[Dict[str, Any]]:
-        try:
-            res = self.client.get(self.address + "/models")
-            return res.json()
-        except httpx.HTTPError:
-            return None
+    def __init__(self, address: str) -> None:
+        self.address = address
 
-    def get_model(self,
-                  model_name: str,
-                  version: Optional[str] = None,
-                  list_all: bool = False,
-                  custom_metadata: bool = False) -> List[Dict[str, Any]]:
+    def _model_url(self,
+                   model_name: str,
+                   version: Optional[str] = None,
+                   list_all: bool = False,
+                   custom_metadata: bool = False) -> str:
         req_url = self.address + "/models/" + model_name
         if version:
             req_url += "/" + version
@@ -130,12 +165,9 @@ class ManagementAPI:
             req_url += "/all"
         if custom_metadata:
             req_url += "?customized=true"
+        return req_url
 
-        res = self.client.get(req_url)
-        return res.json()
-
-    # Doesn't have version
-    def register_model(
+    def _register_model_url(
         self,
         mar_path: str,
         model_name: Optional[str] = None,
@@ -146,8 +178,7 @@ class ManagementAPI:
         initial_workers: Optional[int] = None,
         response_timeout: Optional[int] = None,
         is_encrypted: Optional[bool] = None,
-    ) -> Dict[str, str]:
-
+    ) -> str:
         req_url = self.address + "/models?url=" + mar_path + "&synchronous=false"
         if model_name:
             req_url += "&model_name=" + model_name
@@ -165,26 +196,150 @@ class ManagementAPI:
             req_url += "&response_timeout=" + str(response_timeout)
         if is_encrypted:
             req_url += "&s3_sse_kms=true"
+        return req_url
+
+    def _set_default_url(self, model_name: str, version: Optional[str] = None) -> str:
+        return self._model_url(model_name, version) + "/set-default"
+
+    def _scale_workers_url(self,
+                           model_name: str,
+                           version: Optional[str] = None,
+                           min_worker: Optional[int] = None,
+                           max_worker: Optional[int] = None,
+                           number_gpu: Optional[int] = None) -> str:
+        req_url = self._model_url(model_name, version)
+        req_url += "?synchronous=false"
+        if min_worker:
+            req_url += "&min_worker=" + str(min_worker)
+        if max_worker:
+            req_url += "&max_worker=" + str(max_worker)
+        if number_gpu:
+            req_url += "&number_gpu=" + str(number_gpu)
+        return req_url
+
+    def _register_workflow_url(self, url: str, workflow_name: Optional[str] = None) -> str:
+        req_url = self.address + "/workflows?url=" + url
+        if workflow_name:
+            req_url += "&workflow_name=" + workflow_name
+        return req_url
 
+    def _workflow_url(self, workflow_name: str) -> str:
+        return self.address + "/workflows/" + workflow_name
+
+    @staticmethod
+    def _page_params(req_url: str, limit: Optional[int] = None, next_page_token: Optional[str] = None) -> str:
+        params = []
+        if limit:
+            params.append("limit=" + str(limit))
+        if next_page_token:
+            params.append("next_page_token=" + str(next_page_token))
+        if params:
+            req_url += "?" + "&".join(params)
+        return req_url
+
+    def _list_models_url(self, limit: Optional[int] = None, next_page_token: Optional[str] = None) -> str:
+        return self._page_params(self.address + "/models", limit, next_page_token)
+
+    def _list_workflows_url(self, limit: Optional[int] = None, next_page_token: Optional[str] = None) -> str:
+        return self._page_params(self.address + "/workflows", limit, next_page_token)
+
+
+def paginate(fetch_page: Callable[[Optional[int], Optional[str]], Optional[Dict[str, Any]]],
+             key: str,
+             limit: int = 100) -> Iterator[Dict[str, Any]]:
+    """Yield items of a paginated listing (``/models``, ``/workflows``),
+    requesting the next page only when the previous one is consumed."""
+    next_page_token = None
+    while True:
+        page = fetch_page(limit, next_page_token)
+        if not page:
+            return
+        yield from page.get(key, [])
+        next_page_token = page.get("nextPageToken")
+        if not next_page_token:
+            return
+
+
+async def apaginate(fetch_page: Callable[[Optional[int], Optional[str]], Awaitable[Optional[Dict[str, Any]]]],
+                    key: str,
+                    limit: int = 100) -> AsyncIterator[Dict[str, Any]]:
+    next_page_token = None
+    while True:
+        page = await fetch_page(limit, next_page_token)
+        if not page:
+            return
+        for item in page.get(key, []):
+            yield item
+        next_page_token = page.get("nextPageToken")
+        if not next_page_token:
+            return
+
+
+class ManagementAPI(_ManagementURLs):
+    def __init__(self, address: str, error_callback: Callable = None) -> None:
+        super().__init__(address)
+        if not error_callback:
+            error_callback = self.default_error_callback
+        self.client = httpx.Client(timeout=1000,
+                                   transport=InstrumentedTransport("management"),
+                                   event_hooks={"response": [error_callback]})
+
+    @staticmethod
+    def default_error_callback(response: Response) -> None:
+        if response.status_code != 200:
+            log.info(f"Warn - status code: {response.status_code},{response}")
+
+    def get_loaded_models(self,
+                          limit: Optional[int] = None,
+                          next_page_token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        try:
+            res = self.client.get(self._list_models_url(limit, next_page_token))
+            return res.json()
+        except httpx.HTTPError:
+            return None
+
+    def iter_models(self, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        return paginate(self.get_loaded_models, "models", limit)
+
+    def get_model(self,
+                  model_name: str,
+                  version: Optional[str] = None,
+                  list_all: bool = False,
+                  custom_metadata: bool = False) -> List[Dict[str, Any]]:
+        req_url = self._model_url(model_name, version, list_all, custom_metadata)
+        res = self.client.get(req_url)
+        return res.json()
+
+    # Doesn't have version
+    def register_model(
+        self,
+        mar_path: str,
+        model_name: Optional[str] = None,
+        handler: Optional[str] = None,
+        runtime: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_delay: Optional[int] = None,
+        initial_workers: Optional[int] = None,
+        response_timeout: Optional[int] = None,
+        is_encrypted: Optional[bool] = None,
+    ) -> Dict[str, str]:
+        req_url = self._register_model_url(mar_path, model_name, handler, runtime, batch_size,
+                                           max_batch_delay, initial_workers, response_timeout,
+                                           is_encrypted)
         res = self.client.post(req_url)
         return res.json()
 
     def delete_model(self,
                      model_name: str,
                      version: Optional[str] = None) -> Dict[str, str]:
-        req_url = self.address + "/models/" + model_name
-        if version:
-            req_url += "/" + version
+        req_url = self._model_url(model_name, version)
         res = self.client.delete(req_url)
         return res.json()
 
     def change_model_default(self,
                              model_name: str,
                              version: Optional[str] = None):
-        req_url = self.address + "/models/" + model_name
-        if version:
-            req_url += "/" + version
-        req_url += "/set-default"
+        req_url = self._set_default_url(model_name, version)
         res = self.client.put(req_url)
         return res.json()
 
@@ -195,50 +350,216 @@ class ManagementAPI:
             min_worker: Optional[int] = None,
             max_worker: Optional[int] = None,
             number_gpu: Optional[int] = None) -> Dict[str, str]:
-        req_url = self.address + "/models/" + model_name
-        if version:
-            req_url += "/" + version
-        req_url += "?synchronous=false"
-        if min_worker:
-            req_url += "&min_worker=" + str(min_worker)
-        if max_worker:
-            req_url += "&max_worker=" + str(max_worker)
-        if number_gpu:
-            req_url += "&number_gpu=" + str(number_gpu)
+        req_url = self._scale_workers_url(model_name, version, min_worker, max_worker, number_gpu)
         res = self.client.put(req_url)
         return res.json()
 
     def register_workflow(self,
                           url: str,
                           workflow_name: Optional[str] = None) -> Dict[str, str]:
-        req_url = self.address + "/workflows/" + url
-        if workflow_name:
-            req_url += "&workflow_name=" + workflow_name
+        req_url = self._register_workflow_url(url, workflow_name)
         res = self.client.post(req_url)
         return res.json()
 
     def get_workflow(self, workflow_name: str) -> Dict[str, str]:
-        req_url = self.address + "/workflows/" + workflow_name
+        req_url = self._workflow_url(workflow_name)
         res = self.client.get(req_url)
         return res.json()
 
     def unregister_workflow(self, workflow_name: str) -> Dict[str, str]:
-        req_url = self.address + "/workflows/" + workflow_name
+        req_url = self._workflow_url(workflow_name)
         res = self.client.delete(req_url)
         return res.json()
 
     def list_workflows(
         self,
         limit: Optional[int] = None,
-        next_page_token: Optional[int] = None
+        next_page_token: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
-        req_url = self.address + "/workflows/"
-        if limit:
-            req_url += "&limit=" + str(limit)
-        if next_page_token:
-            req_url += "&next_page_token=" + str(next_page_token)
+        req_url = self._list_workflows_url(limit, next_page_token)
         try:
             res = self.client.get(req_url)
         except httpx.HTTPError:
             return None
         return res.json()
+
+    def iter_workflows(self, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        return paginate(self.list_workflows, "workflows", limit)
+
+
+class AsyncManagementAPI(_ManagementURLs):
+    """Non-blocking counterpart of :class:`ManagementAPI`.
+
+    Every method accepts an optional ``timeout`` (seconds) that overrides the
+    client default for that call. The connection pool is shared by all calls,
+    so the ``*_all`` helpers fan out over kept-alive connections instead of
+    paying one round-trip per model.
+    """
+
+    def __init__(self,
+                 address: str,
+                 error_callback: Callable = None,
+                 timeout: float = 30,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30) -> None:
+        super().__init__(address)
+        if not error_callback:
+            error_callback = ManagementAPI.default_error_callback
+        if not asyncio.iscoroutinefunction(error_callback):
+            error_callback = self._to_async_hook(error_callback)
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_keepalive_connections,
+                              keepalive_expiry=keepalive_expiry)
+        # Limits belong to the transport once a custom one is passed
+        transport = AsyncInstrumentedTransport("management", httpx.AsyncHTTPTransport(limits=limits))
+        self.client = httpx.AsyncClient(timeout=timeout,
+                                        transport=transport,
+                                        event_hooks={"response": [error_callback]})
+
+    @staticmethod
+    def _to_async_hook(callback: Callable) -> Callable:
+        async def hook(response: Response) -> None:
+            callback(response)
+        return hook
+
+    @staticmethod
+    def _timeout(timeout: Optional[float]) -> Dict[str, Any]:
+        # Omitting the argument keeps the client default, passing None disables it
+        return {"timeout": timeout} if timeout is not None else {}
+
+    async def __aenter__(self) -> "AsyncManagementAPI":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def get_loaded_models(self,
+                                limit: Optional[int] = None,
+                                next_page_token: Optional[str] = None,
+                                timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            res = await self.client.get(self._list_models_url(limit, next_page_token), **self._timeout(timeout))
+            return res.json()
+        except httpx.HTTPError:
+            return None
+
+    def iter_models(self, limit: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        return apaginate(self.get_loaded_models, "models", limit)
+
+    async def get_model(self,
+                        model_name: str,
+                        version: Optional[str] = None,
+                        list_all: bool = False,
+                        custom_metadata: bool = False,
+                        timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        req_url = self._model_url(model_name, version, list_all, custom_metadata)
+        res = await self.client.get(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def describe_all(self,
+                           model_names: List[str],
+                           list_all: bool = False,
+                           timeout: Optional[float] = None,
+                           concurrency: Optional[int] = DESCRIBE_CONCURRENCY
+                           ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """Describe every model in ``model_names``, at most ``concurrency`` at a time (all at once if None).
+
+        Models that fail to describe map to ``None`` instead of failing the batch.
+        """
+        semaphore = asyncio.Semaphore(concurrency or max(1, len(model_names)))
+
+        async def describe(model_name: str) -> Optional[List[Dict[str, Any]]]:
+            async with semaphore:
+                try:
+                    return await self.get_model(model_name, list_all=list_all, timeout=timeout)
+                except (httpx.HTTPError, ValueError) as e:
+                    log.info(f"Warn - could not describe {model_name}: {e}")
+                    return None
+
+        results = await asyncio.gather(*[describe(m) for m in model_names])
+        return dict(zip(model_names, results))
+
+    async def register_model(
+        self,
+        mar_path: str,
+        model_name: Optional[str] = None,
+        handler: Optional[str] = None,
+        runtime: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_delay: Optional[int] = None,
+        initial_workers: Optional[int] = None,
+        response_timeout: Optional[int] = None,
+        is_encrypted: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, str]:
+        req_url = self._register_model_url(mar_path, model_name, handler, runtime, batch_size,
+                                           max_batch_delay, initial_workers, response_timeout,
+                                           is_encrypted)
+        res = await self.client.post(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def delete_model(self,
+                           model_name: str,
+                           version: Optional[str] = None,
+                           timeout: Optional[float] = None) -> Dict[str, str]:
+        req_url = self._model_url(model_name, version)
+        res = await self.client.delete(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def change_model_default(self,
+                                   model_name: str,
+                                   version: Optional[str] = None,
+                                   timeout: Optional[float] = None):
+        req_url = self._set_default_url(model_name, version)
+        res = await self.client.put(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def change_model_workers(
+            self,
+            model_name: str,
+            version: Optional[str] = None,
+            min_worker: Optional[int] = None,
+            max_worker: Optional[int] = None,
+            number_gpu: Optional[int] = None,
+            timeout: Optional[float] = None) -> Dict[str, str]:
+        req_url = self._scale_workers_url(model_name, version, min_worker, max_worker, number_gpu)
+        res = await self.client.put(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def register_workflow(self,
+                                url: str,
+                                workflow_name: Optional[str] = None,
+                                timeout: Optional[float] = None) -> Dict[str, str]:
+        req_url = self._register_workflow_url(url, workflow_name)
+        res = await self.client.post(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def get_workflow(self, workflow_name: str, timeout: Optional[float] = None) -> Dict[str, str]:
+        req_url = self._workflow_url(workflow_name)
+        res = await self.client.get(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def unregister_workflow(self, workflow_name: str, timeout: Optional[float] = None) -> Dict[str, str]:
+        req_url = self._workflow_url(workflow_name)
+        res = await self.client.delete(req_url, **self._timeout(timeout))
+        return res.json()
+
+    async def list_workflows(
+        self,
+        limit: Optional[int] = None,
+        next_page_token: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        req_url = self._list_workflows_url(limit, next_page_token)
+        try:
+            res = await self.client.get(req_url, **self._timeout(timeout))
+        except httpx.HTTPError:
+            return None
+        return res.json()
+
+    def iter_workflows(self, limit: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        return apaginate(self.list_workflows, "workflows", limit)
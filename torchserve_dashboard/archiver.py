@@ -0,0 +1,378 @@
+"""Build ``.mar`` archives without ``torch-model-archiver``.
+
+The archive is the same zip ``torch-model-archiver`` writes: the serialized
+model, handler and extra files at the root plus ``MAR-INF/MANIFEST.json``.
+It is written by a small zip writer of our own so that large members can be
+deflated on several threads (zlib releases the GIL) and streamed from disk,
+with zip64 records once a member or the archive passes 4 GiB.
+"""
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from torchserve_dashboard import __version__
+from torchserve_dashboard.catalog import MANIFEST_PATH
+
+import logging
+
+log = logging.getLogger(__name__)
+
+COMPRESSION = ("auto", "deflate", "store")
+CHUNK_SIZE = 4 << 20
+# Deflate back-references reach at most 32 KiB, so priming each chunk with the
+# previous 32 KiB keeps the ratio close to a single-threaded stream
+_WINDOW = 32 << 10
+# "auto" stores a member if a deflated sample doesn't get below this ratio. Float weights
+# typically land around 0.93 at several times the cost of storing them
+_STORE_RATIO = 0.9
+_SAMPLE_SIZE = 1 << 20
+
+# Values from which zip64 records are used
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+# What the 32 and 16 bit fields hold when the real value is in a zip64 record
+_MAX32, _MAX16 = 0xFFFFFFFF, 0xFFFF
+_STORED, _DEFLATED = 0, 8
+_UTF8 = 1 << 11
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ArchiveMember(NamedTuple):
+    arcname: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None  # generated members, e.g. the manifest
+
+    @property
+    def size(self) -> int:
+        return len(self.data) if self.data is not None else os.path.getsize(self.path)
+
+
+class ArchiveResult(NamedTuple):
+    path: str
+    members: List[Tuple[str, int, int, str]]  # arcname, size, compressed size, method
+    size: int
+    seconds: float
+
+    @property
+    def bytes_in(self) -> int:
+        return sum(m[1] for m in self.members)
+
+    def as_row(self) -> Dict[str, Any]:
+        return {"archive": os.path.basename(self.path), "members": len(self.members),
+                "MiB in": round(self.bytes_in / 2**20, 1), "MiB out": round(self.size / 2**20, 1),
+                "seconds": round(self.seconds, 1),
+                "MiB/s": round(self.bytes_in / 2**20 / self.seconds, 1) if self.seconds else None}
+
+
+def manifest(model_name: str,
+             version: str,
+             serialized_file: Optional[str],
+             handler: str,
+             model_file: Optional[str] = None,
+             requirements_file: Optional[str] = None,
+             runtime: str = "python") -> Dict[str, Any]:
+    """``MAR-INF/MANIFEST.json`` the way ``torch-model-archiver`` lays it out; files are named by basename."""
+    model = {"modelName": model_name, "handler": _handler_name(handler), "modelVersion": version}
+    if serialized_file:
+        model["serializedFile"] = os.path.basename(serialized_file)
+    if model_file:
+        model["modelFile"] = os.path.basename(model_file)
+    if requirements_file:
+        model["requirementsFile"] = os.path.basename(requirements_file)
+    return {
+        "createdOn": time.strftime("%d/%m/%Y %H:%M:%S"),
+        "runtime": runtime,
+        "model": model,
+        "archiverVersion": f"torchserve-dashboard {__version__}",
+    }
+
+
+def _handler_name(handler: str) -> str:
+    # A handler file is shipped in the archive; anything else is a built-in handler name
+    return os.path.basename(handler) if os.path.isfile(handler) else handler
+
+
+def _expand(paths: Iterable[str]) -> List[ArchiveMember]:
+    """Files as themselves, directories as their contents (like ``--extra-files``)."""
+    members = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    members.append(ArchiveMember(os.path.relpath(full, path).replace(os.sep, "/"), full))
+        elif os.path.isfile(path):
+            members.append(ArchiveMember(os.path.basename(path), path))
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return members
+
+
+def _dos_time(timestamp: float) -> Tuple[int, int]:
+    t = time.localtime(max(timestamp, 315532800))  # zip can't represent anything before 1980
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), \
+        ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class _Entry(NamedTuple):
+    name: bytes
+    method: int
+    dos_time: int
+    dos_date: int
+    crc: int
+    compressed: int
+    size: int
+    offset: int
+    mode: int
+
+
+class ZipWriter:
+    """Streaming zip writer for a seekable file, with zip64 where needed.
+
+    Each member's local header is written first and patched with the CRC and
+    sizes once its data is written, so nothing is buffered beyond the chunks
+    being compressed.
+    """
+
+    def __init__(self, f: IO[bytes], workers: int = 0, level: int = 6, chunk_size: int = CHUNK_SIZE,
+                 progress: Optional[ProgressCallback] = None, total: int = 0) -> None:
+        self.f = f
+        self.level = level
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self.total = total
+        self.done = 0
+        self.entries: List[_Entry] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque[Tuple[int, "Future[bytes]"]] = deque()
+
+    def __enter__(self) -> "ZipWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._pool is not None:
+            # By hand, shutdown(cancel_futures=True) needs Python 3.9
+            for _, future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._pool.shutdown(wait=True)
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="archiver")
+        return self._pool
+
+    def _advance(self, n: int) -> None:
+        self.done += n
+        if self.progress:
+            self.progress(self.done, self.total)
+
+    def choose_method(self, member: ArchiveMember, compression: str) -> int:
+        if compression == "store":
+            return _STORED
+        if compression == "deflate" or member.size < _SAMPLE_SIZE:
+            return _DEFLATED
+        # Checkpoints saved with compression, or already-zipped data, only get bigger and slower to deflate
+        if member.data is not None:
+            sample = member.data[:_SAMPLE_SIZE]
+        else:
+            with open(member.path, "rb") as f:
+                sample = f.read(_SAMPLE_SIZE)
+        return _STORED if len(zlib.compress(sample, 1)) > _STORE_RATIO * len(sample) else _DEFLATED
+
+    def add(self, member: ArchiveMember, compression: str = "auto") -> _Entry:
+        size = member.size
+        method = self.choose_method(member, compression)
+        offset = self.f.tell()
+        name = member.arcname.encode("utf-8")
+        stat = os.stat(member.path) if member.path else None
+        dos_time, dos_date = _dos_time(stat.st_mtime if stat else time.time())
+        # Decided up front, the local header has to have room for the sizes; deflate can grow data slightly
+        zip64 = size + size // 16 + 1024 > _ZIP64_LIMIT
+        self._local_header(name, method, dos_time, dos_date, 0, 0, 0, zip64)
+        data_start = self.f.tell()
+        crc = self._write_data(member, method)
+        compressed = self.f.tell() - data_start
+        end = self.f.tell()
+        self.f.seek(offset)
+        self._local_header(name, method, dos_time, dos_date, crc, compressed, size, zip64)
+        self.f.seek(end)
+        mode = (stat.st_mode & 0o7777) if stat else 0o644
+        entry = _Entry(name, method, dos_time, dos_date, crc, compressed, size, offset, mode)
+        self.entries.append(entry)
+        return entry
+
+    def _local_header(self, name: bytes, method: int, dos_time: int, dos_date: int, crc: int,
+                      compressed: int, size: int, zip64: bool) -> None:
+        extra = struct.pack("<HHQQ", 0x0001, 16, size, compressed) if zip64 else b""
+        self.f.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, 45 if zip64 else 20, _UTF8, method, dos_time, dos_date,
+                                 crc, _MAX32 if zip64 else compressed, _MAX32 if zip64 else size,
+                                 len(name), len(extra)))
+        self.f.write(name)
+        self.f.write(extra)
+
+    def _chunks(self, member: ArchiveMember) -> Iterable[bytes]:
+        if member.data is not None:
+            yield member.data
+            return
+        with open(member.path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                yield chunk
+
+    def _write_data(self, member: ArchiveMember, method: int) -> int:
+        crc = 0
+        if method == _STORED:
+            for chunk in self._chunks(member):
+                crc = zlib.crc32(chunk, crc)
+                self.f.write(chunk)
+                self._advance(len(chunk))
+            return crc
+        # Compressed in order-preserving parallel chunks, at most two per worker in memory
+        pending = self._pending
+        tail = b""
+        for chunk in self._chunks(member):
+            crc = zlib.crc32(chunk, crc)
+            if len(pending) >= 2 * self.workers:
+                self._write_compressed(pending.popleft())
+            pending.append((len(chunk), self.pool.submit(_deflate, chunk, tail, self.level, False)))
+            tail = chunk[-_WINDOW:]
+        # Finishing the stream: an empty final block after the byte-aligned sync-flushed ones
+        pending.append((0, self.pool.submit(_deflate, b"", tail, self.level, True)))
+        while pending:
+            self._write_compressed(pending.popleft())
+        return crc
+
+    def _write_compressed(self, item: Tuple[int, "Future[bytes]"]) -> None:
+        size, future = item
+        self.f.write(future.result())
+        self._advance(size)
+
+    def close(self) -> None:
+        """Write the central directory."""
+        cd_start = self.f.tell()
+        for e in self.entries:
+            extra_fields = []
+            size, compressed, offset = e.size, e.compressed, e.offset
+            if e.size > _ZIP64_LIMIT:
+                extra_fields.append(e.size)
+                size = _MAX32
+            if e.compressed > _ZIP64_LIMIT:
+                extra_fields.append(e.compressed)
+                compressed = _MAX32
+            if e.offset > _ZIP64_LIMIT:
+                extra_fields.append(e.offset)
+                offset = _MAX32
+            extra = struct.pack(f"<HH{len(extra_fields)}Q", 0x0001, 8 * len(extra_fields),
+                                *extra_fields) if extra_fields else b""
+            version = 45 if extra_fields else 20
+            self.f.write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | version, version, _UTF8, e.method,
+                                     e.dos_time, e.dos_date, e.crc, compressed, size, len(e.name), len(extra), 0, 0,
+                                     0, (0o100000 | e.mode) << 16, offset))
+            self.f.write(e.name)
+            self.f.write(extra)
+        cd_end = self.f.tell()
+        count, cd_size = len(self.entries), cd_end - cd_start
+        if count > _ZIP64_COUNT_LIMIT or cd_size > _ZIP64_LIMIT or cd_start > _ZIP64_LIMIT:
+            self.f.write(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, cd_size, cd_start))
+            self.f.write(struct.pack("<IIQI", 0x07064B50, 0, cd_end, 1))
+            count, cd_size, cd_start = _MAX16, _MAX32, _MAX32
+        self.f.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_start, 0))
+
+
+def _deflate(data: bytes, primer: bytes, level: int, last: bool) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=primer) if primer else \
+        zlib.compressobj(level, zlib.DEFLATED, -15)
+    # A sync flush ends on a byte boundary without closing the stream, so chunks can be concatenated
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def write_archive(path: str,
+                  members: Sequence[ArchiveMember],
+                  compression: str = "auto",
+                  level: int = 6,
+                  workers: int = 0,
+                  chunk_size: int = CHUNK_SIZE,
+                  overwrite: bool = False,
+                  progress: Optional[ProgressCallback] = None) -> ArchiveResult:
+    """Write ``members`` to a zip at ``path``, atomically.
+
+    The archive is built in a hidden temporary file next to ``path`` and
+    renamed over it when complete, so a model store scan never sees half an
+    archive and a failed build leaves nothing behind.
+    """
+    if compression not in COMPRESSION:
+        raise ValueError(f"compression must be one of {COMPRESSION}, not {compression!r}")
+    names = [m.arcname for m in members]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Several files would be archived as {', '.join(duplicates)}")
+    if os.path.exists(path) and not overwrite:
+        raise FileExistsError(f"{path} already exists")
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f, ZipWriter(f, workers, level, chunk_size, progress,
+                                                 sum(m.size for m in members)) as writer:
+            entries = [writer.add(m, compression) for m in members]
+            writer.close()
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return ArchiveResult(path,
+                         [(e.name.decode("utf-8"), e.size, e.compressed, "store" if e.method == _STORED else "deflate")
+                          for e in entries],
+                         os.path.getsize(path), time.perf_counter() - started)
+
+
+def build_mar(model_name: str,
+              version: str,
+              export_path: str,
+              handler: str,
+              serialized_file: Optional[str] = None,
+              model_file: Optional[str] = None,
+              extra_files: Sequence[str] = (),
+              requirements_file: Optional[str] = None,
+              runtime: str = "python",
+              compression: str = "auto",
+              level: int = 6,
+              workers: int = 0,
+              overwrite: bool = False,
+              progress: Optional[ProgressCallback] = None) -> ArchiveResult:
+    """Package a model into ``<export_path>/<model_name>.mar``, like ``torch-model-archiver``.
+
+    ``compression`` applies per member: "auto" stores members that don't
+    deflate (compressed checkpoints) and deflates the rest, ``workers``
+    threads share the deflating (0 = one per CPU).
+    """
+    if not serialized_file and not model_file:
+        raise ValueError("Need a serialized file or a model file")
+    files = [p for p in (serialized_file, model_file, handler if os.path.isfile(handler) else None,
+                         requirements_file) if p]
+    members = _expand(files) + _expand(extra_files)
+    content = json.dumps(manifest(model_name, version, serialized_file, handler, model_file, requirements_file,
+                                  runtime), indent=2).encode()
+    members.append(ArchiveMember(MANIFEST_PATH, data=content))
+    path = os.path.join(export_path, f"{model_name}.mar")
+    result = write_archive(path, members, compression, level, workers, overwrite=overwrite, progress=progress)
+    log.info(f"Archived {model_name} {version} to {path}: {result.bytes_in / 2**20:.1f} MiB in "
+             f"{result.seconds:.1f}s")
+    return result
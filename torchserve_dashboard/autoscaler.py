@@ -0,0 +1,231 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+
+from torchserve_dashboard.api import ManagementAPI
+from torchserve_dashboard.metrics import (DEFAULT_VERSION_LABEL, LATENCY_METRIC, QUEUE_LATENCY_METRIC,
+                                          REQUESTS_METRIC, MetricsStore)
+from torchserve_dashboard.poller import StateSnapshot
+
+import logging
+
+log = logging.getLogger(__name__)
+
+HOLD, SCALE_UP, SCALE_DOWN = "hold", "scale_up", "scale_down"
+
+
+class ScalingBounds(NamedTuple):
+    min_workers: int = 1
+    max_workers: int = 4
+
+
+class AutoscalerPolicy(NamedTuple):
+    window: float = 120.0  # seconds of metrics each decision looks at
+    target_utilization: float = 0.7  # busy fraction per worker to size for
+    scale_up_utilization: float = 0.85  # the gap between these two is the hysteresis band
+    scale_down_utilization: float = 0.4
+    max_queue_ms: float = 50.0  # mean queue time per request that forces a scale up
+    scale_up_cooldown: float = 60.0
+    scale_down_cooldown: float = 600.0
+    max_step: int = 2  # workers added or removed per decision
+
+
+class ModelLoad(NamedTuple):
+    requests_per_s: float
+    busy_workers: float  # average number of requests being processed (Little's law)
+    pending: float  # average number of requests waiting in the queue
+    queue_ms: float  # mean queue time per request
+
+
+class ScalingDecision(NamedTuple):
+    time: float
+    model: str
+    version: str
+    current: int
+    desired: int
+    action: str
+    reason: str
+    utilization: float = math.nan
+    queue_ms: float = math.nan
+    dry_run: bool = True
+    error: Optional[str] = None
+
+
+def model_load(store: MetricsStore, model: str, version: str, since: float) -> Optional[ModelLoad]:
+    """Load of the default ``version`` of ``model`` from scraped counters, ``None`` without enough scrapes."""
+    ts, _ = store.series(REQUESTS_METRIC)
+    ts = ts[np.isfinite(ts) & (ts >= since)]
+    if len(ts) < 2:
+        return None
+    elapsed = float(ts[-1] - ts[0])
+    if elapsed <= 0:
+        return None
+    labels = (version, DEFAULT_VERSION_LABEL)
+
+    def increase(metric: str) -> float:
+        return sum(store.increase(metric, model, v, since) for v in labels)
+
+    requests = increase(REQUESTS_METRIC)
+    busy_us = increase(LATENCY_METRIC)
+    queue_us = increase(QUEUE_LATENCY_METRIC)
+    return ModelLoad(requests / elapsed, busy_us / 1e6 / elapsed, queue_us / 1e6 / elapsed,
+                     queue_us / requests / 1000.0 if requests else 0.0)
+
+
+class Autoscaler:
+    """Scales each model's default version between :class:`ScalingBounds`.
+
+    Every ``interval`` seconds the load over the last ``policy.window``
+    seconds is read from the metrics API counters: per-worker utilization is
+    the inference time accumulated per second divided by the worker count,
+    pending requests the queue time accumulated per second. Utilization
+    above ``scale_up_utilization`` or queue time above ``max_queue_ms`` adds
+    workers; utilization below ``scale_down_utilization`` with a short queue
+    removes them, and anything in between holds. Separate cooldowns keep a
+    brief spike from flapping the worker count.
+
+    Decisions are always logged (``audit_path`` is JSON lines); they are only
+    applied when ``dry_run`` is off.
+    """
+
+    def __init__(self,
+                 api: ManagementAPI,
+                 store: MetricsStore,
+                 snapshot: Callable[[], Optional[StateSnapshot]],
+                 policy: AutoscalerPolicy = AutoscalerPolicy(),
+                 interval: float = 30.0,
+                 dry_run: bool = True,
+                 audit_path: Optional[str] = None,
+                 max_decisions: int = 1000) -> None:
+        self.api = api
+        self.store = store
+        self.snapshot = snapshot
+        self.policy = policy
+        self.interval = interval
+        self.dry_run = dry_run
+        self.audit_path = audit_path
+        self.bounds: Dict[str, ScalingBounds] = {}
+        self.decisions: Deque[ScalingDecision] = deque(maxlen=max_decisions)
+        self._last_change: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_bounds(self, model: str, bounds: Optional[ScalingBounds]) -> None:
+        with self._lock:
+            if bounds is None:
+                self.bounds.pop(model, None)
+            else:
+                self.bounds[model] = bounds
+
+    def decide(self, model: str, version: str, current: int, load: Optional[ModelLoad],
+               now: float) -> ScalingDecision:
+        bounds, policy = self.bounds[model], self.policy
+
+        def decision(desired: int, action: str, reason: str, utilization: float = math.nan) -> ScalingDecision:
+            return ScalingDecision(now, model, version, current, desired, action, reason, utilization,
+                                   load.queue_ms if load else math.nan, self.dry_run)
+
+        # Bounds win over everything, e.g. right after they were edited
+        if current < bounds.min_workers or current > bounds.max_workers:
+            desired = min(max(current, bounds.min_workers), bounds.max_workers)
+            return decision(desired, SCALE_UP if desired > current else SCALE_DOWN, "outside bounds")
+        if load is None:
+            return decision(current, HOLD, "not enough metrics in the window")
+        utilization = load.busy_workers / current if current else math.inf
+        needed = math.ceil(load.busy_workers / policy.target_utilization) if load.busy_workers else bounds.min_workers
+        since_change = now - self._last_change.get(model, 0.0)
+        if utilization > policy.scale_up_utilization or load.queue_ms > policy.max_queue_ms:
+            desired = min(max(needed, current + 1), current + policy.max_step, bounds.max_workers)
+            reason = (f"utilization {utilization:.0%}, queue {load.queue_ms:.1f} ms, "
+                      f"{load.pending:.1f} pending")
+            if desired <= current:
+                return decision(current, HOLD, f"{reason}, already at max_workers", utilization)
+            if since_change < policy.scale_up_cooldown:
+                return decision(current, HOLD, f"{reason}, scale-up cooldown", utilization)
+            return decision(desired, SCALE_UP, reason, utilization)
+        if utilization < policy.scale_down_utilization and load.queue_ms <= policy.max_queue_ms / 2:
+            desired = max(needed, current - policy.max_step, bounds.min_workers)
+            reason = f"utilization {utilization:.0%}, {load.requests_per_s:.1f} req/s"
+            if desired >= current:
+                return decision(current, HOLD, f"{reason}, already at min_workers", utilization)
+            if since_change < policy.scale_down_cooldown:
+                return decision(current, HOLD, f"{reason}, scale-down cooldown", utilization)
+            return decision(desired, SCALE_DOWN, reason, utilization)
+        return decision(current, HOLD, f"utilization {utilization:.0%} within band", utilization)
+
+    def _apply(self, decision: ScalingDecision) -> ScalingDecision:
+        try:
+            res = self.api.change_model_workers(decision.model, decision.version, min_worker=decision.desired,
+                                                max_worker=decision.desired)
+        except (httpx.HTTPError, ValueError) as e:
+            return decision._replace(error=str(e))
+        if isinstance(res, dict) and res.get("code", 200) >= 400:
+            return decision._replace(error=res.get("message", str(res)))
+        self._last_change[decision.model] = decision.time
+        return decision
+
+    def _audit(self, decisions: List[ScalingDecision]) -> None:
+        self.decisions.extend(decisions)
+        if not self.audit_path:
+            return
+        try:
+            with open(self.audit_path, "a") as f:
+                for d in decisions:
+                    f.write(json.dumps(d._asdict()) + "\n")
+        except OSError as e:
+            log.info(f"Warn - can't write autoscaler audit log {self.audit_path}: {e}")
+
+    def step(self, now: Optional[float] = None) -> List[ScalingDecision]:
+        """Make (and unless in dry-run, apply) one decision per configured model."""
+        now = time.time() if now is None else now
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return []
+        with self._lock:
+            # Error bodies (the model failed to describe) are skipped, not just missing models
+            models = [m for m in self.bounds if isinstance(snapshot.descriptions.get(m), list)
+                      and snapshot.descriptions[m]]
+        decisions = []
+        for model in models:
+            description = snapshot.descriptions[model][0]
+            version = str(description.get("modelVersion"))
+            current = len(description.get("workers", []))
+            load = model_load(self.store, model, version, now - self.policy.window)
+            decision = self.decide(model, version, current, load, now)
+            if decision.action != HOLD:
+                if not self.dry_run:
+                    decision = self._apply(decision)
+                else:
+                    # Pretend it happened so dry runs show the cooldowns too
+                    self._last_change[model] = now
+            decisions.append(decision)
+        self._audit(decisions)
+        return decisions
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.step()
+            except Exception as e:
+                log.info(f"Warn - autoscaler step failed: {e}")
+
+    def start(self) -> "Autoscaler":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="torchserve-autoscaler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
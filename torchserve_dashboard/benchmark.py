@@ -0,0 +1,246 @@
+import asyncio
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from torchserve_dashboard.instrumentation import AsyncInstrumentedTransport
+
+REPORTED_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in the spirit of HdrHistogram.
+
+    Values are recorded in microseconds with ``significant_figures`` of
+    precision across the whole range, in constant memory: each power of two
+    is split into the same number of linear sub-buckets.
+    """
+
+    def __init__(self, max_value_s: float = 600.0, significant_figures: int = 2) -> None:
+        self.sub_bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self.half = 1 << (self.sub_bits - 1)
+        self.max_value = int(max_value_s * 1e6)
+        self.counts = np.zeros(self._index(self.max_value) + 1, dtype=np.int64)
+        self.total = 0
+        self.min = math.inf
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self.sub_bits)
+        return bucket * self.half + (value >> bucket)
+
+    def _value(self, index: int) -> int:
+        # Upper edge of the sub-bucket, so percentiles never under-report
+        bucket = max(0, index // self.half - 1)
+        sub = index - bucket * self.half
+        return ((sub + 1) << bucket) - 1
+
+    def record(self, seconds: float) -> None:
+        value = min(max(int(seconds * 1e6), 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """Latency in milliseconds at percentile ``p`` (0-100)."""
+        if not self.total:
+            return math.nan
+        rank = max(1, math.ceil(p / 100.0 * self.total))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self._value(index), self.max) / 1000.0
+
+    def mean(self) -> float:
+        if not self.total:
+            return math.nan
+        nonzero = np.flatnonzero(self.counts)
+        values = np.array([self._value(i) for i in nonzero], dtype=np.float64)
+        return float((values * self.counts[nonzero]).sum() / self.total / 1000.0)
+
+    def distribution(self) -> List[Dict[str, float]]:
+        """Percentile spectrum, like HdrHistogram's output, for export."""
+        return [{"percentile": p, "latency_ms": self.percentile(p)}
+                for p in (0, 10, 25, 50, 75, 90, 95, 99, 99.5, 99.9, 99.99, 100)]
+
+
+class BenchmarkResult:
+    def __init__(self, model_name: str, version: Optional[str], mode: str, concurrency: int,
+                 target_rps: Optional[float]) -> None:
+        self.model_name = model_name
+        self.version = version
+        self.mode = mode
+        self.concurrency = concurrency
+        self.target_rps = target_rps
+        self.histogram = LatencyHistogram()
+        self.status_codes: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.duration = 0.0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.status_codes.values()) + sum(self.errors.values())
+
+    @property
+    def successes(self) -> int:
+        return sum(c for s, c in self.status_codes.items() if 200 <= s < 300)
+
+    @property
+    def failures(self) -> int:
+        return self.requests - self.successes
+
+    @property
+    def throughput(self) -> float:
+        # Goodput: a server quickly failing requests mustn't look fast
+        return self.successes / self.duration if self.duration else 0.0
+
+    @property
+    def attempted_rate(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "version": self.version,
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "target_rps": self.target_rps,
+            "requests": self.requests,
+            "failures": self.failures,
+            "duration_s": round(self.duration, 3),
+            "attempted_rps": round(self.attempted_rate, 2),
+            "throughput_rps": round(self.throughput, 2),
+            "mean_ms": self.histogram.mean(),
+            **{f"p{p:g}_ms": self.histogram.percentile(p) for p in REPORTED_PERCENTILES},
+            "max_ms": self.histogram.max / 1000.0 if self.histogram.total else math.nan,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "summary": self.summary(),
+            "status_codes": {str(k): v for k, v in self.status_codes.items()},
+            "errors": dict(self.errors),
+            "distribution": self.histogram.distribution(),
+        }, indent=2)
+
+    def to_csv(self) -> str:
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=["percentile", "latency_ms"])
+        writer.writeheader()
+        writer.writerows(self.histogram.distribution())
+        return out.getvalue()
+
+
+def load_payloads(sample_dir: str) -> List[bytes]:
+    payloads = []
+    for name in sorted(os.listdir(sample_dir)):
+        path = os.path.join(sample_dir, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                payloads.append(f.read())
+    return payloads
+
+
+def predictions_url(inference_address: str, model_name: str, version: Optional[str] = None) -> str:
+    req_url = inference_address + "/predictions/" + model_name
+    if version:
+        req_url += "/" + version
+    return req_url
+
+
+async def run_benchmark(inference_address: str,
+                        model_name: str,
+                        payloads: List[bytes],
+                        version: Optional[str] = None,
+                        concurrency: int = 8,
+                        rps: Optional[float] = None,
+                        duration: float = 30.0,
+                        max_requests: Optional[int] = None,
+                        timeout: float = 60.0,
+                        grpc_target: Optional[str] = None) -> BenchmarkResult:
+    """Fire load at ``/predictions/<model>[/<version>]``.
+
+    Without ``rps`` this is a closed loop: ``concurrency`` workers each send
+    the next request as soon as the previous one returns. With ``rps``
+    requests are started on a fixed schedule regardless of how fast the
+    server answers (open loop), and latency is measured from the scheduled
+    start so queueing on our side isn't hidden (coordinated omission).
+
+    Latency and throughput only count 2xx responses; errors and failed
+    requests show up in ``failures`` and the attempted rate.
+
+    With ``grpc_target`` (``host:port`` of the gRPC inference service)
+    requests go over one multiplexed gRPC channel instead of a pool of
+    HTTP/1.1 connections; gRPC errors are counted under the equivalent
+    HTTP status code.
+    """
+    if not payloads:
+        raise ValueError("At least one payload is needed")
+    mode = "open" if rps else "closed"
+    result = BenchmarkResult(model_name, version, mode, concurrency, rps)
+    url = predictions_url(inference_address, model_name, version)
+    next_payload = itertools.cycle(payloads).__next__
+    if grpc_target:
+        import grpc
+
+        from torchserve_dashboard.grpc_api import GrpcInferenceClient, http_status
+        client = GrpcInferenceClient(grpc_target, timeout=timeout)
+
+        async def post(payload: bytes) -> int:
+            try:
+                await client.predict(model_name, payload, version)
+            except grpc.RpcError as e:
+                return http_status(e.code())
+            return 200
+    else:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        transport = AsyncInstrumentedTransport("inference", httpx.AsyncHTTPTransport(limits=limits))
+        client = httpx.AsyncClient(timeout=timeout, transport=transport)
+
+        async def post(payload: bytes) -> int:
+            return (await client.post(url, content=payload)).status_code
+
+    async with client:
+        async def send(started: float) -> None:
+            try:
+                status = await post(next_payload())
+            except httpx.HTTPError as e:
+                result.errors[type(e).__name__] += 1
+                return
+            result.status_codes[status] += 1
+            if 200 <= status < 300:
+                result.histogram.record(time.perf_counter() - started)
+
+        begin = time.perf_counter()
+        deadline = begin + duration
+        if mode == "closed":
+            sent = itertools.count()
+
+            async def worker() -> None:
+                while time.perf_counter() < deadline and (max_requests is None or next(sent) < max_requests):
+                    await send(time.perf_counter())
+
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+        else:
+            in_flight = set()
+            interval = 1.0 / rps
+            for i in itertools.count():
+                scheduled = begin + i * interval
+                if scheduled >= deadline or (max_requests is not None and i >= max_requests):
+                    break
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                task = asyncio.ensure_future(send(scheduled))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        result.duration = time.perf_counter() - begin
+    return result
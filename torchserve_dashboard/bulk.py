@@ -0,0 +1,267 @@
+import asyncio
+import csv
+import io
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import httpx
+
+from torchserve_dashboard.api import AsyncManagementAPI
+from torchserve_dashboard.catalog import ModelStoreCatalog
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# "Model "resnet-18" Version: 1.0 registered with 1 initial workers"
+_REGISTERED = re.compile(r'Model "(?P<name>[^"]+)" Version: (?P<version>\S+)')
+
+_INT_FIELDS = ("batch_size", "max_batch_delay", "initial_workers", "response_timeout", "min_worker", "max_worker")
+
+
+class BulkItem(NamedTuple):
+    url: str
+    model_name: Optional[str] = None
+    handler: Optional[str] = None
+    runtime: Optional[str] = None
+    batch_size: Optional[int] = None
+    max_batch_delay: Optional[int] = None
+    initial_workers: Optional[int] = None
+    response_timeout: Optional[int] = None
+    min_worker: Optional[int] = None
+    max_worker: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        return self.model_name or os.path.basename(self.url)
+
+    @property
+    def expected_workers(self) -> int:
+        return max(self.min_worker or 0, self.initial_workers or 0)
+
+
+class BulkProgress(NamedTuple):
+    index: int
+    item: BulkItem
+    state: str  # registering, retrying, scaling, waiting, ready, failed
+    message: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("ready", "failed")
+
+
+def _item_from_row(row: Any) -> BulkItem:
+    if not isinstance(row, dict):
+        raise ValueError(f"expected a mapping of {', '.join(BulkItem._fields)}, got {row!r}")
+    fields = {}
+    for k, v in row.items():
+        if k not in BulkItem._fields or v is None or (isinstance(v, str) and not v.strip()):
+            continue
+        try:
+            fields[k] = int(v) if k in _INT_FIELDS else str(v).strip()
+        except (TypeError, ValueError):
+            raise ValueError(f"{k} is not an integer: {v!r}")
+    if "url" not in fields:
+        raise ValueError(f"no url: {row}")
+    return BulkItem(**fields)
+
+
+def load_manifest(text: str, fmt: str = "yaml") -> List[BulkItem]:
+    """Parse a YAML (list of entries or ``{"models": [...]}``) or CSV manifest.
+
+    Columns/keys are :class:`BulkItem` fields; only ``url`` is required.
+    """
+    if fmt == "csv":
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML manifests need PyYAML: pip install pyyaml")
+        rows = yaml.safe_load(text) or []
+        if isinstance(rows, dict):
+            rows = rows.get("models", [])
+    if not isinstance(rows, list):
+        raise ValueError(f"expected a list of entries, got {rows!r}")
+    # Every bad entry is reported, not just the first
+    items, errors = [], []
+    for i, row in enumerate(rows, 1):
+        try:
+            items.append(_item_from_row(row))
+        except ValueError as e:
+            errors.append(f"entry {i}: {e}")
+    if errors:
+        raise ValueError("; ".join(errors))
+    return items
+
+
+def _is_transient(res: Any, idempotent: bool = True) -> bool:
+    # TorchServe reports errors as {"code": ..., "type": ..., "message": ...}
+    if not isinstance(res, dict):
+        return False
+    return res.get("code") == 429 or (idempotent and res.get("code", 0) >= 500)
+
+
+def _is_error(res: Any) -> bool:
+    return isinstance(res, dict) and res.get("code", 200) >= 400
+
+
+def _expected_identity(item: BulkItem, catalog: Optional[ModelStoreCatalog]) -> Tuple[str, Optional[str]]:
+    """Name and version ``item`` will be registered under, from its MANIFEST.json if the archive is in the store."""
+    entry = catalog.get(item.url) if catalog is not None else None
+    name = item.model_name or (entry and entry.model_name) or os.path.splitext(os.path.basename(item.url))[0]
+    return name, entry.model_version if entry else None
+
+
+async def _versions(api: AsyncManagementAPI, model_name: str) -> Set[str]:
+    desc = await api.get_model(model_name, list_all=True)
+    return {d.get("modelVersion") for d in desc} if isinstance(desc, list) else set()
+
+
+async def _with_retries(call: Any, retries: int, backoff: float, on_retry: Any, idempotent: bool = True) -> Any:
+    """Retry ``call`` on transport errors and 5xx/429 responses, with exponential backoff.
+
+    A call that isn't idempotent (registration) is only retried when it
+    can't have reached TorchServe: the connection failed, or the request was
+    rate limited. A timeout or 5xx may mean the model was registered anyway,
+    and a second attempt would fail as a duplicate.
+    """
+    retry_on = httpx.TransportError if idempotent else (httpx.ConnectError, httpx.ConnectTimeout)
+    for attempt in range(retries + 1):
+        try:
+            res = await call()
+            if not _is_transient(res, idempotent) or attempt == retries:
+                return res
+            reason = res.get("message", res)
+        except retry_on as e:
+            if attempt == retries:
+                raise
+            reason = e
+        await on_retry(attempt + 1, reason)
+        await asyncio.sleep(backoff * 2 ** attempt)
+
+
+async def wait_until_ready(api: AsyncManagementAPI,
+                           model_name: str,
+                           version: Optional[str],
+                           expected_workers: int,
+                           timeout: float = 300.0,
+                           poll_interval: float = 2.0) -> Tuple[bool, str]:
+    """Poll describe until ``expected_workers`` workers of the version are READY.
+
+    Registration and scaling use ``synchronous=false``, so their response only
+    means TorchServe accepted the request.
+    """
+    deadline = time.monotonic() + timeout
+    message = "not described yet"
+    while True:
+        try:
+            desc = await api.get_model(model_name, version)
+        except (httpx.HTTPError, ValueError) as e:
+            desc, message = None, str(e)
+        if isinstance(desc, list) and desc:
+            workers = desc[0].get("workers", [])
+            ready = sum(1 for w in workers if w.get("status") == "READY")
+            message = f"{ready}/{expected_workers} workers READY"
+            if ready >= expected_workers:
+                return True, message
+        elif _is_error(desc):
+            message = desc.get("message", str(desc))
+        if time.monotonic() > deadline:
+            return False, f"timed out: {message}"
+        await asyncio.sleep(poll_interval)
+
+
+async def bulk_register(api: AsyncManagementAPI,
+                        items: List[BulkItem],
+                        concurrency: int = 8,
+                        retries: int = 3,
+                        backoff: float = 1.0,
+                        ready_timeout: float = 300.0,
+                        poll_interval: float = 2.0,
+                        catalog: Optional[ModelStoreCatalog] = None) -> AsyncIterator[BulkProgress]:
+    """Register (and optionally scale) ``items`` with at most ``concurrency``
+    in flight, yielding a :class:`BulkProgress` every time an item changes state.
+
+    With workers, TorchServe answers an asynchronous register with
+    "Processing worker updates..." and doesn't say which version it
+    registered. That comes from the archive's MANIFEST.json when ``catalog``
+    has it, otherwise from the versions of the model before and after the call.
+    """
+    events: "asyncio.Queue[BulkProgress]" = asyncio.Queue()
+    semaphore = asyncio.Semaphore(concurrency)
+    name_locks: Dict[str, asyncio.Lock] = {}
+
+    async def run(index: int, item: BulkItem) -> None:
+        started = time.monotonic()
+
+        async def emit(state: str, message: str = "") -> None:
+            await events.put(BulkProgress(index, item, state, message, time.monotonic() - started))
+
+        async def on_retry(attempt: int, reason: Any) -> None:
+            await emit("retrying", f"attempt {attempt}/{retries}: {reason}")
+
+        async with semaphore:
+            try:
+                await emit("registering")
+
+                def register() -> Any:
+                    return _with_retries(
+                        lambda: api.register_model(item.url, item.model_name, handler=item.handler,
+                                                   runtime=item.runtime, batch_size=item.batch_size,
+                                                   max_batch_delay=item.max_batch_delay,
+                                                   initial_workers=item.initial_workers,
+                                                   response_timeout=item.response_timeout),
+                        retries, backoff, on_retry, idempotent=False)
+
+                model_name, version = _expected_identity(item, catalog)
+                if version is None:
+                    # One registration per name at a time, so the new version is the only one that appeared
+                    async with name_locks.setdefault(model_name, asyncio.Lock()):
+                        before = await _versions(api, model_name)
+                        res = await register()
+                        if not _is_error(res):
+                            new = await _versions(api, model_name) - before
+                            version = new.pop() if len(new) == 1 else None
+                else:
+                    res = await register()
+                if _is_error(res):
+                    await emit("failed", res.get("message", str(res)))
+                    return
+                m = _REGISTERED.search(str(res.get("status", "")) if isinstance(res, dict) else "")
+                if m:
+                    model_name, version = m.group("name"), m.group("version")
+                if version is None:
+                    await emit("failed", f"registered, but couldn't tell which version of {model_name}")
+                    return
+                if item.min_worker or item.max_worker:
+                    await emit("scaling")
+                    res = await _with_retries(
+                        lambda: api.change_model_workers(model_name, version, min_worker=item.min_worker,
+                                                         max_worker=item.max_worker),
+                        retries, backoff, on_retry)
+                    if _is_error(res):
+                        await emit("failed", res.get("message", str(res)))
+                        return
+                await emit("waiting")
+                ok, message = await wait_until_ready(api, model_name, version, item.expected_workers,
+                                                     ready_timeout, poll_interval)
+                await emit("ready" if ok else "failed", message)
+            except Exception as e:
+                await emit("failed", str(e))
+
+    tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(items)]
+    remaining = len(items)
+    try:
+        while remaining:
+            event = await events.get()
+            if event.done:
+                remaining -= 1
+            yield event
+    finally:
+        for t in tasks:
+            t.cancel()
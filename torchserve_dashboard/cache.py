@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from torchserve_dashboard.api import ManagementAPI, paginate
+
+# Seconds a read stays fresh, per ManagementAPI method
+DEFAULT_TTLS = {
+    "get_loaded_models": 5.0,
+    "get_model": 10.0,
+    "list_workflows": 10.0,
+    "get_workflow": 30.0,
+}
+
+CacheKey = Tuple[str, Tuple[Hashable, ...]]
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-endpoint TTL.
+
+    Keys are ``(endpoint, args)`` tuples so a mutation can drop every entry
+    for an endpoint, or only those whose first argument is a given model or
+    workflow name.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 1024) -> None:
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fetching: Dict[CacheKey, "Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        ttl = self.ttls.get(key[0], 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fetch(self, key: CacheKey, fetch: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, or ``fetch()``'s result (cached unless ``None``).
+
+        Threads missing the same key at the same time, e.g. every open
+        dashboard rerunning after a change, wait for one ``fetch`` instead
+        of each sending their own request.
+        """
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            pending = self._fetching.get(key)
+            if pending is None:
+                self._fetching[key] = future = Future()
+        if pending is not None:
+            return pending.result()
+        try:
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._fetching[key]
+
+    def invalidate(self, endpoint: Optional[str] = None, name: Optional[str] = None) -> int:
+        """Drop entries for ``endpoint`` (all endpoints if None), optionally
+        only those whose first argument equals ``name``."""
+        with self._lock:
+            stale = [
+                k for k in self._data
+                if (endpoint is None or k[0] == endpoint) and (name is None or (k[1] and k[1][0] == name))
+            ]
+            for k in stale:
+                del self._data[k]
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class _CachedAPIBase:
+    def __init__(self, api: Any, cache: Optional[TTLCache] = None) -> None:
+        self.api = api
+        self.cache = cache if cache is not None else TTLCache()
+
+    def __getattr__(self, item: str) -> Any:
+        # Anything not wrapped (address, client, ...) goes straight to the API
+        return getattr(self.api, item)
+
+    def _invalidate_model(self, model_name: Optional[str]) -> None:
+        self.cache.invalidate("get_loaded_models")
+        # register_model may not know the final name (it comes from the archive)
+        self.cache.invalidate("get_model", model_name)
+
+    def _invalidate_workflow(self, workflow_name: Optional[str]) -> None:
+        self.cache.invalidate("list_workflows")
+        self.cache.invalidate("get_workflow", workflow_name)
+
+
+class CachedManagementAPI(_CachedAPIBase):
+    """Caching wrapper around :class:`ManagementAPI` reads.
+
+    Mutating calls go through unchanged and invalidate the keys they affect.
+    ``None`` results (TorchServe unreachable) are never cached.
+    """
+
+    api: ManagementAPI
+
+    def _cached(self, endpoint: str, args: Tuple[Hashable, ...], fetch: Callable[[], Any]) -> Any:
+        return self.cache.get_or_fetch((endpoint, args), fetch)
+
+    def get_loaded_models(self,
+                          limit: Optional[int] = None,
+                          next_page_token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self._cached("get_loaded_models", (limit, next_page_token),
+                            lambda: self.api.get_loaded_models(limit, next_page_token))
+
+    def iter_models(self, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        return paginate(self.get_loaded_models, "models", limit)
+
+    def get_model(self,
+                  model_name: str,
+                  version: Optional[str] = None,
+                  list_all: bool = False,
+                  custom_metadata: bool = False) -> List[Dict[str, Any]]:
+        return self._cached("get_model", (model_name, version, list_all, custom_metadata),
+                            lambda: self.api.get_model(model_name, version, list_all, custom_metadata))
+
+    def list_workflows(self,
+                       limit: Optional[int] = None,
+                       next_page_token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self._cached("list_workflows", (limit, next_page_token),
+                            lambda: self.api.list_workflows(limit, next_page_token))
+
+    def iter_workflows(self, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        return paginate(self.list_workflows, "workflows", limit)
+
+    def get_workflow(self, workflow_name: str) -> Dict[str, str]:
+        return self._cached("get_workflow", (workflow_name,), lambda: self.api.get_workflow(workflow_name))
+
+    def register_model(self, mar_path: str, model_name: Optional[str] = None, **kwargs: Any) -> Dict[str, str]:
+        try:
+            return self.api.register_model(mar_path, model_name, **kwargs)
+        finally:
+            self._invalidate_model(model_name)
+
+    def delete_model(self, model_name: str, version: Optional[str] = None) -> Dict[str, str]:
+        try:
+            return self.api.delete_model(model_name, version)
+        finally:
+            self._invalidate_model(model_name)
+
+    def change_model_default(self, model_name: str, version: Optional[str] = None):
+        try:
+            return self.api.change_model_default(model_name, version)
+        finally:
+            self._invalidate_model(model_name)
+
+    def change_model_workers(self, model_name: str, version: Optional[str] = None, **kwargs: Any) -> Dict[str, str]:
+        try:
+            return self.api.change_model_workers(model_name, version, **kwargs)
+        finally:
+            self._invalidate_model(model_name)
+
+    def register_workflow(self, url: str, workflow_name: Optional[str] = None) -> Dict[str, str]:
+        try:
+            return self.api.register_workflow(url, workflow_name)
+        finally:
+            self._invalidate_workflow(workflow_name)
+
+    def unregister_workflow(self, workflow_name: str) -> Dict[str, str]:
+        try:
+            return self.api.unregister_workflow(workflow_name)
+        finally:
+            self._invalidate_workflow(workflow_name)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import logging
+
+log = logging.getLogger(__name__)
+
+MANIFEST_PATH = "MAR-INF/MANIFEST.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mar (
+    file TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    model_name TEXT,
+    model_version TEXT,
+    handler TEXT,
+    runtime TEXT,
+    serialized_file TEXT,
+    archiver_version TEXT,
+    created_on TEXT,
+    error TEXT
+)
+"""
+
+
+class MarEntry(NamedTuple):
+    file: str
+    size: int
+    mtime_ns: int
+    model_name: Optional[str] = None
+    model_version: Optional[str] = None
+    handler: Optional[str] = None
+    runtime: Optional[str] = None
+    serialized_file: Optional[str] = None
+    archiver_version: Optional[str] = None
+    created_on: Optional[str] = None
+    error: Optional[str] = None
+
+
+def default_index_path(model_store: str) -> str:
+    digest = hashlib.sha1(os.path.abspath(model_store).encode()).hexdigest()[:12]
+    return os.path.join(os.path.expanduser("~"), ".cache", "torchserve_dashboard", f"catalog-{digest}.sqlite")
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Read ``MAR-INF/MANIFEST.json`` from an archive.
+
+    zipfile only reads the central directory at the end of the file and the
+    manifest member itself, never the (possibly multi-GB) model weights.
+    """
+    with zipfile.ZipFile(path) as zf:
+        with zf.open(MANIFEST_PATH) as f:
+            return json.load(f)
+
+
+def _scan_entry(path: str, file: str, size: int, mtime_ns: int) -> MarEntry:
+    try:
+        manifest = read_manifest(path)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        return MarEntry(file, size, mtime_ns, error=str(e))
+    model = manifest.get("model", {})
+    return MarEntry(file, size, mtime_ns,
+                    model_name=model.get("modelName"),
+                    model_version=model.get("modelVersion"),
+                    handler=model.get("handler"),
+                    runtime=manifest.get("runtime"),
+                    serialized_file=model.get("serializedFile"),
+                    archiver_version=manifest.get("archiverVersion"),
+                    created_on=manifest.get("createdOn"))
+
+
+class ModelStoreCatalog:
+    """SQLite index of the ``.mar`` archives in a model store.
+
+    :meth:`refresh` stats the directory with ``os.scandir`` and only opens
+    archives whose size or mtime changed since they were last indexed, so
+    a rescan of an unchanged store costs one directory listing.
+    """
+
+    def __init__(self, model_store: str, index_path: Optional[str] = None, workers: int = 8) -> None:
+        self.model_store = model_store
+        self.index_path = index_path or default_index_path(model_store)
+        self.workers = workers
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            log.info(f"Warn - can't open catalog index {self.index_path} ({e}), keeping it in memory")
+            self.index_path = ":memory:"
+            self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(_SCHEMA)
+
+    def _scan_dir(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        with os.scandir(self.model_store) as it:
+            for e in it:
+                if e.name.endswith(".mar") and e.is_file():
+                    st = e.stat()
+                    found[e.name] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def refresh(self) -> Tuple[int, int]:
+        """Sync the index with the directory. Returns ``(updated, removed)`` counts."""
+        found = self._scan_dir()
+        with self._lock:
+            known = {row[0]: (row[1], row[2]) for row in self._db.execute("SELECT file, size, mtime_ns FROM mar")}
+        changed = [(f, stat) for f, stat in found.items() if known.get(f) != stat]
+        removed = [f for f in known if f not in found]
+        if changed:
+            # Manifest reads are I/O bound (NFS), so overlap them
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                entries = list(pool.map(
+                    lambda c: _scan_entry(os.path.join(self.model_store, c[0]), c[0], *c[1]), changed))
+        else:
+            entries = []
+        with self._lock, self._db:
+            self._db.executemany(f"INSERT OR REPLACE INTO mar VALUES ({','.join('?' * len(MarEntry._fields))})",
+                                 entries)
+            self._db.executemany("DELETE FROM mar WHERE file = ?", [(f,) for f in removed])
+        return len(entries), len(removed)
+
+    def entries(self) -> List[MarEntry]:
+        with self._lock:
+            return [MarEntry(*row) for row in self._db.execute("SELECT * FROM mar ORDER BY file")]
+
+    def get(self, file: str) -> Optional[MarEntry]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM mar WHERE file = ?", (file,)).fetchone()
+        return MarEntry(*row) if row else None
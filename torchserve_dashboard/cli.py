@@ -1,16 +1,31 @@
+import os
+import sys
 from typing import Any
+
 import click
-import streamlit.cli
-from streamlit.cli import configurator_options
-import os
 
 
-@click.command(context_settings=dict(ignore_unknown_options=True,
-                                     allow_extra_args=True))
-@configurator_options
-@click.argument("args", nargs=-1)
-@click.pass_context
-def main(ctx: click.Context, args: Any, **kwargs: Any):
-    dirname = os.path.dirname(__file__)
-    filename = os.path.join(dirname, 'dash.py')
-    ctx.forward(streamlit.cli.main_run, target=filename, args=args, *kwargs)
+def _dashboard_command() -> click.Command:
+    # streamlit takes seconds to import, so only pay for it when the dashboard is launched
+    import streamlit.cli
+    from streamlit.cli import configurator_options
+
+    @click.command(context_settings=dict(ignore_unknown_options=True,
+                                         allow_extra_args=True))
+    @configurator_options
+    @click.argument("args", nargs=-1)
+    @click.pass_context
+    def run(ctx: click.Context, args: Any, **kwargs: Any):
+        dirname = os.path.dirname(__file__)
+        filename = os.path.join(dirname, 'dash.py')
+        ctx.forward(streamlit.cli.main_run, target=filename, args=args, *kwargs)
+
+    return run
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "ctl":
+        from torchserve_dashboard.ctl import ctl
+        ctl.main(args=sys.argv[2:], prog_name="torchserve-dashboard ctl")
+    else:
+        _dashboard_command().main(prog_name="torchserve-dashboard")
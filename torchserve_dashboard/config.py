@@ -0,0 +1,256 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import logging
+
+log = logging.getLogger(__name__)
+
+DEFAULT_ADDRESSES = {
+    "inference_address": "http://127.0.0.1:8080",
+    "management_address": "http://127.0.0.1:8081",
+    "metrics_address": "http://127.0.0.1:8082",
+}
+DEFAULT_GRPC_PORTS = {
+    "grpc_inference_port": 7070,
+    "grpc_management_port": 7071,
+}
+
+
+def _to_bool(value: str) -> bool:
+    return value.strip().lower() == "true"
+
+
+# Everything else stays a string
+PROPERTY_TYPES: Dict[str, Callable[[str], Any]] = {
+    "number_of_gpu": int,
+    "batch_size": int,
+    "max_batch_delay": int,
+    "default_workers_per_model": int,
+    "job_queue_size": int,
+    "number_of_netty_threads": int,
+    "netty_client_threads": int,
+    "default_response_timeout": int,
+    "unregister_model_timeout": int,
+    "max_request_size": int,
+    "max_response_size": int,
+    "grpc_inference_port": int,
+    "grpc_management_port": int,
+    "enable_metrics_api": _to_bool,
+    "enable_envvars_config": _to_bool,
+    "install_py_dep_per_model": _to_bool,
+    "async_logging": _to_bool,
+    "disable_system_metrics": _to_bool,
+    "prefer_direct_buffer": _to_bool,
+    "enable_grpc_ssl": _to_bool,
+}
+
+_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+
+
+def _logical_lines(text: str) -> Iterator[str]:
+    # A line ending in an odd number of backslashes continues on the next one,
+    # whose leading whitespace is dropped
+    buf = ""
+    for line in text.splitlines():
+        line = line.lstrip()
+        if not buf and (not line or line[0] in "#!"):
+            continue
+        trailing = len(line) - len(line.rstrip("\\"))
+        if trailing % 2:
+            buf += line[:-1]
+            continue
+        yield buf + line
+        buf = ""
+    if buf:
+        yield buf
+
+
+def _unescape(s: str) -> str:
+    out = []
+    i = 0
+    while i < len(s):
+        c = s[i]
+        if c == "\\" and i + 1 < len(s):
+            n = s[i + 1]
+            if n == "u" and i + 6 <= len(s):
+                try:
+                    out.append(chr(int(s[i + 2:i + 6], 16)))
+                    i += 6
+                    continue
+                except ValueError:
+                    pass
+            out.append(_ESCAPES.get(n, n))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _split_pair(line: str) -> Tuple[str, str]:
+    # Key ends at the first unescaped '=', ':' or whitespace
+    i = 0
+    while i < len(line):
+        if line[i] == "\\":
+            i += 2
+            continue
+        if line[i] in "=: \t\f":
+            break
+        i += 1
+    key, rest = line[:i], line[i:].lstrip(" \t\f")
+    if rest[:1] in ("=", ":"):
+        rest = rest[1:].lstrip(" \t\f")
+    return _unescape(key), _unescape(rest)
+
+
+def parse_properties(text: str) -> Dict[str, str]:
+    """Parse a ``.properties`` file the way ``java.util.Properties.load`` does."""
+    return dict(_split_pair(line) for line in _logical_lines(text))
+
+
+def client_address(address: str) -> str:
+    """Turn a bind address into one a client can connect to (``0.0.0.0`` -> ``127.0.0.1``)."""
+    address = address.strip().rstrip("/")
+    parts = urlsplit(address)
+    if parts.hostname in ("0.0.0.0", "::", "[::]"):
+        netloc = "127.0.0.1" + (f":{parts.port}" if parts.port else "")
+        address = urlunsplit(parts._replace(netloc=netloc))
+    return address
+
+
+class TorchServeConfig:
+    """Parsed TorchServe ``config.properties``.
+
+    :meth:`reload` re-reads the file only if its mtime or size changed, so
+    it is cheap enough to call on every rerun. :meth:`mark_applied` records
+    what the running server was started with; TorchServe only reads its
+    config at startup, so :meth:`pending_changes` is what a restart would
+    change. :meth:`mark_connected` does the same for the addresses the
+    dashboard's own clients were built with, which a restart of TorchServe
+    alone doesn't move.
+    """
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self.properties: Dict[str, str] = {}
+        self.applied: Optional[Dict[str, str]] = None
+        self.connected: Optional[Dict[str, str]] = None
+        self.error: Optional[str] = None
+        self._stat: Optional[Tuple[int, int]] = (-1, -1)  # forces the first parse
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.path) and os.path.isfile(self.path)
+
+    def reload(self) -> bool:
+        """Reparse the file if it changed. Returns whether it did."""
+        try:
+            st = os.stat(self.path) if self.path else None
+        except OSError as e:
+            st = None
+            self.error = str(e)
+        stat = (st.st_mtime_ns, st.st_size) if st else None
+        with self._lock:
+            if stat == self._stat:
+                return False
+            self._stat = stat
+            if stat is None:
+                self.properties = {}
+                return True
+            try:
+                with open(self.path, "r", encoding="latin-1") as f:
+                    self.properties = parse_properties(f.read())
+                self.error = None
+            except OSError as e:
+                log.info(f"Warn - can't read {self.path}: {e}")
+                self.error = str(e)
+            return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.properties.get(key)
+        if value is None:
+            return default
+        convert = PROPERTY_TYPES.get(key, str)
+        try:
+            return convert(value)
+        except ValueError:
+            log.info(f"Warn - {key}={value!r} is not a valid {convert.__name__}")
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.properties:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.properties
+
+    def typed(self) -> Dict[str, Any]:
+        return {k: self.get(k) for k in sorted(self.properties)}
+
+    def _address(self, key: str) -> str:
+        return client_address(self.properties.get(key) or DEFAULT_ADDRESSES[key])
+
+    @property
+    def inference_address(self) -> str:
+        return self._address("inference_address")
+
+    @property
+    def management_address(self) -> str:
+        return self._address("management_address")
+
+    @property
+    def metrics_address(self) -> str:
+        return self._address("metrics_address")
+
+    def _grpc_target(self, port_key: str, address_key: str) -> str:
+        # gRPC listens on the same interfaces as REST, only the port is configured
+        host = urlsplit(self._address(address_key)).hostname or "127.0.0.1"
+        return f"{host}:{self.get(port_key, DEFAULT_GRPC_PORTS[port_key])}"
+
+    @property
+    def grpc_inference_target(self) -> str:
+        return self._grpc_target("grpc_inference_port", "inference_address")
+
+    @property
+    def grpc_management_target(self) -> str:
+        return self._grpc_target("grpc_management_port", "management_address")
+
+    @property
+    def model_store(self) -> Optional[str]:
+        return self.get("model_store")
+
+    def mark_applied(self) -> None:
+        self.applied = dict(self.properties)
+
+    def addresses(self) -> Dict[str, str]:
+        """Where clients reach the server, as resolved from the current file."""
+        return {
+            "management_address": self.management_address,
+            "inference_address": self.inference_address,
+            "metrics_address": self.metrics_address,
+            "grpc_management_target": self.grpc_management_target,
+            "grpc_inference_target": self.grpc_inference_target,
+        }
+
+    def mark_connected(self) -> None:
+        self.connected = self.addresses()
+
+    def address_changes(self) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """``(name, address in use, address in the file)`` for every address that moved since :meth:`mark_connected`."""
+        if self.connected is None:
+            return []
+        now = self.addresses()
+        return [(k, self.connected.get(k), v) for k, v in now.items() if self.connected.get(k) != v]
+
+    def diff(self, other: Dict[str, str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """``(key, other value, current value)`` for every property that differs."""
+        keys = sorted(set(other) | set(self.properties))
+        return [(k, other.get(k), self.properties.get(k)) for k in keys if other.get(k) != self.properties.get(k)]
+
+    def pending_changes(self) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        return self.diff(self.applied) if self.applied is not None else []
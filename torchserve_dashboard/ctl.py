@@ -0,0 +1,308 @@
+"""Headless management commands: ``torchserve-dashboard ctl ...``
+
+Only ``click`` and ``httpx`` are imported, never streamlit, so a call costs
+about as much as the HTTP round-trip it makes.
+"""
+import json
+import sys
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import click
+import httpx
+
+from torchserve_dashboard.api import LocalTS, ManagementAPI
+from torchserve_dashboard.archiver import COMPRESSION, build_mar
+from torchserve_dashboard.config import DEFAULT_ADDRESSES, DEFAULT_GRPC_PORTS, TorchServeConfig
+
+
+def _failed(res: Any) -> bool:
+    return isinstance(res, dict) and res.get("code", 200) >= 400
+
+
+def _echo(ctx: click.Context, res: Any) -> None:
+    if ctx.obj["json"]:
+        click.echo(json.dumps(res))
+    elif isinstance(res, dict) and "status" in res:
+        click.echo(res["status"])
+    elif isinstance(res, dict) and "message" in res:
+        click.echo(res["message"], err=True)
+    else:
+        click.echo(json.dumps(res, indent=2))
+
+
+def _finish(ctx: click.Context, res: Any) -> None:
+    if res is None:
+        click.echo(f"Can't reach TorchServe at {ctx.obj['address']}", err=True)
+        ctx.exit(2)
+    _echo(ctx, res)
+    if _failed(res):
+        ctx.exit(1)
+
+
+def _call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    try:
+        return fn(*args, **kwargs)
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def _api(ctx: click.Context) -> ManagementAPI:
+    if "api" not in ctx.obj:
+        if ctx.obj["grpc_target"]:
+            from torchserve_dashboard.grpc_api import GrpcManagementAPI
+            ctx.obj["api"] = GrpcManagementAPI(ctx.obj["address"], ctx.obj["grpc_target"])
+        else:
+            ctx.obj["api"] = ManagementAPI(ctx.obj["address"])
+    return ctx.obj["api"]
+
+
+@click.group()
+@click.option("--address", envvar="TORCHSERVE_MANAGEMENT_ADDRESS",
+              help="TorchServe management address "
+                   f"[default: from --config, else {DEFAULT_ADDRESSES['management_address']}]")
+@click.option("--config", "config_path", type=click.Path(dir_okay=False),
+              help="Read the management address from this config.properties.")
+@click.option("--json", "as_json", is_flag=True, help="Print raw JSON responses.")
+@click.option("--grpc", "use_grpc", is_flag=True,
+              help="Send model calls to the gRPC management port (grpc_management_port, needs grpcio).")
+@click.pass_context
+def ctl(ctx: click.Context, address: Optional[str], config_path: Optional[str], as_json: bool, use_grpc: bool) -> None:
+    """Manage TorchServe from scripts, without starting the dashboard."""
+    config = TorchServeConfig(config_path)
+    if not address:
+        address = config.management_address
+    if not address.startswith("http"):
+        address = "http://" + address
+    grpc_target = None
+    if use_grpc:
+        port = config.get("grpc_management_port", DEFAULT_GRPC_PORTS["grpc_management_port"])
+        grpc_target = f"{urlsplit(address).hostname}:{port}"
+    ctx.obj = {"address": address.rstrip("/"), "json": as_json, "grpc_target": grpc_target}
+
+
+@ctl.command("list")
+@click.option("--limit", type=int, default=100, show_default=True, help="Page size.")
+@click.pass_context
+def list_models(ctx: click.Context, limit: int) -> None:
+    """List registered models (all pages)."""
+    api = _api(ctx)
+    if api.get_loaded_models(1) is None:
+        _finish(ctx, None)
+    models = list(api.iter_models(limit))
+    if ctx.obj["json"]:
+        click.echo(json.dumps(models))
+    else:
+        for m in models:
+            click.echo(f"{m['modelName']}\t{m.get('modelUrl', '')}")
+
+
+@ctl.command()
+@click.argument("model_name")
+@click.argument("version", required=False)
+@click.option("--all", "list_all", is_flag=True, help="Describe every version.")
+@click.option("--customized", is_flag=True, help="Include custom metadata from the handler.")
+@click.pass_context
+def describe(ctx: click.Context, model_name: str, version: Optional[str], list_all: bool,
+             customized: bool) -> None:
+    """Describe MODEL_NAME [VERSION]."""
+    _finish(ctx, _call(_api(ctx).get_model, model_name, version, list_all, customized))
+
+
+@ctl.command()
+@click.argument("mar_path")
+@click.option("--model-name")
+@click.option("--handler")
+@click.option("--runtime")
+@click.option("--batch-size", type=int)
+@click.option("--max-batch-delay", type=int)
+@click.option("--initial-workers", type=int)
+@click.option("--response-timeout", type=int)
+@click.option("--encrypted", "is_encrypted", is_flag=True, help="Archive is S3 SSE-KMS encrypted.")
+@click.pass_context
+def register(ctx: click.Context, mar_path: str, **kwargs: Any) -> None:
+    """Register MAR_PATH (a file in the model store or a URL)."""
+    _finish(ctx, _call(_api(ctx).register_model, mar_path, **kwargs))
+
+
+@ctl.command()
+@click.argument("model_name")
+@click.argument("version", required=False)
+@click.option("--min-worker", type=int)
+@click.option("--max-worker", type=int)
+@click.option("--number-gpu", type=int)
+@click.pass_context
+def scale(ctx: click.Context, model_name: str, version: Optional[str], **kwargs: Any) -> None:
+    """Change the worker count of MODEL_NAME [VERSION]."""
+    _finish(ctx, _call(_api(ctx).change_model_workers, model_name, version, **kwargs))
+
+
+@ctl.command()
+@click.argument("model_name")
+@click.argument("version", required=False)
+@click.pass_context
+def unregister(ctx: click.Context, model_name: str, version: Optional[str]) -> None:
+    """Unregister MODEL_NAME [VERSION]."""
+    _finish(ctx, _call(_api(ctx).delete_model, model_name, version))
+
+
+@ctl.command("set-default")
+@click.argument("model_name")
+@click.argument("version")
+@click.pass_context
+def set_default(ctx: click.Context, model_name: str, version: str) -> None:
+    """Make VERSION the default version of MODEL_NAME."""
+    _finish(ctx, _call(_api(ctx).change_model_default, model_name, version))
+
+
+@ctl.group()
+def workflows() -> None:
+    """Manage workflows."""
+
+
+@workflows.command("list")
+@click.option("--limit", type=int, default=100, show_default=True, help="Page size.")
+@click.pass_context
+def list_workflows(ctx: click.Context, limit: int) -> None:
+    api = _api(ctx)
+    if api.list_workflows(1) is None:
+        _finish(ctx, None)
+    items = list(api.iter_workflows(limit))
+    if ctx.obj["json"]:
+        click.echo(json.dumps(items))
+    else:
+        for w in items:
+            click.echo(f"{w['workflowName']}\t{w.get('workflowUrl', '')}")
+
+
+@workflows.command("describe")
+@click.argument("workflow_name")
+@click.pass_context
+def describe_workflow(ctx: click.Context, workflow_name: str) -> None:
+    _finish(ctx, _call(_api(ctx).get_workflow, workflow_name))
+
+
+@workflows.command("register")
+@click.argument("url")
+@click.option("--workflow-name")
+@click.pass_context
+def register_workflow(ctx: click.Context, url: str, workflow_name: Optional[str]) -> None:
+    _finish(ctx, _call(_api(ctx).register_workflow, url, workflow_name))
+
+
+@workflows.command("unregister")
+@click.argument("workflow_name")
+@click.pass_context
+def unregister_workflow(ctx: click.Context, workflow_name: str) -> None:
+    _finish(ctx, _call(_api(ctx).unregister_workflow, workflow_name))
+
+
+@ctl.command()
+@click.option("--model-store", default="./model_store", show_default=True)
+@click.pass_context
+def store(ctx: click.Context, model_store: str) -> None:
+    """List the archives in a local model store."""
+    ts = LocalTS(model_store)
+    ts.catalog.refresh()
+    entries = [e._asdict() for e in ts.catalog.entries()]
+    if ctx.obj["json"]:
+        click.echo(json.dumps(entries))
+    else:
+        for e in entries:
+            click.echo(f"{e['file']}\t{e['model_name'] or ''}\t{e['model_version'] or ''}\t{e['error'] or ''}")
+
+
+@ctl.command()
+@click.option("--model-name", required=True)
+@click.option("--version", required=True)
+@click.option("--handler", required=True, help="Handler file or built-in handler name.")
+@click.option("--serialized-file", help="Weights or TorchScript file.")
+@click.option("--model-file", help="Model definition for eager mode models.")
+@click.option("--extra-files", help="Comma separated files or directories.")
+@click.option("--requirements-file")
+@click.option("--runtime", default="python", show_default=True)
+@click.option("--export-path", "--model-store", default="./model_store", show_default=True)
+@click.option("--compression", type=click.Choice(COMPRESSION), default="auto", show_default=True,
+              help="auto stores members that don't compress, like most float weights.")
+@click.option("--level", type=click.IntRange(1, 9), default=6, show_default=True, help="Deflate level.")
+@click.option("--workers", type=int, default=0, help="Deflate threads [default: one per CPU]")
+@click.option("--force", "overwrite", is_flag=True, help="Overwrite an existing archive.")
+@click.pass_context
+def archive(ctx: click.Context, extra_files: Optional[str], **kwargs: Any) -> None:
+    """Build a .mar in the model store, like torch-model-archiver but multi-threaded."""
+    extra = [p.strip() for p in (extra_files or "").split(",") if p.strip()]
+    try:
+        result = build_mar(extra_files=extra, **kwargs)
+    except (OSError, ValueError) as e:
+        click.echo(e, err=True)
+        ctx.exit(1)
+    if ctx.obj["json"]:
+        click.echo(json.dumps(result.as_row()))
+    else:
+        click.echo(result.path)
+
+
+@ctl.command()
+@click.option("--model-store", default="./model_store", show_default=True)
+@click.option("--config-path", default="./default.torchserve.properties", show_default=True)
+@click.option("--log-location")
+@click.option("--metrics-location")
+@click.option("--log-config")
+def start(**kwargs: Any) -> None:
+    """Start a local TorchServe."""
+    click.echo(LocalTS(**kwargs).start_torchserve())
+
+
+@ctl.command()
+def stop() -> None:
+    """Stop the local TorchServe."""
+    res = LocalTS("").stop_torchserve()
+    click.echo(res, err=isinstance(res, Exception))
+    if isinstance(res, Exception):
+        sys.exit(1)
+
+
+_BATCH_OPS: Dict[str, Callable[..., Any]] = {
+    "describe": lambda api, **kw: api.get_model(**kw),
+    "register": lambda api, **kw: api.register_model(**kw),
+    "scale": lambda api, **kw: api.change_model_workers(**kw),
+    "unregister": lambda api, **kw: api.delete_model(**kw),
+    "set-default": lambda api, **kw: api.change_model_default(**kw),
+    "register-workflow": lambda api, **kw: api.register_workflow(**kw),
+    "unregister-workflow": lambda api, **kw: api.unregister_workflow(**kw),
+}
+
+
+@ctl.command()
+@click.option("--keep-going", is_flag=True, help="Don't stop at the first failed operation.")
+@click.pass_context
+def batch(ctx: click.Context, keep_going: bool) -> None:
+    """Run operations read from stdin, one JSON object per line.
+
+    Each object names the ``op`` and the API method's keyword arguments,
+    e.g. ``{"op": "scale", "model_name": "resnet", "min_worker": 2}``.
+    One JSON result per line is printed, reusing a single connection.
+    """
+    api = _api(ctx)
+    failures = 0
+    for lineno, line in enumerate(sys.stdin, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            params = json.loads(line)
+            if not isinstance(params, dict):
+                raise TypeError(f"expected a JSON object, got {type(params).__name__}")
+            op = _BATCH_OPS[params.pop("op")]
+            res = op(api, **params)
+        except (ValueError, KeyError, TypeError) as e:
+            res = {"code": 400, "message": f"line {lineno}: {e!r}"}
+        except httpx.HTTPError as e:
+            res = {"code": 503, "message": f"line {lineno}: {e}"}
+        click.echo(json.dumps({"line": lineno, "result": res}))
+        if _failed(res):
+            failures += 1
+            if not keep_going:
+                break
+    if failures:
+        ctx.exit(1)
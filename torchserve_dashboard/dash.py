@@ -1,11 +1,40 @@
 import argparse
+import asyncio
+import functools
 import os
+import time
+import uuid
 
+import pandas as pd
 import streamlit as st
 from httpx import Response
 
-from torchserve_dashboard.api import ManagementAPI, LocalTS
-from pathlib import Path 
+from torchserve_dashboard.api import AsyncManagementAPI, ManagementAPI, LocalTS
+from torchserve_dashboard.archiver import COMPRESSION, build_mar
+from torchserve_dashboard.autoscaler import Autoscaler, AutoscalerPolicy, ScalingBounds
+from torchserve_dashboard.benchmark import load_payloads, run_benchmark
+from torchserve_dashboard.bulk import BulkItem, bulk_register, load_manifest
+from torchserve_dashboard.cache import CachedManagementAPI, TTLCache
+from torchserve_dashboard.config import TorchServeConfig
+from torchserve_dashboard.fleet import FLEET_COLUMNS, FleetPoller, load_endpoints
+from torchserve_dashboard.grpc_api import AsyncGrpcManagementAPI, GrpcManagementAPI
+from torchserve_dashboard.health import WorkerHealthMonitor
+from torchserve_dashboard.history import (HistoryStore, RecordingManagementAPI, default_actor, default_history_path,
+                                          restore, restore_plan)
+from torchserve_dashboard.instrumentation import (HTTP_ERRORS, HTTP_LATENCY, HTTP_RESPONSES, POLL_DURATION, REGISTRY,
+                                                  RENDER_DURATION, MetricsExporter)
+from torchserve_dashboard.live import SNAPSHOT_COLUMNS, SNAPSHOT_KEY, ChangeFeed, EventStreamServer, snapshot_rows
+from torchserve_dashboard.logs import LEVELS, LogTailer
+from torchserve_dashboard.metrics import LATENCY_METRIC, QUEUE_LATENCY_METRIC, REQUESTS_METRIC, MetricsScraper
+from torchserve_dashboard.pagination import PagedListing
+from torchserve_dashboard.poller import StatePoller
+from torchserve_dashboard.ratelimit import RateLimitedManagementAPI, TokenBucket
+from torchserve_dashboard.predict import (ResponseCache, Sample, compare, default_cache_path, find_samples,
+                                          run_predictions)
+from torchserve_dashboard.rollout import RolloutPolicy, rollout
+from torchserve_dashboard.supervisor import READY, TorchServeSupervisor
+from torchserve_dashboard.tuner import apply_point, best, pareto_front, tune
+from pathlib import Path
 
 st.set_page_config(
     page_title="Torchserve Management Dashboard",
@@ -14,23 +43,42 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+
 def rerun():
     st.experimental_rerun()
 
-def error_callback(response:Response):
+
+def error_callback(response: Response):
     if response.status_code != 200:
         st.write("There was an error!")
         st.write(response)
 
-@st.cache(allow_output_mutation=True)
+
 def last_res():
-    return ["Nothing"]
+    # Per session, so one user's action result doesn't show up on everyone's page
+    return st.session_state.setdefault("last_res", ["Nothing"])
+
+
+def session_api(api, rate_limit, burst):
+    # The client, its connection pool and the cache stay shared; each session gets its own
+    # actor in the history and its own budget of management actions
+    if "api" not in st.session_state:
+        session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex[:8])
+        client = api.api.api  # under the shared recorder
+        recording = RecordingManagementAPI(client, api.history, default_actor(f"dashboard session {session_id}"))
+        limited = RateLimitedManagementAPI(recording, TokenBucket(rate_limit / 60, burst), session_id)
+        st.session_state["api"] = CachedManagementAPI(limited, api.cache)
+    return st.session_state["api"]
+
+
+def model_versions(description):
+    return [m["modelVersion"] for m in description or []]
+
 
 @st.experimental_singleton(suppress_st_warning=True)
 def check_args(_args):
 
-    args=_args
-    M_API = "http://127.0.0.1:8081"
+    args = _args
     model_store = args.model_store
     config_path = args.config_path
     log_location = args.log_location
@@ -39,16 +87,11 @@ def check_args(_args):
     if not os.path.exists(config_path):
         st.write(f"Can't find config file at {config_path}. Using default config instead")
         config_path = os.path.join(os.path.dirname(__file__), "default.torchserve.properties")
-    if os.path.exists(config_path):
-        config = open(config_path, "r").readlines()
-        for c in config:
-            if c.startswith("model_store"):
-                if not model_store:
-                    model_store = c.split("=")[-1].strip()
-            if c.startswith("management_address"):
-                M_API = c.split("=")[-1].strip()
-    else:
+    config = TorchServeConfig(config_path)
+    if not config.exists:
         st.write("Config file can't be found!")
+    if not model_store:
+        model_store = config.model_store
 
     if log_location:
         log_location = str(Path(log_location).resolve())
@@ -65,36 +108,719 @@ def check_args(_args):
         st.write(f"Created model store directory {model_store}")
         os.makedirs(model_store, exist_ok=True)
 
-    return M_API, config, model_store, config_path, log_location, metrics_location, log_config
+    return config, model_store, config_path, log_location, metrics_location, log_config
+
 
 @st.experimental_singleton(suppress_st_warning=True)
 def initialize(_args):
-    # Initialization should be done once! 
-    # As a design choice config_path,log_location,metrics_location are non-editable from the UI as a semi-security measure. Can only pass from command line.
-    api_address, config, model_store, config_path, log_location, metrics_location, log_config = check_args(_args)
-    api = ManagementAPI(api_address, error_callback)
+    # Initialization should be done once!
+    # As a design choice config_path,log_location,metrics_location are non-editable from the UI
+    # as a semi-security measure. Can only pass from command line.
+    config, model_store, config_path, log_location, metrics_location, log_config = check_args(_args)
+    api_address, metrics_address = config.management_address, config.metrics_address
+    inference_address = config.inference_address
+    # Every client below keeps these addresses until the dashboard restarts
+    config.mark_connected()
+    # The poller writes what it fetches into the cache the sync client reads through
+    cache = TTLCache()
+    history = HistoryStore(_args.history_db or default_history_path(api_address))
+    if _args.api_transport == "grpc":
+        # Model calls (and the poller's describes) go over gRPC, workflows stay on REST
+        grpc_target = config.grpc_management_target
+        sync_api = GrpcManagementAPI(api_address, grpc_target, error_callback)
+        async_api = AsyncGrpcManagementAPI(api_address, grpc_target)
+    else:
+        sync_api = ManagementAPI(api_address, error_callback)
+        async_api = AsyncManagementAPI(api_address)
+    api = CachedManagementAPI(RecordingManagementAPI(sync_api, history), cache)
+    scraper = MetricsScraper(metrics_address, interval=_args.metrics_interval).start()
     ts = LocalTS(model_store, config_path, log_location, metrics_location, log_config)
+    supervisor = TorchServeSupervisor(ts, inference_address, api_address)
     torchserve_status = api.get_loaded_models()
-    if not torchserve_status and args.init:
-        st.write("Starting Torchserve")
-        last_res()[0] = ts.start_torchserve()
+    if torchserve_status:
+        supervisor.attach()
+        # Best guess: the running server was started with the file as it is now
+        config.mark_applied()
+    elif _args.init:
+        with st.spinner("Starting Torchserve"):
+            last_res()[0] = supervisor.start()
+        config.mark_applied()
+    # The poller owns the async client from here on; the UI only reads its snapshots
+    poller = StatePoller(async_api, ts, interval=_args.poll_interval, cache=cache,
+                         describe_concurrency=_args.describe_concurrency)
+    health = WorkerHealthMonitor()
+    poller.add_listener(health.record)
+    poller.add_listener(history.record_snapshot)
+    feed = ChangeFeed(SNAPSHOT_KEY)
+    poller.add_listener(lambda snapshot: feed.update(snapshot_rows(snapshot)))
+    poller.start()
+    if _args.live_port:
+        EventStreamServer(feed, _args.live_port).start()
+    REGISTRY.gauge("torchserve_dashboard_cache_hit_ratio", "Hit ratio of the management API response cache.",
+                   lambda: cache.stats()["hit_rate"])
+    REGISTRY.gauge("torchserve_dashboard_snapshot_age_seconds", "Seconds since the last successful state poll.",
+                   lambda: poller.snapshot.age if poller.snapshot else None)
+    REGISTRY.gauge("torchserve_dashboard_scrape_age_seconds", "Seconds since the last metrics API scrape.",
+                   lambda: time.time() - scraper.last_scrape if scraper.last_scrape else None)
+    MetricsExporter(port=_args.export_port, path=_args.export_file).start()
+    return config, api, ts, scraper, poller, inference_address, health, supervisor, history, feed
+
+
+def uncached_async_api(api):
+    # Readiness polling must see fresh describe responses. Mutations are still recorded, and take
+    # tokens from the session's bucket, waiting for them rather than failing the whole job
+    grpc_target = getattr(api, "grpc_target", None)
+    client = AsyncGrpcManagementAPI(api.address, grpc_target) if grpc_target else AsyncManagementAPI(api.address)
+    limited = api.api
+    return RateLimitedManagementAPI(RecordingManagementAPI(client, api.history, api.actor), limited.bucket,
+                                    limited.name, wait=True)
+
+
+def follow_feed(feed, version, render, status, status_text, rerun_on_structural=True):
+    # Runs after the page is rendered and only rewrites the placeholders ``render`` fills, so
+    # unchanged sections are never recomputed. The status line is rewritten every second, which
+    # is also what lets Streamlit stop this loop when the user interacts with the page.
+    while True:
+        deltas = feed.wait(version, timeout=1.0)
+        if deltas:
+            if rerun_on_structural and any(d.structural for d in deltas):
+                # Models came or went: pickers everywhere on the page need a full pass
+                rerun()
+            version, rows = feed.rows()
+            render(rows)
+        status.caption(status_text())
+
+
+def render_rows(table, rows, columns):
+    if rows:
+        table.dataframe(pd.DataFrame(rows, columns=columns))
+
+
+def refresh_and_rerun(poller):
+    # Give the poller a moment to pick up the change so the rerun doesn't show stale state
+    poller.refresh(wait=2)
+    rerun()
+
+
+@st.experimental_singleton
+def autoscaler(_api, _scraper, _poller, log_location):
+    # Created stopped and in dry-run, scaling is opt-in from the UI
+    audit_path = os.path.join(log_location, "autoscaler.jsonl") if log_location else None
+    # Own client so the history shows the autoscaler, not a dashboard user, as the actor
+    api = CachedManagementAPI(RecordingManagementAPI(ManagementAPI(_api.address), _api.history,
+                                                     default_actor("autoscaler")), _api.cache)
+    return Autoscaler(api, _scraper.store, lambda: _poller.snapshot, audit_path=audit_path)
+
+
+@st.experimental_singleton
+def log_tailer(path):
+    # One index per file, kept across reruns so only appended bytes are read
+    return LogTailer(path)
+
+
+def logs_dashboard(log_location):
+    st.markdown("# Logs [(docs)](https://pytorch.org/serve/logging.html)")
+    log_files = []
+    if log_location and os.path.isdir(log_location):
+        log_files = sorted(f for f in os.listdir(log_location) if f.endswith(".log"))
+    if not log_files:
+        st.write(f"No log files in {log_location}")
+        return
+    log_file = st.selectbox("Log file", log_files)
+    tailer = log_tailer(os.path.join(log_location, log_file))
+    # Index up to the end of the file first, newest-first pages would otherwise start from an old window
+    progress = st.empty()
+    tailer.catch_up(lambda done, total: progress.progress(done / total))
+    progress.empty()
+    col1, col2, col3 = st.columns(3)
+    min_level = col1.selectbox("Minimum level", ["Any"] + LEVELS, index=0)
+    model = col2.selectbox("Model", ["Any"] + tailer.model_names, index=0)
+    page_size = col3.number_input("Lines per page", value=100, min_value=10, max_value=1000, step=10)
+    min_level = None if min_level == "Any" else min_level
+    model = None if model == "Any" else model
+    total = len(tailer.query(min_level, model))
+    pages = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (newest first, {pages} pages)", value=1, min_value=1, max_value=pages, step=1)
+    lines, total = tailer.page(page - 1, page_size, min_level, model)
+    st.caption(f"{total} matching of {len(tailer)} indexed lines")
+    st.code("\n".join(text for _, text in lines) or " ", language=None)
+
+
+def bulk_dashboard(api, poller, stored_models, catalog):
+    st.markdown(
+        "# Bulk register [(docs)](https://pytorch.org/serve/management_api.html#register-a-model)"
+    )
+    manifest = st.file_uploader("Manifest (YAML or CSV with url, model_name, batch_size, initial_workers, ...)",
+                                type=["yaml", "yml", "csv"])
+    if manifest is not None:
+        fmt = "csv" if manifest.name.endswith(".csv") else "yaml"
+        try:
+            items = load_manifest(manifest.getvalue().decode("utf-8"), fmt)
+        except (ValueError, ImportError) as e:
+            st.error(f"Invalid manifest: {e}")
+            return
+    else:
+        mar_paths = st.multiselect("Choose mar files", stored_models)
+        col1, col2 = st.columns(2)
+        batch_size = col1.number_input(label="batch_size ", value=0, min_value=0, step=1)
+        max_batch_delay = col2.number_input(label="max_batch_delay ", value=0, min_value=0, step=100)
+        initial_workers = col1.number_input(label="initial_workers ", value=1, min_value=0, step=1)
+        response_timeout = col2.number_input(label="response_timeout ", value=0, min_value=0, step=100)
+        items = [
+            BulkItem(m, batch_size=batch_size, max_batch_delay=max_batch_delay,
+                     initial_workers=initial_workers, response_timeout=response_timeout)
+            for m in mar_paths
+        ]
+    col1, col2, col3 = st.columns(3)
+    concurrency = col1.number_input("Concurrency", value=8, min_value=1, step=1)
+    retries = col2.number_input("Retries", value=3, min_value=0, step=1)
+    ready_timeout = col3.number_input("Ready timeout (s)", value=300, min_value=10, step=30)
+    st.write(f"{len(items)} models to register")
+    if not st.button("Register all") or not items:
+        return
+
+    progress = st.progress(0.0)
+    table = st.empty()
+    states = {i: {"model": item.label, "state": "queued", "message": "", "elapsed (s)": 0.0}
+              for i, item in enumerate(items)}
+
+    async def run():
+        done = 0
+        # Uncached client: readiness polling must see fresh describe responses
+        async with uncached_async_api(api) as async_api:
+            async for event in bulk_register(async_api, items, concurrency, retries, ready_timeout=ready_timeout,
+                                             catalog=catalog):
+                states[event.index].update(state=event.state, message=event.message,
+                                           **{"elapsed (s)": round(event.elapsed, 1)})
+                done += event.done
+                progress.progress(done / len(items))
+                table.dataframe(pd.DataFrame(states.values()))
+
+    asyncio.run(run())
+    api.cache.invalidate()
+    failed = sum(1 for s in states.values() if s["state"] == "failed")
+    last_res()[0] = f"Bulk register: {len(items) - failed} ready, {failed} failed"
+    poller.refresh()
+
+
+def archive_dashboard(ts, poller):
+    st.markdown(
+        "# Build an archive [(docs)](https://github.com/pytorch/serve/blob/master/model-archiver/README.md)"
+    )
+    st.caption(f"Paths are on the dashboard host. The archive is written to {ts.model_store}.")
+    col1, col2 = st.columns(2)
+    model_name = col1.text_input("Model name *", key="archive_model_name")
+    version = col2.text_input("Version *", value="1.0", key="archive_version")
+    serialized_file = st.text_input("Serialized file (weights or TorchScript)", key="archive_serialized_file")
+    model_file = st.text_input("Model file (eager mode model definition)", key="archive_model_file")
+    handler = st.text_input("Handler (file or built-in name) *", key="archive_handler")
+    extra_files = st.text_input("Extra files or directories (comma separated)", key="archive_extra_files")
+    requirements_file = st.text_input("Requirements file", key="archive_requirements_file")
+    col1, col2, col3 = st.columns(3)
+    compression = col1.radio("Compression", COMPRESSION,
+                             help="auto stores members that don't compress, like most float weights")
+    workers = col2.number_input("Threads (0 = one per CPU)", value=0, min_value=0, step=1)
+    level = col3.number_input("Deflate level", value=6, min_value=1, max_value=9, step=1)
+    overwrite = st.checkbox("Overwrite an existing archive")
+    if not st.button("Build archive"):
+        return
+    if not model_name or not version or not handler or not (serialized_file or model_file):
+        st.warning(":octagonal_sign: Fill the required fileds!")
+        return
+    progress = st.progress(0.0)
+    shown = [0.0]
+
+    def update(done, total):
+        if time.monotonic() - shown[0] > 0.5 or done == total:
+            shown[0] = time.monotonic()
+            progress.progress(done / total if total else 1.0)
+
+    try:
+        with st.spinner(f"Archiving {model_name}..."):
+            result = build_mar(model_name, version, ts.model_store, handler,
+                               serialized_file=serialized_file or None,
+                               model_file=model_file or None,
+                               extra_files=[p.strip() for p in extra_files.split(",") if p.strip()],
+                               requirements_file=requirements_file or None,
+                               compression=compression, level=level, workers=workers, overwrite=overwrite,
+                               progress=update)
+    except (OSError, ValueError) as e:
+        st.error(e)
+        return
+    last_res()[0] = (f"Built {result.path}: {result.bytes_in / 2**20:.1f} MiB packed into "
+                     f"{result.size / 2**20:.1f} MiB in {result.seconds:.1f}s")
+    refresh_and_rerun(poller)
+
+
+def benchmark_dashboard(inference_address, snapshot, samples_dir, grpc_target=None):
+    st.markdown(
+        "# Benchmark [(docs)](https://pytorch.org/serve/inference_api.html#predictions-api)"
+    )
+    model_name = st.selectbox("Model to benchmark", snapshot.model_names)
+    versions = model_versions(snapshot.all_descriptions.get(model_name))
+    version = st.selectbox("Version to benchmark", ["Default"] + versions, index=0)
+    uploads = st.file_uploader("Sample payloads", accept_multiple_files=True)
+    sample_dir = st.text_input("Or a directory of sample payloads", value=samples_dir or "")
+    col1, col2, col3 = st.columns(3)
+    mode = col1.radio("Load", ["Closed loop (concurrency)", "Open loop (fixed RPS)"])
+    concurrency = col2.number_input("Concurrency / max connections", value=8, min_value=1, step=1)
+    rps = col2.number_input("Target RPS (open loop)", value=50.0, min_value=0.1, step=10.0)
+    duration = col3.number_input("Duration (s)", value=30.0, min_value=1.0, step=5.0)
+    if not st.button("Run benchmark"):
+        return
+    payloads = [u.getvalue() for u in uploads or []]
+    if not payloads and sample_dir:
+        if not os.path.isdir(sample_dir):
+            st.warning(f"{sample_dir} is not a directory")
+            return
+        payloads = load_payloads(sample_dir)
+    if not payloads or model_name is None:
+        st.warning(":octagonal_sign: Pick a model and at least one sample payload!")
+        return
+    with st.spinner(f"Benchmarking {model_name} for {duration:g}s..."):
+        result = asyncio.run(run_benchmark(
+            inference_address, model_name, payloads,
+            version=None if version == "Default" else version,
+            concurrency=concurrency,
+            rps=rps if mode.startswith("Open") else None,
+            duration=duration,
+            grpc_target=grpc_target,
+        ))
+    st.table(pd.DataFrame([result.summary()]).T.rename(columns={0: "value"}).astype(str))
+    st.line_chart(pd.DataFrame(result.histogram.distribution()).set_index("percentile"))
+    col1, col2 = st.columns(2)
+    col1.download_button("Download JSON", result.to_json(), file_name=f"benchmark_{model_name}.json",
+                         mime="application/json")
+    col2.download_button("Download CSV", result.to_csv(), file_name=f"benchmark_{model_name}.csv", mime="text/csv")
+
+
+@st.experimental_singleton
+def prediction_cache(path):
+    return ResponseCache(path or default_cache_path())
+
+
+def prediction_dashboard(inference_address, snapshot, samples_dir, cache):
+    st.markdown(
+        "# Predict [(docs)](https://pytorch.org/serve/inference_api.html#predictions-api)"
+    )
+    model_name = st.selectbox("Model to query", snapshot.model_names, key="predict_model")
+    versions = model_versions(snapshot.all_descriptions.get(model_name))
+    default = model_versions(snapshot.descriptions.get(model_name))[:1]
+    if not versions:
+        st.write("Model has no versions")
+        return
+    # Always a concrete version, it is part of the cache key
+    version = st.selectbox("Version", versions, index=versions.index(default[0]) if default else 0)
+    other = st.selectbox("Compare with version", ["None"] + [v for v in versions if v != version], index=0)
+    uploads = st.file_uploader("Samples", accept_multiple_files=True, key="predict_uploads")
+    sample_dir = st.text_input("Or a directory of samples (streamed from disk)", value=samples_dir or "",
+                               key="predict_dir")
+    col1, col2, col3 = st.columns(3)
+    concurrency = col1.number_input("Parallel requests", value=8, min_value=1, step=1)
+    reuse = col2.checkbox("Reuse cached responses", value=True)
+    if col3.button("Clear response cache"):
+        st.write(f"Dropped {cache.clear(model_name)} cached responses for {model_name}")
+    st.caption(f"Cache: {cache.stats()['responses']} responses in {cache.path}")
+
+    if st.button("Run predictions") and model_name:
+        samples = [Sample(u.name, len(u.getvalue()), data=u.getvalue()) for u in uploads or []]
+        if not samples and sample_dir:
+            if not os.path.isdir(sample_dir):
+                st.warning(f"{sample_dir} is not a directory")
+                return
+            samples = find_samples([sample_dir])
+        if not samples:
+            st.warning(":octagonal_sign: Upload samples or pick a directory!")
+            return
+        progress = st.progress(0.0)
+        status = st.empty()
+
+        async def run(run_version):
+            results, shown = {}, 0.0
+            async for r in run_predictions(inference_address, model_name, run_version, samples,
+                                           concurrency=concurrency, cache=cache, reuse=reuse):
+                results[r.name] = r
+                # Throttled, a 5k sample run would otherwise send 10k UI updates
+                if time.monotonic() - shown > 0.25 or len(results) == len(samples):
+                    shown = time.monotonic()
+                    progress.progress(len(results) / len(samples))
+                    status.caption(f"{model_name} {run_version}: {len(results)}/{len(samples)}")
+            return results
+
+        results = asyncio.run(run(version))
+        baseline = asyncio.run(run(other)) if other != "None" else None
+        progress.empty()
+        status.empty()
+        st.session_state["predictions"] = (model_name, version, results, other, baseline)
+
+    if "predictions" in st.session_state and st.session_state["predictions"][0] == model_name:
+        _, version, results, other, baseline = st.session_state["predictions"]
+        values = list(results.values())
+        failed = sum(1 for r in values if not r.ok)
+        cached = sum(1 for r in values if r.cached)
+        st.write(f"{len(values)} samples on {version}: {len(values) - failed} ok, {failed} failed, "
+                 f"{cached} answered from the cache")
+        df = pd.DataFrame([r.as_row() for r in values])
+        st.dataframe(df.sort_values(["status", "sample"]) if failed else df)
+        st.download_button("Download JSON lines", "\n".join(r.as_json() for r in values),
+                           file_name=f"predictions_{model_name}_{version}.jsonl", mime="application/json")
+        if baseline is not None:
+            mismatches = compare(baseline, results)
+            st.subheader(f"{len(mismatches)}/{len(values)} responses differ from {other}")
+            if mismatches:
+                st.dataframe(pd.DataFrame(mismatches))
+
+
+def workflow_picker(workflows, label, default_key):
+    query = st.text_input(f"{label} (search)", key=f"{label}_search")
+    names = [w["workflowName"] for w in (workflows.search(query, "workflowName") if query else workflows.page(0))]
+    return st.selectbox(label, [default_key] + names, index=0)
+
+
+def parse_int_list(text):
+    return [int(v) for v in text.replace(" ", "").split(",") if v]
+
+
+def tuner_dashboard(api, poller, inference_address, snapshot, samples_dir):
+    st.markdown(
+        "# Auto-tune [(docs)](https://pytorch.org/serve/performance_guide.html)"
+    )
+    st.warning("Tuning re-registers and rescales the model, don't run it against a model serving live traffic.")
+    model_name = st.selectbox("Model to tune", snapshot.model_names)
+    description = (snapshot.descriptions.get(model_name) or [{}])[0]
+    mar_url = st.text_input("Archive to re-register from", value=description.get("modelUrl", ""))
+    col1, col2, col3 = st.columns(3)
+    batch_sizes = col1.text_input("batch_size values", value="1,2,4,8")
+    max_batch_delays = col2.text_input("max_batch_delay values", value="50,100")
+    workers = col3.text_input("worker counts", value="1,2")
+    strategy = col1.radio("Search", ["guided", "grid"])
+    p99_slo = col2.number_input("p99 SLO ms (0 = none)", value=0.0, min_value=0.0, step=10.0)
+    max_trials = col3.number_input("Max trials (0 = all)", value=0, min_value=0, step=1)
+    concurrency = col1.number_input("Load concurrency", value=16, min_value=1, step=1)
+    duration = col2.number_input("Seconds per trial", value=20.0, min_value=1.0, step=5.0)
+    sample_dir = col3.text_input("Sample payload directory", value=samples_dir or "")
+    uploads = st.file_uploader("Tuning payloads", accept_multiple_files=True)
+
+    if st.button("Start tuning") and model_name:
+        payloads = [u.getvalue() for u in uploads or []]
+        if not payloads and sample_dir and os.path.isdir(sample_dir):
+            payloads = load_payloads(sample_dir)
+        if not payloads or not mar_url:
+            st.warning(":octagonal_sign: Need an archive and at least one sample payload!")
+            return
+        version = description.get("modelVersion")
+        results = []
+        table = st.empty()
+
+        async def run():
+            async with uncached_async_api(api) as async_api:
+                async for result in tune(async_api, inference_address, model_name, version, mar_url, payloads,
+                                         parse_int_list(batch_sizes), parse_int_list(max_batch_delays),
+                                         parse_int_list(workers), strategy=strategy,
+                                         p99_slo_ms=p99_slo or None, max_trials=max_trials or None,
+                                         concurrency=concurrency, duration=duration):
+                    results.append(result)
+                    table.dataframe(pd.DataFrame([r.as_row() for r in results]))
+
+        with st.spinner("Tuning..."):
+            asyncio.run(run())
+        api.cache.invalidate()
+        poller.refresh()
+        st.session_state["tuning"] = (model_name, version, mar_url, results, p99_slo or None)
+
+    if "tuning" in st.session_state and st.session_state["tuning"][0] == model_name:
+        _, version, mar_url, results, p99_slo = st.session_state["tuning"]
+        df = pd.DataFrame([r.as_row() for r in results])
+        st.subheader("Throughput vs p99 latency")
+        st.vega_lite_chart(df, {
+            "mark": {"type": "point", "tooltip": True},
+            "encoding": {
+                "x": {"field": "p99_ms", "type": "quantitative"},
+                "y": {"field": "throughput_rps", "type": "quantitative"},
+                "color": {"field": "workers", "type": "nominal"},
+                "shape": {"field": "batch_size", "type": "nominal"},
+            },
+        }, use_container_width=True)
+        st.subheader("Pareto-optimal configurations")
+        st.dataframe(pd.DataFrame([r.as_row() for r in pareto_front(results)]))
+        chosen = best(results, p99_slo)
+        if chosen is not None and st.button(f"Apply best: {chosen.point._asdict()}"):
+            async def apply():
+                async with uncached_async_api(api) as async_api:
+                    await apply_point(async_api, model_name, version, mar_url, chosen.point, None)
+
+            asyncio.run(apply())
+            last_res()[0] = f"Applied {chosen.point._asdict()} to {model_name}"
+            api.cache.invalidate()
+            refresh_and_rerun(poller)
+
+
+def rollout_dashboard(api, poller, scraper, ts, inference_address, snapshot, stored_models, samples_dir):
+    st.markdown("# Canary rollout")
+    st.caption("Registers the new version next to the default one, scales it step by step and compares it with "
+               "the default version. Promotes it with set-default if every step passes, otherwise unregisters it.")
+    model_name = st.selectbox("Model to roll out", snapshot.model_names)
+    baseline = model_versions(snapshot.descriptions.get(model_name))[:1]
+    if not baseline:
+        st.write("Model has no default version")
+        return
+    st.write(f"Baseline (current default): {baseline[0]}")
+    mar_path = st.selectbox("New archive", stored_models)
+    mar_info = ts.catalog.get(mar_path) if mar_path else None
+    new_version = st.text_input("New version (from its MANIFEST)",
+                                value=(mar_info.model_version or "") if mar_info else "")
+    col1, col2, col3 = st.columns(3)
+    steps = col1.text_input("Canary worker steps", value="1,2,4")
+    step_duration = col2.number_input("Seconds per step", value=120.0, min_value=5.0, step=30.0)
+    min_requests = col3.number_input("Min requests per step", value=20, min_value=1, step=10)
+    max_latency_ratio = col1.number_input("Max latency vs baseline", value=1.25, min_value=1.0, step=0.05)
+    max_error_rate = col2.number_input("Max probe error rate", value=0.01, min_value=0.0, max_value=1.0, step=0.01)
+    probe_rps = col3.number_input("Probe requests/s per version", value=2.0, min_value=0.1, step=1.0)
+    retire = st.checkbox("Unregister the baseline after promotion")
+    sample_dir = st.text_input("Probe payload directory (empty = live traffic only)", value=samples_dir or "")
+    if scraper.last_error:
+        st.warning(f"Metrics API isn't being scraped ({scraper.last_error}), only probes can be compared")
+
+    if st.button("Start rollout"):
+        if not new_version or new_version == baseline[0]:
+            st.warning(":octagonal_sign: The new archive needs a version different from the baseline!")
+            return
+        payloads = load_payloads(sample_dir) if sample_dir and os.path.isdir(sample_dir) else None
+        policy = RolloutPolicy(steps=parse_int_list(steps), step_duration=step_duration,
+                               max_latency_ratio=max_latency_ratio, max_error_rate=max_error_rate,
+                               min_requests=int(min_requests), probe_rps=probe_rps, retire_baseline=retire)
+        rows = []
+        table = st.empty()
+
+        async def run():
+            async with uncached_async_api(api) as async_api:
+                async for event in rollout(async_api, scraper.store, inference_address, model_name, mar_path,
+                                           new_version, baseline[0], policy, payloads):
+                    rows.append(event.as_row())
+                    table.dataframe(pd.DataFrame(rows))
+                    last_res()[0] = event.message
+
+        with st.spinner(f"Rolling out {model_name} {new_version}..."):
+            asyncio.run(run())
+        api.cache.invalidate()
+        poller.refresh()
+
+
+def autoscaler_dashboard(scaler, snapshot):
+    st.markdown("# Autoscaler")
+    st.caption("Scales each model's default version from the metrics API: worker utilization "
+               "(inference time per second / workers) and mean queue time over the window.")
+    col1, col2, col3 = st.columns(3)
+    model = col1.selectbox("Model", snapshot.model_names)
+    current = scaler.bounds.get(model, ScalingBounds())
+    min_workers = col2.number_input("min workers", value=current.min_workers, min_value=1, step=1)
+    max_workers = col3.number_input("max workers", value=max(current.max_workers, min_workers), min_value=1, step=1)
+    col1, col2 = st.columns(2)
+    if col1.button("Autoscale this model") and model:
+        scaler.set_bounds(model, ScalingBounds(int(min_workers), int(max(min_workers, max_workers))))
+    if col2.button("Stop autoscaling this model"):
+        scaler.set_bounds(model, None)
+    if scaler.bounds:
+        st.table(pd.DataFrame([{"model": m, **b._asdict()} for m, b in sorted(scaler.bounds.items())]))
+
+    policy = scaler.policy
+    col1, col2, col3 = st.columns(3)
+    scale_up = col1.number_input("Scale up above utilization", value=policy.scale_up_utilization, min_value=0.05,
+                                 max_value=1.0, step=0.05)
+    scale_down = col2.number_input("Scale down below utilization", value=policy.scale_down_utilization, min_value=0.0,
+                                   max_value=1.0, step=0.05)
+    max_queue = col3.number_input("Max queue time (ms)", value=policy.max_queue_ms, min_value=1.0, step=10.0)
+    up_cooldown = col1.number_input("Scale-up cooldown (s)", value=policy.scale_up_cooldown, min_value=0.0, step=30.0)
+    down_cooldown = col2.number_input("Scale-down cooldown (s)", value=policy.scale_down_cooldown, min_value=0.0,
+                                      step=60.0)
+    window = col3.number_input("Window (s)", value=policy.window, min_value=10.0, step=30.0)
+    if scale_down >= scale_up:
+        st.warning("Scale-down utilization must be below scale-up utilization")
+    else:
+        scaler.policy = policy._replace(scale_up_utilization=scale_up, scale_down_utilization=scale_down,
+                                        max_queue_ms=max_queue, scale_up_cooldown=up_cooldown,
+                                        scale_down_cooldown=down_cooldown, window=window)
+    scaler.dry_run = st.checkbox("Dry run (only log decisions)", value=scaler.dry_run)
+    if scaler.running:
+        st.write(f"Running every {scaler.interval:g}s" + (" in dry-run" if scaler.dry_run else ""))
+        if st.button("Stop autoscaler"):
+            scaler.stop()
+            rerun()
+    elif st.button("Start autoscaler"):
+        scaler.start()
         rerun()
-    return config, api, ts
+    if scaler.decisions:
+        df = pd.DataFrame([d._asdict() for d in list(scaler.decisions)[-200:]])
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        st.dataframe(df.iloc[::-1])
+    if scaler.audit_path:
+        st.caption(f"Audit log: {scaler.audit_path}")
+
+
+def history_dashboard(api, poller, history, snapshot, catalog):
+    st.markdown("# History")
+    st.caption(f"Stored in {history.path}")
+    col1, col2, col3 = st.columns(3)
+    hours = col1.selectbox("Time range", [1, 6, 24, 24 * 7, 24 * 30], index=2,
+                           format_func=lambda h: f"last {h} h" if h < 48 else f"last {h // 24} days")
+    model = col2.selectbox("Model", ["All"] + sorted(set(history.models()) | set(snapshot.model_names)))
+    model = None if model == "All" else model
+    since = time.time() - hours * 3600
+    actions = history.actions(since, model=model)
+    st.subheader("Actions")
+    if actions:
+        df = pd.DataFrame(actions, columns=actions[0]._fields).drop(columns=["id"])
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        st.dataframe(df)
+    else:
+        st.write("No actions in this range")
+
+    st.subheader("Layout snapshots")
+    snapshots = history.snapshots(since, model=model)
+    if not snapshots:
+        st.write("No snapshots in this range")
+        return
+    snapshot_id = st.selectbox("Snapshot", [s[0] for s in snapshots], format_func=lambda i: next(
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))} ({n} model versions)"
+        for s_id, t, n in snapshots if s_id == i))
+    layout = history.layout(snapshot_id)
+    st.dataframe(pd.DataFrame(layout, columns=layout[0]._fields) if layout else pd.DataFrame())
+    unregister_extra = st.checkbox("Also unregister models that aren't in the snapshot")
+    plan = restore_plan(layout, snapshot, unregister_extra)
+    if plan.empty:
+        st.write("The current layout already matches this snapshot")
+        return
+    st.write(f"Restoring registers {len(plan.register)}, rescales {len(plan.scale)}, changes the default of "
+             f"{len(plan.set_default)} and unregisters {len(plan.unregister)} model versions")
+    if st.button("Restore this layout"):
+        steps = []
+        table = st.empty()
+
+        async def run():
+            async with uncached_async_api(api) as async_api:
+                async for step in restore(async_api, plan, catalog=catalog):
+                    steps.append(step._asdict())
+                    table.dataframe(pd.DataFrame(steps))
+
+        with st.spinner("Restoring..."):
+            asyncio.run(run())
+        api.cache.invalidate()
+        poller.refresh()
+
+
+def health_dashboard(health):
+    st.markdown("# Worker health")
+    summary = health.summary()
+    if not summary:
+        st.write("No worker samples yet")
+        return
+    col1, col2 = st.columns(2)
+    slope = col1.number_input("Leak threshold (MB/min)", value=5.0, min_value=0.1, step=1.0)
+    memory_limit = col2.number_input("Worker memory limit MB (0 = unknown)", value=0.0, min_value=0.0, step=1024.0)
+    for alert in health.leak_alerts(slope_mb_per_min=slope, memory_limit_mb=memory_limit or None):
+        st.warning(f"Possible leak: {alert.model} v{alert.version} worker {alert.worker}: {alert.message}")
+    st.dataframe(pd.DataFrame(summary))
+    events = health.recent_events()
+    if events:
+        st.subheader("Restarts & unhealthy states")
+        df = pd.DataFrame(events[-200:])
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        st.dataframe(df)
+    model = st.selectbox("Model history", sorted({row["model"] for row in summary}))
+    df = pd.DataFrame(health.history(model))
+    if df.empty:
+        return
+    df["time"] = pd.to_datetime(df["time"], unit="s")
+    st.vega_lite_chart(df, {
+        "mark": "rect",
+        "encoding": {
+            "x": {"field": "time", "type": "temporal"},
+            "y": {"field": "worker", "type": "nominal"},
+            "color": {"field": "memory_mb", "type": "quantitative", "scale": {"scheme": "reds"}},
+            "tooltip": [{"field": "worker"}, {"field": "memory_mb"}, {"field": "state"}],
+        },
+    }, use_container_width=True)
+    st.vega_lite_chart(df, {
+        "mark": "rect",
+        "encoding": {
+            "x": {"field": "time", "type": "temporal"},
+            "y": {"field": "worker", "type": "nominal"},
+            "color": {"field": "state", "type": "nominal"},
+        },
+    }, use_container_width=True)
+
+
+def profiling_dashboard(api, poller):
+    st.markdown("# Dashboard profiling")
+    snapshot_age = poller.snapshot.age if poller.snapshot else float("nan")
+    polls = POLL_DURATION.stats()
+    renders = RENDER_DURATION.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Cache hit rate", f"{api.cache.stats()['hit_rate']:.0%}")
+    col2.metric("Snapshot age", f"{snapshot_age:.1f}s")
+    col3.metric("Poll p50", f"{polls[0]['p50_ms']:.0f} ms" if polls else "-")
+    col4.metric("Rerun p50", f"{renders[0]['p50_ms']:.0f} ms" if renders else "-")
+    st.caption("Latency until response headers, per endpoint. Rerun time is the Streamlit script itself.")
+    latency = pd.DataFrame(HTTP_LATENCY.stats())
+    if not latency.empty:
+        st.dataframe(latency.round(1))
+    responses = HTTP_RESPONSES.rows()
+    errors = HTTP_ERRORS.rows()
+    if responses:
+        st.subheader("Responses by status")
+        st.dataframe(pd.DataFrame(responses))
+    if errors:
+        st.subheader("Transport errors")
+        st.dataframe(pd.DataFrame(errors))
+    st.download_button("Download /metrics", REGISTRY.render(), file_name="dashboard-metrics.prom")
+
+
+def metrics_dashboard(scraper):
+    st.markdown(
+        "# Metrics [(docs)](https://pytorch.org/serve/metrics_api.html)"
+    )
+    store = scraper.store
+    if scraper.last_error:
+        st.warning(f"Scraping {scraper.address}/metrics failed: {scraper.last_error}")
+    if scraper.last_scrape is None:
+        st.write("Waiting for the first scrape...")
+        return
+    st.caption(f"Every {scraper.interval:g}s, {store.count}/{store.capacity} scrapes kept, {len(store.index)} series")
+    series = store.models()
+    if not series:
+        st.write("No per model metrics exported yet")
+        return
+    model, version = st.selectbox("Model", series, format_func=lambda s: f"{s[0]} ({s[1]})")
+    ts, requests = store.rate(REQUESTS_METRIC, model, version)
+    _, latency = store.mean_latency_ms(LATENCY_METRIC, model, version)
+    _, queue = store.mean_latency_ms(QUEUE_LATENCY_METRIC, model, version)
+    index = pd.to_datetime(ts, unit="s")
+    st.subheader("Requests/s")
+    st.line_chart(pd.DataFrame({"requests/s": requests}, index=index))
+    st.subheader("Mean latency (ms)")
+    st.line_chart(pd.DataFrame({"inference": latency, "queue": queue}, index=index))
+
 
 def dashboard(args):
     st.title("Torchserve Management Dashboard")
     default_key = "None"
-    config, api, ts = initialize(args)
-    ts_version,ts_error=ts.check_version() # doing it this way rather than ts.__version__ on purpose
+    config, shared_api, ts, scraper, poller, inference_address, health, supervisor, history, feed = initialize(args)
+    api = session_api(shared_api, args.session_rate_limit, args.session_burst)
+    snapshot = poller.snapshot or poller.wait_for_update(timeout=30)
+    if snapshot is None:
+        st.error(f"Could not collect Torchserve state: {poller.last_error}")
+        st.stop()
+    # doing it this way rather than ts.__version__ on purpose
+    ts_version, ts_error = snapshot.version, snapshot.version_error
     if ts_error:
         st.error(ts_error)
         st.stop()
 
-    support_workflow=False #Temp workaround
+    support_workflow = False  # Temp workaround
     if '0.4' in ts_version:
-        support_workflow=True
+        support_workflow = True
 
-    ##########Sidebar##########
+    # Sidebar
     st.sidebar.markdown("## Help")
     with st.sidebar.expander(label="Show Paths:", expanded=False):
         st.markdown(f"### Model Store Path: \n {ts.model_store}")
@@ -102,37 +828,107 @@ def dashboard(args):
         st.markdown(f"### Log Location: \n {ts.log_location}")
         st.markdown(f"### Metrics Location: \n {ts.metrics_location}")
     st.sidebar.write(ts_version)
+
+    def state_age():
+        snapshot = poller.snapshot
+        failed = f" (last poll failed: {poller.last_error})" if poller.last_error else ""
+        return f"State from {snapshot.age:.1f}s ago{failed}"
+    age_caption = st.sidebar.empty()
+    age_caption.caption(state_age())
+    if st.sidebar.button("Refresh"):
+        refresh_and_rerun(poller)
+    live = st.sidebar.checkbox("Live updates", key="live_updates",
+                               help="Push worker changes into the page as they happen instead of rerunning it")
+    if supervisor.state == READY and supervisor.cold_start is not None:
+        st.sidebar.caption(f"Cold start: {supervisor.cold_start:.1f}s, restarts: {supervisor.restarts}")
+    elif supervisor.state != READY and supervisor.message:
+        st.sidebar.caption(f"Supervisor: {supervisor.state} - {supervisor.message}")
     start = st.sidebar.button("Start Torchserve")
     if start:
-        last_res()[0] = ts.start_torchserve()
-        rerun()
+        config.reload()
+        with st.spinner("Waiting for Torchserve to become ready"):
+            last_res()[0] = supervisor.start()
+        config.mark_applied()
+        refresh_and_rerun(poller)
 
     stop = st.sidebar.button("Stop Torchserve")
     if stop:
-        last_res()[0] = ts.stop_torchserve()
-        rerun()
+        with st.spinner("Stopping Torchserve"):
+            last_res()[0] = supervisor.stop()
+        refresh_and_rerun(poller)
 
-    torchserve_status = api.get_loaded_models()
+    torchserve_status = snapshot.models
     if torchserve_status:
-        loaded_models_names = [m["modelName"] for m in torchserve_status["models"]]
+        loaded_models_names = snapshot.model_names
+        default_descriptions, all_descriptions = snapshot.descriptions, snapshot.all_descriptions
     else:
         st.header("Torchserve is down...")
     st.sidebar.subheader("Loaded models")
     st.sidebar.write(torchserve_status)
 
-    stored_models = ts.get_model_store()
+    stored_models = snapshot.model_store
     st.sidebar.subheader("Available models")
-    st.sidebar.write(stored_models)
+    st.sidebar.dataframe(pd.DataFrame(
+        [(e.file, e.model_version, e.handler, round(e.size / 2**20, 1)) for e in ts.catalog.entries()],
+        columns=["file", "version", "handler", "MiB"],
+    ))
+    with st.sidebar.expander(label="API cache", expanded=False):
+        st.write(api.cache.stats())
+        st.caption(f"Actions left in this session's budget: {int(api.api.bucket.tokens)} "
+                   f"({api.api.rejected} rate limited)")
+        if st.button("Clear cache"):
+            api.cache.invalidate()
+            rerun()
     ####################
 
     st.markdown(f"**Last Message**: {last_res()[0]}")
 
+    feed_version, model_rows = feed.rows()
+    if model_rows:
+        st.subheader("Models")
+    models_table = st.empty()
+    render_rows(models_table, model_rows, SNAPSHOT_COLUMNS)
+
+    # Only reparsed when the file's mtime changes
+    config.reload()
+    pending = config.pending_changes()
+    if pending:
+        st.warning(f"{config.path} changed since Torchserve started, restart to apply {len(pending)} change(s)")
+    moved = config.address_changes()
+    if moved:
+        st.warning("The dashboard still talks to " + ", ".join(f"{old} ({k})" for k, old, _ in moved)
+                   + f" but {config.path} now says " + ", ".join(new for _, _, new in moved)
+                   + ". Restart the dashboard to follow the new addresses.")
     with st.expander(label="Show torchserve config", expanded=False):
-        st.write(config)
+        st.caption(config.path + (f" ({config.error})" if config.error else ""))
+        st.table(pd.DataFrame([(k, str(v)) for k, v in config.typed().items()], columns=["property", "value"]))
+        if pending:
+            st.markdown("**Not applied yet**")
+            st.table(pd.DataFrame(pending, columns=["property", "running", "file"]).fillna("(unset)"))
         st.markdown("[configuration docs](https://pytorch.org/serve/configuration.html)")
 
+    with st.expander(label="Dashboard profiling", expanded=False):
+        profiling_dashboard(api, poller)
+
     if torchserve_status:
 
+        with st.expander(label="Metrics", expanded=False):
+            metrics_dashboard(scraper)
+
+        with st.expander(label="Worker health", expanded=False):
+            health_dashboard(health)
+
+        with st.expander(label="Autoscaler", expanded=False):
+            autoscaler_dashboard(autoscaler(shared_api, scraper, poller, ts.log_location), snapshot)
+
+    with st.expander(label="Logs", expanded=False):
+        logs_dashboard(ts.log_location)
+
+    if torchserve_status:
+
+        with st.expander(label="Build an archive", expanded=False):
+            archive_dashboard(ts, poller)
+
         with st.expander(label="Register a model", expanded=False):
 
             st.markdown(
@@ -145,8 +941,14 @@ def dashboard(args):
             p = st.checkbox("manually enter location")
             if p:
                 mar_path = placeholder.text_input("Input mar file path*")
-            
-            model_name = st.text_input(label="Model name (overrides predefined)")
+            # Manifest details come from the catalog index, the archive isn't opened here
+            mar_info = ts.catalog.get(mar_path) if not p else None
+            if mar_info:
+                st.caption(f"{mar_info.model_name} v{mar_info.model_version} | handler: {mar_info.handler} | "
+                           f"runtime: {mar_info.runtime} | {mar_info.size / 2**20:.1f} MiB")
+
+            model_name = st.text_input(label="Model name (overrides predefined)",
+                                       placeholder=mar_info.model_name if mar_info else "")
             col1, col2 = st.columns(2)
             batch_size = col1.number_input(label="batch_size", value=0, min_value=0, step=1)
             max_batch_delay = col2.number_input(
@@ -158,9 +960,12 @@ def dashboard(args):
             response_timeout = col2.number_input(
                 label="response_timeout", value=0, min_value=0, step=100
             )
-            handler = col1.text_input(label="handler")
-            runtime = col2.text_input(label="runtime")
-            is_encrypted = st.checkbox("SSE-KMS Encrypted", help="Refer to https://github.com/pytorch/serve/blob/v0.5.0/docs/management_api.md#encrypted-model-serving")
+            handler = col1.text_input(label="handler", placeholder=mar_info.handler if mar_info else "")
+            runtime = col2.text_input(label="runtime", placeholder=mar_info.runtime if mar_info else "")
+            is_encrypted = st.checkbox(
+                "SSE-KMS Encrypted",
+                help="Refer to "
+                     "https://github.com/pytorch/serve/blob/v0.5.0/docs/management_api.md#encrypted-model-serving")
             proceed = st.button("Register")
             if proceed:
                 if mar_path != default_key:
@@ -177,10 +982,30 @@ def dashboard(args):
                         is_encrypted=is_encrypted,
                     )
                     last_res()[0] = res
-                    rerun()
+                    refresh_and_rerun(poller)
                 else:
                     st.warning(":octagonal_sign: Fill the required fileds!")
 
+        with st.expander(label="Benchmark", expanded=False):
+            benchmark_dashboard(inference_address, snapshot, args.samples_dir,
+                                config.grpc_inference_target if args.api_transport == "grpc" else None)
+
+        with st.expander(label="Predict", expanded=False):
+            prediction_dashboard(inference_address, snapshot, args.samples_dir,
+                                 prediction_cache(args.prediction_cache))
+
+        with st.expander(label="Auto-tune", expanded=False):
+            tuner_dashboard(api, poller, inference_address, snapshot, args.samples_dir)
+
+        with st.expander(label="Canary rollout", expanded=False):
+            rollout_dashboard(api, poller, scraper, ts, inference_address, snapshot, stored_models, args.samples_dir)
+
+        with st.expander(label="History", expanded=False):
+            history_dashboard(api, poller, history, snapshot, ts.catalog)
+
+        with st.expander(label="Bulk register", expanded=False):
+            bulk_dashboard(api, poller, stored_models, ts.catalog)
+
         with st.expander(label="Remove a model", expanded=False):
 
             st.header("Remove a model")
@@ -188,10 +1013,9 @@ def dashboard(args):
                 "Choose model to remove", [default_key] + loaded_models_names, index=0
             )
             if model_name != default_key:
-                default_version = api.get_model(model_name)[0]["modelVersion"]
-                st.write(f"default version {default_version}")
-                versions = api.get_model(model_name, list_all=True)
-                versions = [m["modelVersion"] for m in versions]
+                default_version = model_versions(default_descriptions.get(model_name))[:1]
+                st.write(f"default version {default_version[0] if default_version else None}")
+                versions = model_versions(all_descriptions.get(model_name))
                 version = st.selectbox(
                     "Choose version to remove", [default_key] + versions, index=0
                 )
@@ -200,7 +1024,7 @@ def dashboard(args):
                     if model_name != default_key and version != default_key:
                         res = api.delete_model(model_name, version)
                         last_res()[0] = res
-                        rerun()
+                        refresh_and_rerun(poller)
                     else:
                         st.warning(":octagonal_sign: Pick a model & version!")
 
@@ -211,10 +1035,8 @@ def dashboard(args):
                 "Choose model", [default_key] + loaded_models_names, index=0
             )
             if model_name != default_key:
-                default_version = api.get_model(model_name)[0]["modelVersion"]
-                st.write(f"default version {default_version}")
-                versions = api.get_model(model_name, list_all=False)
-                versions = [m["modelVersion"] for m in versions]
+                versions = model_versions(default_descriptions.get(model_name))
+                st.write(f"default version {versions[0] if versions else None}")
                 version = st.selectbox(
                     "Choose version", [default_key, "All"] + versions, index=0
                 )
@@ -235,10 +1057,8 @@ def dashboard(args):
                 "Pick model", [default_key] + loaded_models_names, index=0
             )
             if model_name != default_key:
-                default_version = api.get_model(model_name)[0]["modelVersion"]
-                st.write(f"default version {default_version}")
-                versions = api.get_model(model_name, list_all=False)
-                versions = [m["modelVersion"] for m in versions]
+                versions = model_versions(default_descriptions.get(model_name))
+                st.write(f"default version {versions[0] if versions else None}")
                 version = st.selectbox("Choose version", ["All"] + versions, index=0)
 
                 col1, col2, col3 = st.columns(3)
@@ -248,7 +1068,7 @@ def dashboard(args):
                 max_worker = col2.number_input(
                     label="max_worker(optional)", value=-1, min_value=-1, step=1
                 )
-                #             number_gpu = col3.number_input(label="number_gpu(optional)", value=-1, min_value=-1, step=1)
+                # number_gpu = col3.number_input(label="number_gpu(optional)", value=-1, min_value=-1, step=1)
                 proceed = st.button("Apply")
                 if proceed and model_name != default_key:
                     # number_input can't be set to None
@@ -262,17 +1082,21 @@ def dashboard(args):
                     #                     number_gpu=None
 
                     res = api.change_model_workers(model_name,
-                                                version=version,
-                                                min_worker=min_worker,
-                                                max_worker=max_worker,
-                                                #                     number_gpu=number_gpu,
-                                                )
+                                                   version=version,
+                                                   min_worker=min_worker,
+                                                   max_worker=max_worker,
+                                                   #                     number_gpu=number_gpu,
+                                                   )
                     last_res()[0] = res
-                    rerun()
+                    refresh_and_rerun(poller)
         if support_workflow:
+            # One lazily paged listing shared by every workflow expander in this rerun
+            workflows = PagedListing(api.list_workflows, "workflows")
+
             with st.expander(label="Register Workflow", expanded=False):
                 st.markdown(
-                    "# Register a workflow [(docs)](https://pytorch.org/serve/workflow_management_api.html#register-a-workflow)"
+                    "# Register a workflow "
+                    "[(docs)](https://pytorch.org/serve/workflow_management_api.html#register-a-workflow)"
                 )
                 url = st.text_input("Input war file path or URI *")
                 workflow_name = st.text_input(label="Workflow name (overrides predefined)")
@@ -282,51 +1106,119 @@ def dashboard(args):
 
             with st.expander(label="Show Workflow Details", expanded=False):
                 st.markdown(
-                    "# Describe a workflow [(docs)](https://pytorch.org/serve/workflow_management_api.html#describe-workflow)"
+                    "# Describe a workflow "
+                    "[(docs)](https://pytorch.org/serve/workflow_management_api.html#describe-workflow)"
                 )
-                loaded_workflows = api.list_workflows()  # only upto 100 TODO
-                if loaded_workflows and ("workflows" in loaded_workflows):
-                    loaded_workflow_names = [w["workflowName"] for w in loaded_workflows["workflows"]]
-                    workflow_name = st.selectbox(
-                        "Pick workflow", [default_key] + loaded_workflow_names, index=0
-                    )
-                    if workflow_name != default_key:
-                        res = api.get_workflow(workflow_name)
-                        st.write(res)
+                workflow_name = workflow_picker(workflows, "Pick workflow", default_key)
+                if workflow_name != default_key:
+                    res = api.get_workflow(workflow_name)
+                    st.write(res)
 
             with st.expander(label="Unregister Workflow", expanded=False):
                 st.markdown(
-                    "# Unregister a Workflow [(docs)](https://pytorch.org/serve/workflow_management_api.html#unregister-a-workflow)"
+                    "# Unregister a Workflow "
+                    "[(docs)](https://pytorch.org/serve/workflow_management_api.html#unregister-a-workflow)"
                 )
-                loaded_workflows = api.list_workflows()  # only upto 100
-                if loaded_workflows and ("workflows" in loaded_workflows):
-                    loaded_workflow_names = [w["workflowName"] for w in loaded_workflows["workflows"]]
-                    workflow_name = st.selectbox(
-                        "Unregister workflow", [default_key] + loaded_workflow_names, index=0
-                    )
-                    if workflow_name != default_key:
-                        res = api.unregister_workflow(workflow_name)
-                        st.write(res)
+                workflow_name = workflow_picker(workflows, "Unregister workflow", default_key)
+                if workflow_name != default_key:
+                    res = api.unregister_workflow(workflow_name)
+                    st.write(res)
 
             with st.expander(label="List Workflows", expanded=False):
                 st.markdown(
                     "# List Workflows"
                 )
-                workflows = []
-                loaded_workflows = api.list_workflows()
-                if loaded_workflows:
-                    if "workflows" in loaded_workflows:
-                        workflows.extend(loaded_workflows["workflows"])
-                st.write(workflows)
+                query = st.text_input("Search workflows", key="list_workflows_search")
+                if query:
+                    rows = workflows.search(query, "workflowName")
+                else:
+                    page = st.number_input(f"Page ({workflows.known_pages}{'' if workflows.exhausted else '+'} pages)",
+                                           value=1, min_value=1, step=1)
+                    rows = workflows.page(page - 1)
+                st.dataframe(pd.DataFrame(rows))
+
+    if live:
+        render = functools.partial(render_rows, models_table, columns=SNAPSHOT_COLUMNS)
+        return functools.partial(follow_feed, feed, feed_version, render, age_caption, state_age)
+
+
+@st.experimental_singleton
+def fleet_poller(endpoints, concurrency, timeout, interval, live_port, describe_concurrency):
+    # One poller for every session, so the nodes don't get polled once per viewer
+    poller = FleetPoller(list(endpoints), interval=interval, concurrency=concurrency, timeout=timeout,
+                         describe_concurrency=describe_concurrency).start()
+    if live_port:
+        EventStreamServer(poller.feed, live_port).start()
+    return poller
+
+
+def render_fleet(rows, endpoints, summary, table, pivot):
+    if not rows:
+        return
+    df = pd.DataFrame(rows, columns=FLEET_COLUMNS).sort_values(["node", "model", "version"])
+    table.dataframe(df)
+    healthy = df[df["status"] == "ok"]["node"].nunique()
+    summary.markdown(f"**{healthy}/{len(endpoints)}** nodes serving models")
+    if not df[df["status"] == "ok"].empty:
+        pivot.dataframe(
+            df[df["status"] == "ok"].pivot_table(
+                index=["model", "version"], columns="node", values="ready_workers", aggfunc="sum", fill_value=0
+            )
+        )
+
+
+def fleet_dashboard(args):
+    st.title("Torchserve Fleet Dashboard")
+    endpoints = load_endpoints(args.fleet)
+    st.sidebar.subheader(f"{len(endpoints)} nodes")
+    st.sidebar.write(endpoints)
+    if not endpoints:
+        st.warning("No management endpoints given")
+        return
+    poller = fleet_poller(tuple(endpoints), args.fleet_concurrency, args.fleet_timeout, args.poll_interval,
+                          args.live_port, args.describe_concurrency)
+    feed = poller.feed
+    if st.sidebar.button("Refresh"):
+        poller.refresh()
+    live = st.sidebar.checkbox("Live updates", key="live_updates",
+                               help="Push node changes into the page as they happen instead of rerunning it")
+
+    def poll_status():
+        age = f", updated {time.time() - feed.updated_at:.1f}s ago" if feed.updated_at else ""
+        return f"{poller.nodes_answered}/{len(endpoints)} nodes answered{age}"
+
+    status = st.sidebar.empty()
+    summary = st.empty()
+    table = st.empty()
+    st.subheader("Ready workers per node")
+    pivot = st.empty()
+    render = functools.partial(render_fleet, endpoints=endpoints, summary=summary, table=table, pivot=pivot)
+
+    version, rows = feed.rows()
+    render(rows)
+    if poller.rounds == 0:
+        # First round: render each node as it answers so a dead node can't hold back the rest
+        progress = st.progress(0.0)
+        while poller.rounds == 0:
+            if feed.wait(version, timeout=0.5):
+                version, rows = feed.rows()
+                render(rows)
+            progress.progress(poller.nodes_answered / len(endpoints))
+        progress.empty()
+        version, rows = feed.rows()
+        render(rows)
+    status.caption(poll_status())
+    if live:
+        return functools.partial(follow_feed, feed, version, render, status, poll_status, rerun_on_structural=False)
 
 if __name__ == "__main__":
-    # Should probably handle argparse in cli.py with click 
+    # Should probably handle argparse in cli.py with click
     # but not sure how that would effect passing params to streamlit
     parser = argparse.ArgumentParser(description="Torchserve Dashboard")
 
     parser.add_argument(
-        "--model_store", 
-        default=None, 
+        "--model_store",
+        default=None,
         help="Directory where your models are stored (overrides config)"
     )
     parser.add_argument(
@@ -354,9 +1246,100 @@ if __name__ == "__main__":
         action='store_true',
         help="Starts torchserve",
     )
+    parser.add_argument(
+        "--samples_dir",
+        default=None,
+        help="Directory of sample request payloads for the inference benchmark",
+    )
+    parser.add_argument(
+        "--poll_interval",
+        type=float,
+        default=5.0,
+        help="Seconds between background refreshes of the Torchserve state",
+    )
+    parser.add_argument(
+        "--metrics_interval",
+        type=float,
+        default=15.0,
+        help="Seconds between scrapes of the metrics API",
+    )
+    parser.add_argument(
+        "--export_port",
+        type=int,
+        default=None,
+        help="Serve the dashboard's own Prometheus metrics on this port at /metrics",
+    )
+    parser.add_argument(
+        "--export_file",
+        default=None,
+        help="Periodically write the dashboard's own Prometheus metrics to this file",
+    )
+    parser.add_argument(
+        "--api_transport",
+        choices=["rest", "grpc"],
+        default="rest",
+        help="Protocol for model management and benchmarks (grpc uses grpc_*_port from the config, needs grpcio)",
+    )
+    parser.add_argument(
+        "--live_port",
+        type=int,
+        default=None,
+        help="Serve model and worker changes as server-sent events on this port at /events (current state at /state)",
+    )
+    parser.add_argument(
+        "--history_db",
+        default=None,
+        help="SQLite file for the action and layout history (default: one per management address under ~/.cache)",
+    )
+    parser.add_argument(
+        "--session_rate_limit",
+        type=float,
+        default=30.0,
+        help="Management actions (register, scale, ...) per minute allowed to each browser session",
+    )
+    parser.add_argument(
+        "--session_burst",
+        type=int,
+        default=5,
+        help="Management actions a browser session can make back to back before the rate limit applies",
+    )
+    parser.add_argument(
+        "--prediction_cache",
+        default=None,
+        help="SQLite file for cached prediction responses (default: ~/.cache/torchserve_dashboard/predictions.sqlite)",
+    )
+    parser.add_argument(
+        "--describe_concurrency",
+        type=int,
+        default=None,
+        help="Describe requests in flight per poll (default: all at once). Lower it to spare a busy frontend",
+    )
+    parser.add_argument(
+        "--fleet",
+        default=None,
+        help="Fleet mode: comma separated management addresses or a file with one address per line",
+    )
+    parser.add_argument(
+        "--fleet_concurrency",
+        type=int,
+        default=16,
+        help="Max nodes polled at the same time in fleet mode",
+    )
+    parser.add_argument(
+        "--fleet_timeout",
+        type=float,
+        default=5.0,
+        help="Seconds before a node is reported as timed out in fleet mode",
+    )
     try:
         args = parser.parse_args()
     except SystemExit as e:
         os._exit(e.code)
 
-    dashboard(args)
\ No newline at end of file
+    if args.fleet:
+        follow = fleet_dashboard(args)
+    else:
+        with RENDER_DURATION.time():
+            follow = dashboard(args)
+    if follow:
+        follow()
@@ -0,0 +1,183 @@
+import asyncio
+import itertools
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from torchserve_dashboard.api import DESCRIBE_CONCURRENCY, AsyncManagementAPI
+from torchserve_dashboard.live import ChangeFeed
+from torchserve_dashboard.pagination import PAGE_SIZE
+
+import logging
+
+log = logging.getLogger(__name__)
+
+FLEET_COLUMNS = ["node", "model", "version", "workers", "ready_workers", "min_workers", "max_workers", "status"]
+FLEET_KEY = ("node", "model", "version")
+
+
+def load_endpoints(spec: str) -> List[str]:
+    """Resolve ``--fleet`` into management addresses.
+
+    ``spec`` is either a path to a file with one address per line (``#``
+    comments allowed) or a comma separated list of addresses.
+    """
+    if os.path.isfile(spec):
+        with open(spec, "r") as f:
+            entries = [line.split("#", 1)[0] for line in f]
+    else:
+        entries = spec.split(",")
+    endpoints = []
+    for e in entries:
+        e = e.strip().rstrip("/")
+        if not e:
+            continue
+        if "://" not in e:
+            e = "http://" + e
+        if e not in endpoints:
+            endpoints.append(e)
+    return endpoints
+
+
+def _model_rows(node: str, descriptions: Dict[str, Optional[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    rows = []
+    for model_name, versions in descriptions.items():
+        if not isinstance(versions, list):
+            # None or an error body, e.g. a 404 for a model unregistered since it was listed
+            rows.append({"node": node, "model": model_name, "status": "describe failed"})
+            continue
+        for v in versions:
+            workers = v.get("workers", [])
+            rows.append({
+                "node": node,
+                "model": model_name,
+                "version": v.get("modelVersion"),
+                "workers": len(workers),
+                "ready_workers": sum(1 for w in workers if w.get("status") == "READY"),
+                "min_workers": v.get("minWorkers"),
+                "max_workers": v.get("maxWorkers"),
+                "status": "ok",
+            })
+    return rows
+
+
+async def poll_node(address: str,
+                    timeout: float = 5.0,
+                    describe_concurrency: Optional[int] = DESCRIBE_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Models, versions and worker counts of a single node.
+
+    Never raises: an unreachable or slow node yields one row describing the failure.
+    """
+    async def collect() -> List[Dict[str, Any]]:
+        async with AsyncManagementAPI(address, timeout=timeout) as api:
+            # The first page doubles as the liveness check, the rest are only fetched if there are more
+            status = await api.get_loaded_models(PAGE_SIZE)
+            if status is None:
+                return [{"node": address, "status": "down"}]
+            if status.get("nextPageToken"):
+                status = {"models": [m async for m in api.iter_models(PAGE_SIZE)]}
+            names = [m["modelName"] for m in status.get("models", [])]
+            if not names:
+                return [{"node": address, "status": "no models"}]
+            return _model_rows(address, await api.describe_all(names, list_all=True,
+                                                               concurrency=describe_concurrency))
+
+    try:
+        # Bound the whole node (listing + fan-out), not just each request
+        return await asyncio.wait_for(collect(), timeout)
+    except asyncio.TimeoutError:
+        return [{"node": address, "status": f"timeout after {timeout}s"}]
+    except Exception as e:
+        log.info(f"Warn - polling {address} failed: {e}")
+        return [{"node": address, "status": f"error: {e}"}]
+
+
+async def iter_fleet(addresses: List[str],
+                     concurrency: int = 16,
+                     timeout: float = 5.0,
+                     describe_concurrency: Optional[int] = DESCRIBE_CONCURRENCY) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Poll ``addresses`` with at most ``concurrency`` nodes in flight and
+    yield each node's rows as soon as it finishes, fastest first."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(address: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await poll_node(address, timeout, describe_concurrency)
+
+    for next_done in asyncio.as_completed([bounded(a) for a in addresses]):
+        yield await next_done
+
+
+async def poll_fleet(addresses: List[str],
+                     concurrency: int = 16,
+                     timeout: float = 5.0,
+                     describe_concurrency: Optional[int] = DESCRIBE_CONCURRENCY) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    async for node_rows in iter_fleet(addresses, concurrency, timeout, describe_concurrency):
+        rows.extend(node_rows)
+    rows.sort(key=lambda r: (r["node"], r.get("model") or "", r.get("version") or ""))
+    return rows
+
+
+class FleetPoller:
+    """Polls a fleet on one daemon thread and publishes the rows to a :class:`ChangeFeed`.
+
+    Every dashboard session reads the same feed, so the nodes are polled
+    once per ``interval`` however many people are watching. The feed is
+    updated as each node answers, not once per round.
+    """
+
+    def __init__(self,
+                 addresses: List[str],
+                 feed: Optional[ChangeFeed] = None,
+                 interval: float = 5.0,
+                 concurrency: int = 16,
+                 timeout: float = 5.0,
+                 describe_concurrency: Optional[int] = DESCRIBE_CONCURRENCY) -> None:
+        self.addresses = addresses
+        self.feed = feed if feed is not None else ChangeFeed(FLEET_KEY)
+        self.interval = interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.describe_concurrency = describe_concurrency
+        self.rounds = 0
+        self._nodes: Dict[str, List[Dict[str, Any]]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def nodes_answered(self) -> int:
+        return len(self._nodes)
+
+    async def _poll(self) -> None:
+        async for node_rows in iter_fleet(self.addresses, self.concurrency, self.timeout, self.describe_concurrency):
+            self._nodes[node_rows[0]["node"]] = node_rows
+            self.feed.update(itertools.chain.from_iterable(self._nodes.values()))
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                loop.run_until_complete(self._poll())
+            except Exception as e:
+                log.info(f"Warn - fleet poll failed: {e}")
+            self.rounds += 1
+            self._wake.wait(self.interval)
+        loop.close()
+
+    def start(self) -> "FleetPoller":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="torchserve-fleet-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def refresh(self) -> None:
+        """Start the next round now instead of after ``interval``."""
+        self._wake.set()
@@ -0,0 +1,472 @@
+import inspect
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from torchserve_dashboard.api import AsyncManagementAPI, ManagementAPI
+
+try:
+    import grpc
+    import grpc.aio
+except ImportError:
+    grpc = None
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# Services and messages from TorchServe's frontend/server/src/main/resources/proto/{management,inference}.proto.
+# They're small and stable, so requests are encoded by hand instead of depending on generated stubs.
+MANAGEMENT_SERVICE = "org.pytorch.serve.grpc.management.ManagementAPIsService"
+INFERENCE_SERVICE = "org.pytorch.serve.grpc.inference.InferenceAPIsService"
+
+Schema = Sequence[Tuple[str, int, str]]  # (field name, field number, type)
+
+MESSAGES: Dict[str, Schema] = {
+    "DescribeModelRequest": (("model_name", 1, "string"), ("model_version", 2, "string"), ("customized", 3, "bool")),
+    "ListModelsRequest": (("limit", 1, "int32"), ("next_page_token", 2, "int32")),
+    "RegisterModelRequest": (("batch_size", 1, "int32"), ("handler", 2, "string"), ("initial_workers", 3, "int32"),
+                             ("max_batch_delay", 4, "int32"), ("model_name", 5, "string"),
+                             ("response_timeout", 6, "int32"), ("runtime", 7, "string"), ("synchronous", 8, "bool"),
+                             ("url", 9, "string"), ("s3_sse_kms", 10, "bool")),
+    "ScaleWorkerRequest": (("model_name", 1, "string"), ("model_version", 2, "string"), ("max_worker", 3, "int32"),
+                           ("min_worker", 4, "int32"), ("number_gpu", 5, "int32"), ("synchronous", 6, "bool"),
+                           ("timeout", 7, "int32")),
+    "SetDefaultRequest": (("model_name", 1, "string"), ("model_version", 2, "string")),
+    "UnregisterModelRequest": (("model_name", 1, "string"), ("model_version", 2, "string")),
+    "ManagementResponse": (("msg", 1, "string"),),
+    "PredictionsRequest": (("model_name", 1, "string"), ("model_version", 2, "string"), ("input", 3, "map")),
+    "PredictionResponse": (("prediction", 1, "bytes"),),
+    "TorchServeHealthResponse": (("health", 1, "string"),),
+    "Empty": (),
+}
+_MAP_ENTRY: Schema = (("key", 1, "string"), ("value", 2, "bytes"))
+
+MANAGEMENT_RPCS = {
+    "DescribeModel": "DescribeModelRequest",
+    "ListModels": "ListModelsRequest",
+    "RegisterModel": "RegisterModelRequest",
+    "ScaleWorker": "ScaleWorkerRequest",
+    "SetDefault": "SetDefaultRequest",
+    "UnregisterModel": "UnregisterModelRequest",
+}
+# name -> (request, response, server streaming)
+INFERENCE_RPCS = {
+    "Ping": ("Empty", "TorchServeHealthResponse", False),
+    "Predictions": ("PredictionsRequest", "PredictionResponse", False),
+    "StreamPredictions": ("PredictionsRequest", "PredictionResponse", True),
+}
+
+# One long-lived HTTP/2 connection per target; keepalive pings stop idle proxies from dropping it
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+    ("grpc.max_send_message_length", 64 * 1024 * 1024),
+]
+
+_VARINT, _FIXED64, _LENGTH, _FIXED32 = 0, 1, 2, 5
+
+
+def _varint(value: int) -> bytes:
+    value &= (1 << 64) - 1  # negative int32s are sign extended to 10 bytes
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated varint")
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode(schema: Schema, values: Dict[str, Any]) -> bytes:
+    """Serialize ``values`` as a protobuf message; ``None`` and proto3 defaults are left out."""
+    out = bytearray()
+    for name, number, kind in schema:
+        value = values.get(name)
+        if value is None or (kind != "map" and not value):
+            continue
+        if kind == "map":
+            for k, v in value.items():
+                entry = encode(_MAP_ENTRY, {"key": k, "value": v})
+                out += _varint(number << 3 | _LENGTH) + _varint(len(entry)) + entry
+        elif kind in ("int32", "bool"):
+            out += _varint(number << 3 | _VARINT) + _varint(int(value))
+        else:
+            raw = value.encode() if isinstance(value, str) else bytes(value)
+            out += _varint(number << 3 | _LENGTH) + _varint(len(raw)) + raw
+    return bytes(out)
+
+
+def decode(schema: Schema, data: bytes) -> Dict[str, Any]:
+    """Parse a protobuf message; unknown fields are skipped, missing ones get proto3 defaults."""
+    fields = {number: (name, kind) for name, number, kind in schema}
+    defaults = {"string": "", "bytes": b"", "int32": 0, "bool": False}
+    values = {name: {} if kind == "map" else defaults[kind] for name, _, kind in schema}
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == _VARINT:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == _LENGTH:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type in (_FIXED64, _FIXED32):
+            pos += 8 if wire_type == _FIXED64 else 4
+            continue
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        if number not in fields:
+            continue
+        name, kind = fields[number]
+        if kind == "int32":
+            values[name] = value - (1 << 64) if value >= 1 << 63 else value
+        elif kind == "bool":
+            values[name] = bool(value)
+        elif kind == "string":
+            values[name] = bytes(value).decode()
+        elif kind == "bytes":
+            values[name] = bytes(value)
+        else:
+            entry = decode(_MAP_ENTRY, value)
+            values[name][entry["key"]] = entry["value"]
+    return values
+
+
+def method_path(service: str, rpc: str) -> str:
+    return f"/{service}/{rpc}"
+
+
+def http_status(code: Any) -> int:
+    """HTTP status closest to a gRPC status code, so callers can keep checking ``code >= 400``."""
+    return {
+        "OK": 200,
+        "INVALID_ARGUMENT": 400,
+        "FAILED_PRECONDITION": 400,
+        "OUT_OF_RANGE": 400,
+        "UNAUTHENTICATED": 401,
+        "PERMISSION_DENIED": 403,
+        "NOT_FOUND": 404,
+        "ALREADY_EXISTS": 409,
+        "ABORTED": 409,
+        "CANCELLED": 499,
+        "UNIMPLEMENTED": 501,
+        "UNAVAILABLE": 503,
+        "RESOURCE_EXHAUSTED": 503,
+        "DEADLINE_EXCEEDED": 504,
+    }.get(getattr(code, "name", str(code)), 500)
+
+
+def _require_grpc() -> None:
+    if grpc is None:
+        raise ImportError("The gRPC transport needs grpcio: pip install grpcio")
+
+
+class _GrpcManagementRequests:
+    """Request building and response handling shared by the sync and async gRPC clients.
+
+    Every method maps onto the REST method of the same name and returns the
+    same JSON, since TorchServe's gRPC responses carry the REST body in
+    ``ManagementResponse.msg``.
+    """
+
+    error_callback: Callable
+
+    @staticmethod
+    def _describe(model_name: str, version: Optional[str], list_all: bool,
+                  custom_metadata: bool) -> Tuple[str, Dict[str, Any]]:
+        return "DescribeModel", {"model_name": model_name, "model_version": version or ("all" if list_all else None),
+                                 "customized": custom_metadata}
+
+    @staticmethod
+    def _list(limit: Optional[int], next_page_token: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        return "ListModels", {"limit": limit, "next_page_token": int(next_page_token) if next_page_token else None}
+
+    @staticmethod
+    def _register(mar_path: str, model_name: Optional[str], handler: Optional[str], runtime: Optional[str],
+                  batch_size: Optional[int], max_batch_delay: Optional[int], initial_workers: Optional[int],
+                  response_timeout: Optional[int], is_encrypted: Optional[bool]) -> Tuple[str, Dict[str, Any]]:
+        return "RegisterModel", {"url": mar_path, "model_name": model_name, "handler": handler, "runtime": runtime,
+                                 "batch_size": batch_size, "max_batch_delay": max_batch_delay,
+                                 "initial_workers": initial_workers, "response_timeout": response_timeout,
+                                 "s3_sse_kms": is_encrypted, "synchronous": False}
+
+    @staticmethod
+    def _scale(model_name: str, version: Optional[str], min_worker: Optional[int], max_worker: Optional[int],
+               number_gpu: Optional[int]) -> Tuple[str, Dict[str, Any]]:
+        return "ScaleWorker", {"model_name": model_name, "model_version": version, "min_worker": min_worker,
+                               "max_worker": max_worker, "number_gpu": number_gpu, "synchronous": False}
+
+    @staticmethod
+    def _response(raw: bytes) -> Any:
+        msg = decode(MESSAGES["ManagementResponse"], raw)["msg"]
+        try:
+            return json.loads(msg)
+        except ValueError:
+            return {"status": msg}
+
+    def _failure(self, target: str, rpc: str, e: Any) -> Tuple[Dict[str, Any], Any]:
+        """REST-style error body for a failed call, plus whatever the error callback returned.
+
+        An unreachable server raises the ``httpx`` error the REST client
+        would, so existing ``except httpx.HTTPError`` handling applies.
+        """
+        code = e.code()
+        if code == grpc.StatusCode.UNAVAILABLE and "connect" in (e.details() or "").lower():
+            raise httpx.ConnectError(f"gRPC {target}: {e.details()}")
+        if code == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise httpx.ReadTimeout(f"gRPC {target} {rpc}: deadline exceeded")
+        status = http_status(code)
+        body = {"code": status, "type": code.name, "message": e.details()}
+        return body, self.error_callback(httpx.Response(status, json=body))
+
+
+class GrpcManagementAPI(_GrpcManagementRequests, ManagementAPI):
+    """:class:`ManagementAPI` whose model calls go over TorchServe's gRPC management service.
+
+    The channel is opened once and multiplexes every call over one HTTP/2
+    connection. TorchServe has no gRPC workflow API, so workflow calls
+    still use REST at ``address``.
+    """
+
+    def __init__(self, address: str, grpc_target: str, error_callback: Callable = None,
+                 timeout: float = 1000) -> None:
+        _require_grpc()
+        super().__init__(address, error_callback)
+        self.grpc_target = grpc_target
+        self.error_callback = error_callback or self.default_error_callback
+        self.timeout = timeout
+        self.channel = grpc.insecure_channel(grpc_target, options=CHANNEL_OPTIONS)
+        self._rpcs = {rpc: self.channel.unary_unary(method_path(MANAGEMENT_SERVICE, rpc))
+                      for rpc in MANAGEMENT_RPCS}
+
+    def _call(self, rpc: str, fields: Dict[str, Any]) -> Any:
+        try:
+            raw = self._rpcs[rpc](encode(MESSAGES[MANAGEMENT_RPCS[rpc]], fields), timeout=self.timeout)
+        except grpc.RpcError as e:
+            return self._failure(self.grpc_target, rpc, e)[0]
+        return self._response(raw)
+
+    def close(self) -> None:
+        self.channel.close()
+        self.client.close()
+
+    def get_loaded_models(self,
+                          limit: Optional[int] = None,
+                          next_page_token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return self._call(*self._list(limit, next_page_token))
+        except httpx.HTTPError:
+            return None
+
+    def get_model(self,
+                  model_name: str,
+                  version: Optional[str] = None,
+                  list_all: bool = False,
+                  custom_metadata: bool = False) -> List[Dict[str, Any]]:
+        return self._call(*self._describe(model_name, version, list_all, custom_metadata))
+
+    def register_model(
+        self,
+        mar_path: str,
+        model_name: Optional[str] = None,
+        handler: Optional[str] = None,
+        runtime: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_delay: Optional[int] = None,
+        initial_workers: Optional[int] = None,
+        response_timeout: Optional[int] = None,
+        is_encrypted: Optional[bool] = None,
+    ) -> Dict[str, str]:
+        return self._call(*self._register(mar_path, model_name, handler, runtime, batch_size, max_batch_delay,
+                                          initial_workers, response_timeout, is_encrypted))
+
+    def delete_model(self,
+                     model_name: str,
+                     version: Optional[str] = None) -> Dict[str, str]:
+        return self._call("UnregisterModel", {"model_name": model_name, "model_version": version})
+
+    def change_model_default(self,
+                             model_name: str,
+                             version: Optional[str] = None):
+        return self._call("SetDefault", {"model_name": model_name, "model_version": version})
+
+    def change_model_workers(
+            self,
+            model_name: str,
+            version: Optional[str] = None,
+            min_worker: Optional[int] = None,
+            max_worker: Optional[int] = None,
+            number_gpu: Optional[int] = None) -> Dict[str, str]:
+        return self._call(*self._scale(model_name, version, min_worker, max_worker, number_gpu))
+
+
+class AsyncGrpcManagementAPI(_GrpcManagementRequests, AsyncManagementAPI):
+    """:class:`AsyncManagementAPI` over gRPC, see :class:`GrpcManagementAPI`.
+
+    ``describe_all`` fans out as concurrent streams on the one channel
+    instead of competing for a pool of HTTP/1.1 connections.
+    """
+
+    def __init__(self, address: str, grpc_target: str, error_callback: Callable = None, timeout: float = 30,
+                 **kwargs: Any) -> None:
+        _require_grpc()
+        super().__init__(address, error_callback, timeout, **kwargs)
+        self.grpc_target = grpc_target
+        self.error_callback = error_callback or ManagementAPI.default_error_callback
+        self.default_timeout = timeout
+        # grpc.aio channels bind to the running loop, so open it on first use
+        self._channel: Optional[Any] = None
+        self._rpcs: Dict[str, Any] = {}
+
+    def _rpc(self, rpc: str) -> Any:
+        if self._channel is None:
+            self._channel = grpc.aio.insecure_channel(self.grpc_target, options=CHANNEL_OPTIONS)
+            self._rpcs = {name: self._channel.unary_unary(method_path(MANAGEMENT_SERVICE, name))
+                          for name in MANAGEMENT_RPCS}
+        return self._rpcs[rpc]
+
+    async def _call(self, rpc: str, fields: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        request = encode(MESSAGES[MANAGEMENT_RPCS[rpc]], fields)
+        try:
+            raw = await self._rpc(rpc)(request, timeout=self.default_timeout if timeout is None else timeout)
+        except grpc.RpcError as e:
+            body, pending = self._failure(self.grpc_target, rpc, e)
+            if inspect.isawaitable(pending):
+                await pending
+            return body
+        return self._response(raw)
+
+    async def aclose(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+        await super().aclose()
+
+    async def get_loaded_models(self,
+                                limit: Optional[int] = None,
+                                next_page_token: Optional[str] = None,
+                                timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await self._call(*self._list(limit, next_page_token), timeout=timeout)
+        except httpx.HTTPError:
+            return None
+
+    async def get_model(self,
+                        model_name: str,
+                        version: Optional[str] = None,
+                        list_all: bool = False,
+                        custom_metadata: bool = False,
+                        timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await self._call(*self._describe(model_name, version, list_all, custom_metadata), timeout=timeout)
+
+    async def register_model(
+        self,
+        mar_path: str,
+        model_name: Optional[str] = None,
+        handler: Optional[str] = None,
+        runtime: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_delay: Optional[int] = None,
+        initial_workers: Optional[int] = None,
+        response_timeout: Optional[int] = None,
+        is_encrypted: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, str]:
+        return await self._call(*self._register(mar_path, model_name, handler, runtime, batch_size, max_batch_delay,
+                                                initial_workers, response_timeout, is_encrypted), timeout=timeout)
+
+    async def delete_model(self,
+                           model_name: str,
+                           version: Optional[str] = None,
+                           timeout: Optional[float] = None) -> Dict[str, str]:
+        return await self._call("UnregisterModel", {"model_name": model_name, "model_version": version},
+                                timeout=timeout)
+
+    async def change_model_default(self,
+                                   model_name: str,
+                                   version: Optional[str] = None,
+                                   timeout: Optional[float] = None) -> Dict[str, str]:
+        return await self._call("SetDefault", {"model_name": model_name, "model_version": version}, timeout=timeout)
+
+    async def change_model_workers(
+            self,
+            model_name: str,
+            version: Optional[str] = None,
+            min_worker: Optional[int] = None,
+            max_worker: Optional[int] = None,
+            number_gpu: Optional[int] = None,
+            timeout: Optional[float] = None) -> Dict[str, str]:
+        return await self._call(*self._scale(model_name, version, min_worker, max_worker, number_gpu),
+                                timeout=timeout)
+
+
+class GrpcInferenceClient:
+    """Async client for TorchServe's gRPC inference service on one persistent channel.
+
+    Failed calls raise ``grpc.aio.AioRpcError``; :func:`http_status` maps
+    their codes onto the REST status codes.
+    """
+
+    def __init__(self, target: str, timeout: float = 60.0) -> None:
+        _require_grpc()
+        self.target = target
+        self.timeout = timeout
+        self.channel = grpc.aio.insecure_channel(target, options=CHANNEL_OPTIONS)
+        self._rpcs = {
+            rpc: (self.channel.unary_stream if streaming else self.channel.unary_unary)(
+                method_path(INFERENCE_SERVICE, rpc))
+            for rpc, (_, _, streaming) in INFERENCE_RPCS.items()
+        }
+
+    async def __aenter__(self) -> "GrpcInferenceClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.channel.close()
+
+    @staticmethod
+    def _request(model_name: str, payload: bytes, version: Optional[str]) -> bytes:
+        # "data" is the key the REST frontend gives a raw request body
+        return encode(MESSAGES["PredictionsRequest"],
+                      {"model_name": model_name, "model_version": version, "input": {"data": payload}})
+
+    async def ping(self, timeout: Optional[float] = None) -> str:
+        raw = await self._rpcs["Ping"](b"", timeout=timeout or self.timeout)
+        health = decode(MESSAGES["TorchServeHealthResponse"], raw)["health"]
+        try:
+            return json.loads(health).get("status", health)
+        except (ValueError, AttributeError):
+            return health
+
+    async def predict(self, model_name: str, payload: bytes, version: Optional[str] = None,
+                      timeout: Optional[float] = None) -> bytes:
+        raw = await self._rpcs["Predictions"](self._request(model_name, payload, version),
+                                              timeout=timeout or self.timeout)
+        return decode(MESSAGES["PredictionResponse"], raw)["prediction"]
+
+    async def stream_predictions(self, model_name: str, payload: bytes, version: Optional[str] = None,
+                                 timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """Partial responses of a streaming handler as they're sent (TorchServe >= 0.8)."""
+        call = self._rpcs["StreamPredictions"](self._request(model_name, payload, version),
+                                               timeout=timeout or self.timeout)
+        async for raw in call:
+            yield decode(MESSAGES["PredictionResponse"], raw)["prediction"]
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from torchserve_dashboard.poller import StateSnapshot
+
+WORKER_STATES = ["READY", "WORKER_MODEL_LOADED", "WORKER_STARTED", "UNLOADING", "FAILED", "UNKNOWN"]
+UNHEALTHY_STATES = ("UNLOADING", "FAILED")
+_STATE_IDS = {s: i for i, s in enumerate(WORKER_STATES)}
+NO_STATE = -1
+
+WorkerKey = Tuple[str, str, str]  # (model_name, model_version, worker id)
+
+
+class HealthAlert(NamedTuple):
+    model: str
+    version: str
+    worker: str
+    kind: str  # leak, restart, state
+    message: str
+
+
+class WorkerHealthMonitor:
+    """Columnar history of per-worker memory and status.
+
+    Like :class:`~torchserve_dashboard.metrics.MetricsStore`, samples go in
+    a fixed ring: one row per worker ever seen and one column per sample,
+    so memory use doesn't grow with uptime. Feed it snapshots with
+    :meth:`record` (e.g. as a :class:`StatePoller` listener).
+    """
+
+    def __init__(self, capacity: int = 720, max_workers: int = 2048, max_events: int = 1000) -> None:
+        self.capacity = capacity
+        self.max_workers = max_workers
+        self.timestamps = np.full(capacity, np.nan)
+        self.memory_mb = np.full((max_workers, capacity), np.nan, dtype=np.float32)
+        self.states = np.full((max_workers, capacity), NO_STATE, dtype=np.int8)
+        self.index: Dict[WorkerKey, int] = {}
+        self.restarts = np.zeros(max_workers, dtype=np.int32)
+        self.events: Deque[Tuple[float, HealthAlert]] = deque(maxlen=max_events)
+        self.head = 0
+        self.count = 0
+        self._identity: Dict[WorkerKey, Tuple[Any, Any, str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, snapshot: StateSnapshot) -> None:
+        with self._lock:
+            col = self.head
+            self.memory_mb[:, col] = np.nan
+            self.states[:, col] = NO_STATE
+            for model_name, versions in snapshot.all_descriptions.items():
+                if not isinstance(versions, list):
+                    # None or an error body, e.g. the model was unregistered between listing and describing it
+                    continue
+                for version in versions:
+                    model_version = str(version.get("modelVersion"))
+                    for worker in version.get("workers", []):
+                        key = (model_name, model_version, str(worker.get("id")))
+                        row = self.index.get(key)
+                        if row is None:
+                            if len(self.index) >= self.max_workers:
+                                continue
+                            row = self.index[key] = len(self.index)
+                        self.memory_mb[row, col] = worker.get("memoryUsage", 0) / 2 ** 20
+                        state = worker.get("status", "UNKNOWN")
+                        self.states[row, col] = _STATE_IDS.get(state, _STATE_IDS["UNKNOWN"])
+                        self._track_identity(snapshot.taken_at, key, row, worker, state)
+            self.timestamps[col] = snapshot.taken_at
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def _track_identity(self, at: float, key: WorkerKey, row: int, worker: Dict[str, Any], state: str) -> None:
+        # A worker id that comes back with a new pid/startTime was restarted by TorchServe
+        identity = (worker.get("pid"), worker.get("startTime"), state)
+        previous = self._identity.get(key)
+        self._identity[key] = identity
+        if previous is not None and previous[:2] != identity[:2]:
+            self.restarts[row] += 1
+            self.events.append((at, HealthAlert(*key, "restart", f"pid {previous[0]} -> {identity[0]}")))
+        # Only report the transition into a bad state, not every sample spent in it
+        if state in UNHEALTHY_STATES and (previous is None or previous[2] != state):
+            self.events.append((at, HealthAlert(*key, "state", state)))
+
+    def _order(self) -> np.ndarray:
+        return (np.arange(self.count) + self.head - self.count) % self.capacity
+
+    def workers(self, model: Optional[str] = None) -> List[WorkerKey]:
+        with self._lock:
+            return sorted(k for k in self.index if model is None or k[0] == model)
+
+    def history(self, model: str) -> List[Dict[str, Any]]:
+        """Long-form ``(time, worker, memory_mb, state)`` rows for charting one model."""
+        with self._lock:
+            order = self._order()
+            ts = self.timestamps[order]
+            rows = []
+            for key, row in self.index.items():
+                if key[0] != model:
+                    continue
+                memory = self.memory_mb[row, order]
+                states = self.states[row, order]
+                for t, m, s in zip(ts, memory, states):
+                    if s != NO_STATE:
+                        rows.append({"time": t, "worker": f"{key[1]}/{key[2]}", "memory_mb": float(m),
+                                     "state": WORKER_STATES[s]})
+            return rows
+
+    def leak_alerts(self,
+                    window: int = 60,
+                    min_samples: int = 10,
+                    slope_mb_per_min: float = 5.0,
+                    memory_limit_mb: Optional[float] = None) -> List[HealthAlert]:
+        """Workers whose memory grows steadily over the last ``window`` samples.
+
+        A least-squares slope above ``slope_mb_per_min`` that explains most of
+        the variance (r² > 0.8) counts as a leak. With ``memory_limit_mb`` the
+        alert includes the projected time until the limit is hit.
+        """
+        alerts = []
+        with self._lock:
+            order = self._order()[-window:]
+            ts = self.timestamps[order]
+            for key, row in self.index.items():
+                memory = self.memory_mb[row, order].astype(np.float64)
+                valid = np.isfinite(memory) & np.isfinite(ts)
+                if valid.sum() < min_samples:
+                    continue
+                minutes = (ts[valid] - ts[valid][0]) / 60.0
+                y = memory[valid]
+                if np.ptp(minutes) == 0 or np.ptp(y) == 0:
+                    continue
+                slope, intercept = np.polyfit(minutes, y, 1)
+                residual = y - (slope * minutes + intercept)
+                r2 = 1.0 - residual.var() / y.var()
+                if slope < slope_mb_per_min or r2 < 0.8:
+                    continue
+                message = f"+{slope:.1f} MB/min, now {y[-1]:.0f} MB"
+                if memory_limit_mb:
+                    message += f", ~{max(0.0, (memory_limit_mb - y[-1]) / slope):.0f} min to {memory_limit_mb:.0f} MB"
+                alerts.append(HealthAlert(*key, "leak", message))
+        return alerts
+
+    def recent_events(self, since: float = 0.0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"time": t, **a._asdict()} for t, a in self.events if t >= since]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Latest memory, state and restart count per worker."""
+        with self._lock:
+            if not self.count:
+                return []
+            last = (self.head - 1) % self.capacity
+            return [{
+                "model": k[0], "version": k[1], "worker": k[2],
+                "memory_mb": round(float(self.memory_mb[row, last]), 1),
+                "state": WORKER_STATES[self.states[row, last]] if self.states[row, last] != NO_STATE else "gone",
+                "restarts": int(self.restarts[row]),
+            } for k, row in sorted(self.index.items())]
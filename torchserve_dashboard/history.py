@@ -0,0 +1,341 @@
+import asyncio
+import getpass
+import hashlib
+import inspect
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from torchserve_dashboard.bulk import _REGISTERED, BulkItem, _is_error, bulk_register
+from torchserve_dashboard.catalog import ModelStoreCatalog
+from torchserve_dashboard.poller import StateSnapshot
+
+import logging
+
+log = logging.getLogger(__name__)
+
+MUTATIONS = ("register_model", "delete_model", "change_model_default", "change_model_workers",
+             "register_workflow", "unregister_workflow")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    actor TEXT,
+    action TEXT NOT NULL,
+    model TEXT,
+    version TEXT,
+    params TEXT,
+    response TEXT,
+    ok INTEGER NOT NULL,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS actions_time ON actions (time);
+CREATE INDEX IF NOT EXISTS actions_model ON actions (model, time);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots (time);
+CREATE TABLE IF NOT EXISTS snapshot_models (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    model TEXT NOT NULL,
+    version TEXT NOT NULL,
+    url TEXT,
+    is_default INTEGER NOT NULL,
+    min_workers INTEGER,
+    max_workers INTEGER,
+    workers INTEGER,
+    batch_size INTEGER,
+    max_batch_delay INTEGER,
+    PRIMARY KEY (snapshot_id, model, version)
+);
+CREATE INDEX IF NOT EXISTS snapshot_models_model ON snapshot_models (model, snapshot_id);
+"""
+
+
+class ActionRecord(NamedTuple):
+    id: int
+    time: float
+    actor: Optional[str]
+    action: str
+    model: Optional[str]
+    version: Optional[str]
+    params: Optional[str]
+    response: Optional[str]
+    ok: int
+    latency_ms: Optional[float]
+
+
+class LayoutEntry(NamedTuple):
+    model: str
+    version: str
+    url: Optional[str]
+    is_default: int
+    min_workers: Optional[int]
+    max_workers: Optional[int]
+    workers: Optional[int]
+    batch_size: Optional[int]
+    max_batch_delay: Optional[int]
+
+
+class RestoreStep(NamedTuple):
+    action: str  # register, scale, set-default, unregister
+    target: str
+    ok: bool
+    message: str = ""
+
+
+def default_history_path(management_address: str) -> str:
+    digest = hashlib.sha1(management_address.encode()).hexdigest()[:12]
+    return os.path.join(os.path.expanduser("~"), ".cache", "torchserve_dashboard", f"history-{digest}.sqlite")
+
+
+def default_actor(source: str = "dashboard") -> str:
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = "unknown"
+    return f"{user}@{socket.gethostname()} ({source})"
+
+
+def layout_of(snapshot: StateSnapshot) -> List[LayoutEntry]:
+    entries = []
+    for model, versions in sorted(snapshot.all_descriptions.items()):
+        if not isinstance(versions, list):
+            # None or an error body: the model failed to describe, record the others anyway
+            continue
+        defaults = snapshot.descriptions.get(model)
+        default = defaults[0].get("modelVersion") if isinstance(defaults, list) and defaults else None
+        for d in versions:
+            entries.append(LayoutEntry(model, str(d.get("modelVersion")), d.get("modelUrl"),
+                                       int(d.get("modelVersion") == default), d.get("minWorkers"),
+                                       d.get("maxWorkers"), len(d.get("workers", [])), d.get("batchSize"),
+                                       d.get("maxBatchDelay")))
+    return entries
+
+
+class HistoryStore:
+    """Append-only SQLite log of management actions and cluster layouts.
+
+    Actions are written by :class:`RecordingManagementAPI`; layouts by
+    :meth:`record_snapshot`, registered as a :class:`StatePoller` listener.
+    A layout is only stored when it changed or ``snapshot_interval`` passed,
+    so an idle cluster costs one row every few minutes.
+    """
+
+    def __init__(self, path: str, snapshot_interval: float = 300.0) -> None:
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._last_digest: Optional[str] = None
+        self._last_snapshot = 0.0
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            log.info(f"Warn - can't open history {self.path} ({e}), keeping it in memory")
+            self.path = ":memory:"
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+
+    def record_action(self, actor: Optional[str], action: str, model: Optional[str], version: Optional[str],
+                      params: Dict[str, Any], response: Any, ok: bool, latency_ms: float) -> None:
+        row = (time.time(), actor, action, model, version, json.dumps(params, default=str),
+               json.dumps(response, default=str), int(ok), latency_ms)
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO actions (time, actor, action, model, version, params, response, ok, "
+                             "latency_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def record_snapshot(self, snapshot: StateSnapshot) -> Optional[int]:
+        if snapshot.models is None:
+            return None
+        layout = layout_of(snapshot)
+        digest = hashlib.sha1(json.dumps(layout).encode()).hexdigest()
+        if digest == self._last_digest and snapshot.taken_at - self._last_snapshot < self.snapshot_interval:
+            return None
+        with self._lock, self._db:
+            cur = self._db.execute("INSERT INTO snapshots (time, digest) VALUES (?, ?)", (snapshot.taken_at, digest))
+            snapshot_id = cur.lastrowid
+            self._db.executemany("INSERT INTO snapshot_models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [(snapshot_id, *e) for e in layout])
+        self._last_digest, self._last_snapshot = digest, snapshot.taken_at
+        return snapshot_id
+
+    def actions(self, since: float = 0.0, until: Optional[float] = None, model: Optional[str] = None,
+                limit: int = 1000) -> List[ActionRecord]:
+        query = "SELECT * FROM actions WHERE time >= ? AND time <= ?"
+        args: List[Any] = [since, until if until is not None else time.time()]
+        if model:
+            query += " AND model = ?"
+            args.append(model)
+        query += " ORDER BY time DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return [ActionRecord(*row) for row in self._db.execute(query, args)]
+
+    def snapshots(self, since: float = 0.0, until: Optional[float] = None, model: Optional[str] = None,
+                  limit: int = 1000) -> List[Tuple[int, float, int]]:
+        """``(id, time, model versions)`` of stored layouts, newest first."""
+        query = ("SELECT s.id, s.time, COUNT(m.model) FROM snapshots s "
+                 "LEFT JOIN snapshot_models m ON m.snapshot_id = s.id WHERE s.time >= ? AND s.time <= ?")
+        args: List[Any] = [since, until if until is not None else time.time()]
+        if model:
+            query += " AND s.id IN (SELECT snapshot_id FROM snapshot_models WHERE model = ?)"
+            args.append(model)
+        query += " GROUP BY s.id ORDER BY s.time DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return list(self._db.execute(query, args))
+
+    def layout(self, snapshot_id: int) -> List[LayoutEntry]:
+        with self._lock:
+            rows = self._db.execute("SELECT model, version, url, is_default, min_workers, max_workers, workers, "
+                                    "batch_size, max_batch_delay FROM snapshot_models WHERE snapshot_id = ? "
+                                    "ORDER BY model, version", (snapshot_id,))
+            return [LayoutEntry(*row) for row in rows]
+
+    def models(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT model FROM actions WHERE model IS NOT NULL UNION SELECT model FROM snapshot_models")]
+
+
+def _describe_call(method: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+                   ) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+    try:
+        bound = inspect.signature(method).bind(*args, **kwargs)
+        params = {k: v for k, v in bound.arguments.items() if v is not None and k != "timeout"}
+    except TypeError:
+        params = {"args": list(args), **kwargs}
+    target = params.get("model_name") or params.get("workflow_name")
+    return params, target, params.get("version")
+
+
+def _target_from_response(name: str, target: Optional[str], version: Optional[str], res: Any
+                          ) -> Tuple[Optional[str], Optional[str]]:
+    # register_model only learns name and version from the archive
+    if name == "register_model" and isinstance(res, dict):
+        m = _REGISTERED.search(str(res.get("status", "")))
+        if m:
+            return m.group("name"), m.group("version")
+    return target, version
+
+
+class RecordingManagementAPI:
+    """Wraps a management client (sync or async) and writes every mutating
+    call, with its parameters, response and latency, to a :class:`HistoryStore`."""
+
+    def __init__(self, api: Any, history: HistoryStore, actor: Optional[str] = None) -> None:
+        self.api = api
+        self.history = history
+        self.actor = actor or default_actor()
+
+    def _record(self, name: str, params: Dict[str, Any], target: Optional[str], version: Optional[str],
+                res: Any, error: Optional[Exception], started: float) -> None:
+        target, version = _target_from_response(name, target, version, res)
+        response = res if error is None else {"error": f"{type(error).__name__}: {error}"}
+        try:
+            self.history.record_action(self.actor, name, target, version, params, response,
+                                       error is None and not _is_error(res), (time.perf_counter() - started) * 1000)
+        except sqlite3.Error as e:
+            log.info(f"Warn - could not record {name} in history: {e}")
+
+    def __getattr__(self, item: str) -> Any:
+        attr = getattr(self.api, item)
+        if item not in MUTATIONS:
+            return attr
+
+        if asyncio.iscoroutinefunction(attr):
+            async def recorded_async(*args: Any, **kwargs: Any) -> Any:
+                params, target, version = _describe_call(attr, args, kwargs)
+                started = time.perf_counter()
+                try:
+                    res = await attr(*args, **kwargs)
+                except Exception as e:
+                    self._record(item, params, target, version, None, e, started)
+                    raise
+                self._record(item, params, target, version, res, None, started)
+                return res
+            return recorded_async
+
+        def recorded(*args: Any, **kwargs: Any) -> Any:
+            params, target, version = _describe_call(attr, args, kwargs)
+            started = time.perf_counter()
+            try:
+                res = attr(*args, **kwargs)
+            except Exception as e:
+                self._record(item, params, target, version, None, e, started)
+                raise
+            self._record(item, params, target, version, res, None, started)
+            return res
+        return recorded
+
+    async def __aenter__(self) -> "RecordingManagementAPI":
+        await self.api.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.api.__aexit__(*exc_info)
+
+
+class RestorePlan(NamedTuple):
+    register: List[BulkItem]
+    scale: List[LayoutEntry]
+    set_default: List[LayoutEntry]
+    unregister: List[Tuple[str, str]]
+
+    @property
+    def empty(self) -> bool:
+        return not (self.register or self.scale or self.set_default or self.unregister)
+
+
+def restore_plan(layout: List[LayoutEntry], current: StateSnapshot, unregister_extra: bool = False) -> RestorePlan:
+    """What it takes to get from ``current`` back to ``layout``."""
+    now = {(e.model, e.version): e for e in layout_of(current)}
+    wanted = {(e.model, e.version): e for e in layout}
+    register, scale, set_default = [], [], []
+    for key, e in wanted.items():
+        have = now.get(key)
+        if have is None:
+            if not e.url:
+                continue
+            register.append(BulkItem(e.url, e.model, batch_size=e.batch_size, max_batch_delay=e.max_batch_delay,
+                                     initial_workers=e.min_workers, min_worker=e.min_workers,
+                                     max_worker=e.max_workers))
+        elif (have.min_workers, have.max_workers) != (e.min_workers, e.max_workers):
+            scale.append(e)
+        if e.is_default and not (have and have.is_default):
+            set_default.append(e)
+    unregister = sorted(k for k in now if k not in wanted) if unregister_extra else []
+    return RestorePlan(register, scale, set_default, unregister)
+
+
+async def restore(api: Any, plan: RestorePlan, concurrency: int = 8,
+                  catalog: Optional[ModelStoreCatalog] = None) -> AsyncIterator[RestoreStep]:
+    """Replay ``plan``: bulk register what's missing, then scale, set defaults and unregister.
+
+    ``catalog`` tells :func:`bulk_register` which version each archive registers.
+    """
+    if plan.register:
+        async for p in bulk_register(api, plan.register, concurrency=concurrency, catalog=catalog):
+            if p.done:
+                yield RestoreStep("register", p.item.label, p.state == "ready", p.message)
+    for e in plan.scale:
+        res = await api.change_model_workers(e.model, e.version, min_worker=e.min_workers, max_worker=e.max_workers)
+        yield RestoreStep("scale", f"{e.model} {e.version}", not _is_error(res),
+                          res.get("message", res.get("status", "")) if isinstance(res, dict) else str(res))
+    for e in plan.set_default:
+        res = await api.change_model_default(e.model, e.version)
+        yield RestoreStep("set-default", f"{e.model} {e.version}", not _is_error(res),
+                          res.get("message", res.get("status", "")) if isinstance(res, dict) else str(res))
+    for model, version in plan.unregister:
+        res = await api.delete_model(model, version)
+        yield RestoreStep("unregister", f"{model} {version}", not _is_error(res),
+                          res.get("message", res.get("status", "")) if isinstance(res, dict) else str(res))
@@ -0,0 +1,364 @@
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import httpx
+
+import logging
+
+log = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def rows(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return [{**dict(zip(self.label_names, k)), "count": v} for k, v in items]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+                                 for k, v in items]
+
+
+class Gauge(_Metric):
+    """A gauge whose value is read from ``callback`` at render time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Optional[float]]) -> None:
+        super().__init__(name, documentation)
+        self.callback = callback
+
+    def value(self) -> Optional[float]:
+        try:
+            return self.callback()
+        except Exception as e:
+            log.info(f"Warn - gauge {self.name} failed: {e}")
+            return None
+
+    def render(self) -> List[str]:
+        value = self.value()
+        return self._header() + ([f"{self.name} {_format_value(value)}"] if value is not None else [])
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self.series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][i] += 1
+            series[1][0] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Count, mean and bucket-interpolated p50/p99 per label set, for display."""
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in sorted(self.series.items())]
+        rows = []
+        for labels, counts, total in items:
+            n = sum(counts)
+            rows.append({**dict(zip(self.label_names, labels)), "count": n,
+                         "mean_ms": 1000 * total / n if n else math.nan,
+                         "p50_ms": 1000 * self._quantile(counts, 0.5),
+                         "p99_ms": 1000 * self._quantile(counts, 0.99)})
+        return rows
+
+    def _quantile(self, counts: List[int], q: float) -> float:
+        # Same linear interpolation within a bucket as PromQL's histogram_quantile
+        n = sum(counts)
+        if not n:
+            return math.nan
+        rank = q * n
+        cumulative = 0
+        for i, c in enumerate(counts):
+            if cumulative + c >= rank and c:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / c
+            cumulative += c
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in sorted(self.series.items())]
+        lines = self._header()
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: LabelValues) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: M) -> M:
+        with self._lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], Optional[float]]) -> Gauge:
+        """Register (or replace, e.g. after a Streamlit reload) a callback gauge."""
+        return self.register(Gauge(name, documentation, callback))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write :meth:`render` to ``path`` atomically, for node_exporter's textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".dashboard-metrics")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "torchserve_dashboard_http_request_duration_seconds",
+    "Time until response headers for calls the dashboard makes to TorchServe.",
+    ("component", "method", "endpoint")))
+HTTP_RESPONSES = REGISTRY.register(Counter(
+    "torchserve_dashboard_http_responses_total",
+    "Responses received from TorchServe by status code.",
+    ("component", "method", "endpoint", "status")))
+HTTP_ERRORS = REGISTRY.register(Counter(
+    "torchserve_dashboard_http_errors_total",
+    "Calls that failed without a response (connect errors, timeouts).",
+    ("component", "method", "endpoint", "error")))
+POLL_DURATION = REGISTRY.register(Histogram(
+    "torchserve_dashboard_poll_duration_seconds",
+    "Time to collect one state snapshot."))
+RENDER_DURATION = REGISTRY.register(Histogram(
+    "torchserve_dashboard_render_duration_seconds",
+    "Time spent in one Streamlit script run.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)))
+
+# Path segments that are part of the API rather than a name or version
+_LITERAL_SEGMENTS = {"models", "workflows", "predictions", "explanations", "wfpredict", "ping", "metrics",
+                     "all", "set-default", "api-description"}
+_PLACEHOLDERS = {"models": ("{model}", "{version}"), "predictions": ("{model}", "{version}"),
+                 "explanations": ("{model}", "{version}"), "workflows": ("{workflow}",),
+                 "wfpredict": ("{workflow}",)}
+
+
+def endpoint_template(path: str) -> str:
+    """``/models/resnet/2.0/set-default`` -> ``/models/{model}/{version}/set-default``.
+
+    Keeps the label cardinality bounded no matter how many models there are.
+    """
+    segments = [s for s in path.split("/") if s]
+    if not segments:
+        return "/"
+    placeholders = iter(_PLACEHOLDERS.get(segments[0], ()))
+    out = [segments[0]]
+    for s in segments[1:]:
+        out.append(s if s in _LITERAL_SEGMENTS else next(placeholders, "{arg}"))
+    return "/" + "/".join(out)
+
+
+def _record(component: str, request: httpx.Request, started: float,
+            response: Optional[httpx.Response] = None, error: Optional[Exception] = None) -> None:
+    endpoint = endpoint_template(request.url.path)
+    HTTP_LATENCY.observe(time.perf_counter() - started, component, request.method, endpoint)
+    if response is not None:
+        HTTP_RESPONSES.inc(component, request.method, endpoint, str(response.status_code))
+    else:
+        HTTP_ERRORS.inc(component, request.method, endpoint, type(error).__name__)
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Wraps a transport and records latency and outcome of every request."""
+
+    def __init__(self, component: str, transport: Optional[httpx.BaseTransport] = None) -> None:
+        self.component = component
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception as e:
+            _record(self.component, request, started, error=e)
+            raise
+        _record(self.component, request, started, response)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, component: str, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.component = component
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception as e:
+            _record(self.component, request, started, error=e)
+            raise
+        _record(self.component, request, started, response)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class MetricsExporter:
+    """Serves :data:`REGISTRY` at ``/metrics`` and/or dumps it to a file periodically."""
+
+    def __init__(self,
+                 registry: Registry = REGISTRY,
+                 port: Optional[int] = None,
+                 path: Optional[str] = None,
+                 interval: float = 15.0,
+                 host: str = "127.0.0.1") -> None:
+        self.registry = registry
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self.host = host
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+
+    def _handler(self) -> type:
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def _dump_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.dump(self.path)
+            except OSError as e:
+                log.info(f"Warn - can't write metrics to {self.path}: {e}")
+
+    def start(self) -> "MetricsExporter":
+        if self.port is not None:
+            try:
+                self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+                threading.Thread(target=self.server.serve_forever, name="dashboard-metrics-exporter",
+                                 daemon=True).start()
+            except OSError as e:
+                log.info(f"Warn - can't serve dashboard metrics on port {self.port}: {e}")
+        if self.path:
+            threading.Thread(target=self._dump_loop, name="dashboard-metrics-dump", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
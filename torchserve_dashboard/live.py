@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from torchserve_dashboard.poller import StateSnapshot
+
+import logging
+
+log = logging.getLogger(__name__)
+
+Key = Tuple[str, ...]
+Row = Dict[str, Any]
+
+SNAPSHOT_COLUMNS = ["model", "version", "default", "workers", "ready_workers", "min_workers", "max_workers",
+                    "batch_size", "status"]
+SNAPSHOT_KEY = ("model", "version")
+
+
+def snapshot_rows(snapshot: StateSnapshot) -> List[Row]:
+    """One row per model version with its worker counts, the unit :class:`ChangeFeed` diffs."""
+    if not snapshot.models:
+        return []
+    rows = []
+    for model_name, versions in snapshot.all_descriptions.items():
+        if not isinstance(versions, list):
+            # None or an error body, e.g. the model was unregistered between listing and describing it
+            rows.append({"model": model_name, "version": "", "status": "describe failed"})
+            continue
+        default = (snapshot.descriptions.get(model_name) or [{}])[0]
+        for v in versions:
+            workers = v.get("workers", [])
+            rows.append({
+                "model": model_name,
+                "version": str(v.get("modelVersion")),
+                "default": v.get("modelVersion") == default.get("modelVersion"),
+                "workers": len(workers),
+                "ready_workers": sum(1 for w in workers if w.get("status") == "READY"),
+                "min_workers": v.get("minWorkers"),
+                "max_workers": v.get("maxWorkers"),
+                "batch_size": v.get("batchSize"),
+                "status": "ok",
+            })
+    return rows
+
+
+class Delta(NamedTuple):
+    version: int
+    time: float
+    added: List[Row]
+    changed: List[Row]
+    removed: List[Key]
+    reset: bool = False  # ``added`` is the full state, drop everything known before
+
+    @property
+    def structural(self) -> bool:
+        """Rows came or went, as opposed to values changing in place."""
+        return self.reset or bool(self.added or self.removed)
+
+    def as_json(self) -> str:
+        return json.dumps({"version": self.version, "time": self.time, "added": self.added, "changed": self.changed,
+                           "removed": [list(k) for k in self.removed], "reset": self.reset}, default=str)
+
+
+class ChangeFeed:
+    """Keeps the latest rows and the recent deltas between them.
+
+    :meth:`update` diffs a new set of rows against the previous one and, if
+    anything changed, bumps :attr:`version` and wakes everyone blocked in
+    :meth:`wait`. Readers remember the version they last rendered and only
+    get the deltas after it, so an unchanged poll costs them nothing.
+    """
+
+    def __init__(self, key_columns: Sequence[str], max_deltas: int = 256) -> None:
+        self.key_columns = tuple(key_columns)
+        self.version = 0
+        self.updated_at: Optional[float] = None
+        self._rows: Dict[Key, Row] = {}
+        self._deltas: Deque[Delta] = deque(maxlen=max_deltas)
+        self._changed = threading.Condition()
+
+    def _key(self, row: Row) -> Key:
+        return tuple(str(row.get(c) or "") for c in self.key_columns)
+
+    def update(self, rows: Iterable[Row]) -> Optional[Delta]:
+        """Replace the current rows. Returns the delta, or ``None`` if nothing changed."""
+        new = {self._key(r): r for r in rows}
+        with self._changed:
+            old = self._rows
+            added = [r for k, r in new.items() if k not in old]
+            changed = [r for k, r in new.items() if k in old and old[k] != r]
+            removed = [k for k in old if k not in new]
+            self.updated_at = time.time()
+            if not (added or changed or removed):
+                return None
+            self.version += 1
+            delta = Delta(self.version, self.updated_at, added, changed, removed)
+            self._rows = new
+            self._deltas.append(delta)
+            self._changed.notify_all()
+            return delta
+
+    def rows(self) -> Tuple[int, List[Row]]:
+        with self._changed:
+            return self.version, list(self._rows.values())
+
+    def since(self, version: int) -> List[Delta]:
+        """Deltas after ``version``; a single reset delta if they were already dropped.
+
+        A ``version`` from the future (the feed restarted at 0 since the client
+        last saw it) also gets a reset.
+        """
+        with self._changed:
+            if version == self.version:
+                return []
+            if version <= 0 or version > self.version or not self._deltas or self._deltas[0].version > version + 1:
+                return [Delta(self.version, self.updated_at or time.time(), list(self._rows.values()), [], [],
+                              reset=True)]
+            return [d for d in self._deltas if d.version > version]
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> List[Delta]:
+        """Block until there is something newer than ``version`` (or ``timeout``), then return :meth:`since`."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+        return self.since(version)
+
+
+class EventStreamServer:
+    """Pushes a :class:`ChangeFeed` to browsers and scripts as server-sent events.
+
+    ``GET /events`` starts with a ``reset`` event carrying every row, then
+    sends one ``delta`` event per change; reconnecting clients send
+    ``Last-Event-ID`` (or ``?since=``) and only get what they missed.
+    ``GET /state`` returns the current rows as JSON.
+    """
+
+    def __init__(self, feed: ChangeFeed, port: int, host: str = "127.0.0.1", keepalive: float = 15.0) -> None:
+        self.feed = feed
+        self.port = port
+        self.host = host
+        self.keepalive = keepalive
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+
+    def _handler(self) -> type:
+        feed, keepalive, stop = self.feed, self.keepalive, self._stop
+
+        class Handler(BaseHTTPRequestHandler):
+            def _json(self, body: bytes) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _events(self, since: int) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                try:
+                    while not stop.is_set():
+                        deltas = feed.wait(since, keepalive)
+                        if not deltas:
+                            self.wfile.write(b": keepalive\n\n")
+                        for d in deltas:
+                            event = "reset" if d.reset else "delta"
+                            self.wfile.write(f"id: {d.version}\nevent: {event}\ndata: {d.as_json()}\n\n".encode())
+                            since = d.version
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                if url.path == "/events":
+                    since = self.headers.get("Last-Event-ID") or parse_qs(url.query).get("since", ["0"])[0]
+                    try:
+                        self._events(int(since))
+                    except ValueError:
+                        self.send_error(400, "since must be an integer")
+                elif url.path == "/state":
+                    version, rows = feed.rows()
+                    self._json(json.dumps({"version": version, "rows": rows}, default=str).encode())
+                else:
+                    self.send_error(404)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "EventStreamServer":
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="dashboard-live-events", daemon=True).start()
+        except OSError as e:
+            log.info(f"Warn - can't serve live updates on port {self.port}: {e}")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
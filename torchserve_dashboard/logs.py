@@ -0,0 +1,171 @@
+import mmap
+import os
+import re
+import threading
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+LEVELS = ["TRACE", "DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
+_LEVEL_IDS = {name.encode(): i for i, name in enumerate(LEVELS)}
+_LEVEL_IDS[b"WARNING"] = LEVELS.index("WARN")
+NO_LEVEL = -1
+NO_MODEL = -1
+
+# log4j pattern used by TorchServe: "<date> [INFO ] W-9000-resnet-18_1.0 ..."
+_LEVEL = re.compile(rb"\[\s*(TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL)\s*\]")
+_WORKER = re.compile(rb"\bW-\d+-(\S+)")
+_STREAM_SUFFIX = re.compile(r"-std(?:out|err)$")
+
+# Level and worker thread name are always near the start of a line
+_HEAD_BYTES = 256
+
+
+class LogTailer:
+    """Incremental index over a growing log file.
+
+    Each :meth:`refresh` only reads bytes appended since the previous call
+    (through ``mmap``) and extends three parallel arrays: the byte offset
+    where each line starts, its level and its model. Lines are read back from
+    the file on demand, so memory grows with the number of lines rather than
+    their size. Rotation (new inode) or truncation resets the index.
+    :meth:`catch_up` keeps refreshing until the index reaches the end of the
+    file, for a first look at a log that is already large.
+
+    Lines without a level or worker name (stack traces, multi-line model
+    output) inherit them from the previous line.
+    """
+
+    def __init__(self, path: str, max_bytes_per_refresh: int = 64 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes_per_refresh = max_bytes_per_refresh
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode: Optional[int]) -> None:
+        self.inode = inode
+        self.offset = 0  # first byte not indexed yet
+        self.line_starts = array("q")
+        self.levels = array("b")
+        self.models = array("q")
+        self.model_names: List[str] = []
+        self._model_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
+
+    def _model_id(self, raw: bytes) -> int:
+        name = _STREAM_SUFFIX.sub("", raw.decode("utf-8", "replace"))
+        if "_" in name:
+            # Worker threads are named W-<port>-<model>_<version>
+            name = name.rsplit("_", 1)[0]
+        model_id = self._model_ids.get(name)
+        if model_id is None:
+            model_id = len(self.model_names)
+            self._model_ids[name] = model_id
+            self.model_names.append(name)
+        return model_id
+
+    def refresh(self) -> int:
+        """Index lines appended since the last call. Returns how many were added."""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset(None)
+                return 0
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._reset(stat.st_ino)
+            end = min(stat.st_size, self.offset + self.max_bytes_per_refresh)
+            if end <= self.offset:
+                return 0
+            added = 0
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = self.offset
+                # Vectorised newline search; a trailing partial line waits for the next refresh
+                chunk = np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)
+                newlines = np.flatnonzero(chunk == 10) + start
+                del chunk  # mmap can't close while a buffer export is alive
+                level = self.levels[-1] if self.levels else NO_LEVEL
+                model = self.models[-1] if self.models else NO_MODEL
+                for nl in newlines.tolist():
+                    head = mm[start:min(nl, start + _HEAD_BYTES)]
+                    m = _LEVEL.search(head)
+                    if m:
+                        level = _LEVEL_IDS[m.group(1)]
+                        w = _WORKER.search(head, m.end())
+                        model = self._model_id(w.group(1)) if w else NO_MODEL
+                    self.line_starts.append(start)
+                    self.levels.append(level)
+                    self.models.append(model)
+                    start = nl + 1
+                    added += 1
+                if not added and end - start >= self.max_bytes_per_refresh:
+                    # A single line longer than the window; split it rather than stall forever
+                    self.line_starts.append(start)
+                    self.levels.append(level)
+                    self.models.append(model)
+                    start = end
+                    added = 1
+                self.offset = start
+            return added
+
+    def catch_up(self, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Refresh until everything written before the call is indexed.
+
+        ``progress(offset, size)`` is called after each window. Returns how many lines were added.
+        """
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return self.refresh()
+        added = 0
+        while True:
+            before = self.offset
+            added += self.refresh()
+            # Stops at a trailing partial line too, the next refresh picks it up
+            if self.offset == before or self.offset >= size:
+                return added
+            if progress:
+                progress(self.offset, size)
+
+    def query(self, min_level: Optional[str] = None, model: Optional[str] = None) -> np.ndarray:
+        """Line numbers at or above ``min_level`` and belonging to ``model``."""
+        with self._lock:
+            mask = np.ones(len(self.line_starts), dtype=bool)
+            if min_level:
+                levels = np.frombuffer(self.levels, dtype=np.int8) if self.levels else np.empty(0, np.int8)
+                mask &= levels >= LEVELS.index(min_level)
+            if model:
+                model_id = self._model_ids.get(model)
+                if model_id is None:
+                    return np.empty(0, dtype=np.int64)
+                models = np.frombuffer(self.models, dtype=np.int64) if self.models else np.empty(0, np.int64)
+                mask &= models == model_id
+            return np.flatnonzero(mask)
+
+    def read_lines(self, line_numbers: List[int]) -> List[str]:
+        with self._lock:
+            if not line_numbers:
+                return []
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                lines = []
+                for n in line_numbers:
+                    start = self.line_starts[n]
+                    end = self.line_starts[n + 1] if n + 1 < len(self.line_starts) else self.offset
+                    lines.append(mm[start:end].rstrip(b"\r\n").decode("utf-8", "replace"))
+                return lines
+
+    def page(self,
+             page: int = 0,
+             page_size: int = 100,
+             min_level: Optional[str] = None,
+             model: Optional[str] = None,
+             newest_first: bool = True) -> Tuple[List[Tuple[int, str]], int]:
+        """One page of matching ``(line_number, text)`` and the total match count."""
+        matches = self.query(min_level, model)
+        if newest_first:
+            matches = matches[::-1]
+        selected = matches[page * page_size:(page + 1) * page_size].tolist()
+        return list(zip(selected, self.read_lines(selected))), len(matches)
@@ -0,0 +1,227 @@
+import re
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from torchserve_dashboard.instrumentation import InstrumentedTransport
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# Counters exported by the TorchServe metrics API
+REQUESTS_METRIC = "ts_inference_requests_total"
+LATENCY_METRIC = "ts_inference_latency_microseconds"
+QUEUE_LATENCY_METRIC = "ts_queue_latency_microseconds"
+# model_version label of requests that didn't name a version (served by the default one)
+DEFAULT_VERSION_LABEL = "default"
+
+SeriesKey = Tuple[str, str, str]  # (metric, model_name, model_version)
+
+_MODEL_LABEL = re.compile(r'model_name="((?:[^"\\]|\\.)*)"')
+_VERSION_LABEL = re.compile(r'model_version="((?:[^"\\]|\\.)*)"')
+
+
+class PrometheusParser:
+    """Line-at-a-time parser for the Prometheus text format.
+
+    Only the ``model_name``/``model_version`` labels are kept, every other
+    label (uuid, hostname...) is folded into the same series. The label block
+    of a line is looked up as a plain string, so a label set seen in an
+    earlier scrape costs one dict lookup instead of being re-parsed.
+    """
+
+    def __init__(self, max_label_cache: int = 65536) -> None:
+        self.max_label_cache = max_label_cache
+        self._labels: Dict[str, Tuple[str, str]] = {}
+
+    def _model_version(self, labels: str) -> Tuple[str, str]:
+        cached = self._labels.get(labels)
+        if cached is None:
+            model = _MODEL_LABEL.search(labels)
+            version = _VERSION_LABEL.search(labels)
+            cached = (model.group(1) if model else "", version.group(1) if version else "")
+            if len(self._labels) >= self.max_label_cache:
+                self._labels.clear()
+            self._labels[labels] = cached
+        return cached
+
+    def parse_line(self, line: str) -> Optional[Tuple[SeriesKey, float]]:
+        line = line.strip()
+        if not line or line[0] == "#":
+            return None
+        brace = line.find("{")
+        try:
+            if brace == -1:
+                name, raw_value = line.split()[:2]
+                model, version = "", ""
+            else:
+                close = line.rindex("}")
+                name = line[:brace]
+                model, version = self._model_version(line[brace + 1:close])
+                raw_value = line[close + 1:].split()[0]
+            return (name, model, version), float(raw_value)
+        except (ValueError, IndexError):
+            log.debug(f"Skipping malformed metrics line: {line}")
+            return None
+
+
+class MetricsStore:
+    """Fixed-memory time-series ring buffer.
+
+    One row per (metric, model, version) series and one column per scrape,
+    so memory is ``max_series * capacity`` floats regardless of uptime.
+    Samples missing from a scrape are NaN.
+    """
+
+    def __init__(self, capacity: int = 720, max_series: int = 4096) -> None:
+        self.capacity = capacity
+        self.max_series = max_series
+        self.timestamps = np.full(capacity, np.nan)
+        self.values = np.full((max_series, capacity), np.nan)
+        self.index: Dict[SeriesKey, int] = {}
+        self.head = 0  # next column to write
+        self.count = 0
+        self.parser = PrometheusParser()
+        self._lock = threading.Lock()
+        self._warned_full = False
+
+    def _series_id(self, key: SeriesKey) -> int:
+        idx = self.index.get(key)
+        if idx is None:
+            if len(self.index) >= self.max_series:
+                if not self._warned_full:
+                    log.info(f"Warn - metrics store full ({self.max_series} series), dropping new series")
+                    self._warned_full = True
+                return -1
+            idx = len(self.index)
+            self.index[key] = idx
+        return idx
+
+    def ingest(self, lines: Iterable[str], timestamp: Optional[float] = None) -> int:
+        """Parse one scrape and append it as a new column. Returns the number of samples kept."""
+        ids = array("q")
+        samples = array("d")
+        # ``lines`` may be a network stream, so only hold the lock to add series and write the column
+        for line in lines:
+            parsed = self.parser.parse_line(line)
+            if parsed is None:
+                continue
+            idx = self.index.get(parsed[0])
+            if idx is None:
+                with self._lock:
+                    idx = self._series_id(parsed[0])
+            if idx >= 0:
+                ids.append(idx)
+                samples.append(parsed[1])
+        with self._lock:
+            column = self.values[:, self.head]
+            column.fill(np.nan)
+            if ids:
+                id_arr = np.frombuffer(ids, dtype=np.int64)
+                column[np.unique(id_arr)] = 0.0
+                # Several label sets (e.g. per uuid) can fold into one series
+                np.add.at(column, id_arr, np.frombuffer(samples, dtype=np.float64))
+            self.timestamps[self.head] = time.time() if timestamp is None else timestamp
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        return len(ids)
+
+    def _order(self) -> np.ndarray:
+        # Column indices from oldest to newest
+        return (np.arange(self.count) + self.head - self.count) % self.capacity
+
+    def models(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return sorted({(k[1], k[2]) for k in self.index if k[1]})
+
+    def metric_names(self) -> List[str]:
+        with self._lock:
+            return sorted({k[0] for k in self.index})
+
+    def series(self, metric: str, model: str = "", version: str = "") -> Tuple[np.ndarray, np.ndarray]:
+        """``(timestamps, values)`` oldest first; values are all NaN for an unknown series."""
+        with self._lock:
+            order = self._order()
+            ts = self.timestamps[order]
+            idx = self.index.get((metric, model, version))
+            if idx is None:
+                return ts, np.full(len(order), np.nan)
+            return ts, self.values[idx, order]
+
+    def rate(self, metric: str, model: str = "", version: str = "") -> Tuple[np.ndarray, np.ndarray]:
+        """Per-second increase of a counter; counter resets become NaN."""
+        ts, values = self.series(metric, model, version)
+        if len(ts) < 2:
+            return ts[1:], values[1:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = np.diff(values)
+            delta[delta < 0] = np.nan
+            return ts[1:], delta / np.diff(ts)
+
+    def increase(self, metric: str, model: str, version: str, since: float) -> float:
+        """Increase of a counter over the scrapes at or after ``since``, ignoring resets."""
+        ts, values = self.series(metric, model, version)
+        values = values[ts >= since]
+        values = values[np.isfinite(values)]
+        if len(values) < 2:
+            return 0.0
+        delta = np.diff(values)
+        return float(delta[delta > 0].sum())
+
+    def mean_latency_ms(self, metric: str, model: str, version: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Average per-request latency between scrapes from a microseconds counter."""
+        ts, latency = self.rate(metric, model, version)
+        _, requests = self.rate(REQUESTS_METRIC, model, version)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = latency / requests / 1000.0
+        mean[~np.isfinite(mean)] = np.nan
+        return ts, mean
+
+
+class MetricsScraper:
+    """Scrapes ``<metrics_address>/metrics`` into a :class:`MetricsStore` on a daemon thread."""
+
+    def __init__(self, address: str, store: Optional[MetricsStore] = None, interval: float = 15.0,
+                 timeout: float = 5.0) -> None:
+        self.address = address
+        self.store = store if store is not None else MetricsStore()
+        self.interval = interval
+        self.client = httpx.Client(timeout=timeout, transport=InstrumentedTransport("metrics"))
+        self.last_scrape: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def scrape(self) -> int:
+        # Stream lines straight into the store instead of buffering the whole body
+        with self.client.stream("GET", self.address + "/metrics") as res:
+            res.raise_for_status()
+            kept = self.store.ingest(res.iter_lines())
+        self.last_scrape = time.time()
+        self.last_error = None
+        return kept
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.scrape()
+            except Exception as e:
+                # Anything escaping here would kill the thread and freeze the charts without a word
+                log.info(f"Warn - metrics scrape of {self.address} failed: {e}")
+                self.last_error = str(e)
+            self._stop.wait(self.interval)
+
+    def start(self) -> "MetricsScraper":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="torchserve-metrics-scraper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,67 @@
+from typing import Any, Callable, Dict, List, Optional
+
+PAGE_SIZE = 100
+
+
+class PagedListing:
+    """Lazily fetched view of a paginated management listing.
+
+    Pages are requested from TorchServe only when :meth:`page` or
+    :meth:`search` first needs them and are kept for the lifetime of the
+    object, so several widgets rendering the same listing share one fetch.
+    """
+
+    def __init__(self,
+                 fetch_page: Callable[[Optional[int], Optional[str]], Optional[Dict[str, Any]]],
+                 key: str,
+                 page_size: int = PAGE_SIZE) -> None:
+        self.fetch_page = fetch_page
+        self.key = key
+        self.page_size = page_size
+        self.pages: List[List[Dict[str, Any]]] = []
+        self.failed = False
+        self._next_token: Optional[str] = None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.failed or (bool(self.pages) and not self._next_token)
+
+    def _fetch_next(self) -> bool:
+        if self.exhausted:
+            return False
+        res = self.fetch_page(self.page_size, self._next_token)
+        if not res or self.key not in res:
+            self.failed = True
+            return False
+        self.pages.append(res[self.key])
+        self._next_token = res.get("nextPageToken")
+        return True
+
+    def page(self, index: int) -> List[Dict[str, Any]]:
+        """Items on page ``index``, fetching the pages before it if needed."""
+        while len(self.pages) <= index and self._fetch_next():
+            pass
+        return self.pages[index] if index < len(self.pages) else []
+
+    @property
+    def known_pages(self) -> int:
+        """Pages fetched so far, plus one if the server said there are more."""
+        return len(self.pages) + (0 if self.exhausted else 1)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Everything fetched so far."""
+        return [item for page in self.pages for item in page]
+
+    def search(self, text: str, field: str, limit: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+        """Up to ``limit`` items whose ``field`` contains ``text``, fetching
+        further pages only until enough matches are found."""
+        text = text.lower()
+        matches: List[Dict[str, Any]] = []
+        index = 0
+        while len(matches) < limit:
+            page = self.page(index)
+            if not page:
+                break
+            matches.extend(item for item in page if text in str(item.get(field, "")).lower())
+            index += 1
+        return matches[:limit]
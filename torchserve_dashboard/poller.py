@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from torchserve_dashboard.api import DESCRIBE_CONCURRENCY, AsyncManagementAPI, LocalTS
+from torchserve_dashboard.cache import TTLCache
+from torchserve_dashboard.instrumentation import POLL_DURATION
+from torchserve_dashboard.pagination import PAGE_SIZE
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class StateSnapshot(NamedTuple):
+    taken_at: float
+    version: str
+    version_error: Union[str, Exception, None]
+    models: Optional[Dict[str, Any]]  # /models response, None if TorchServe is down
+    descriptions: Dict[str, Optional[List[Dict[str, Any]]]]  # default version per model
+    all_descriptions: Dict[str, Optional[List[Dict[str, Any]]]]  # every version per model
+    model_store: List[str]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.taken_at
+
+    @property
+    def model_names(self) -> List[str]:
+        return [m["modelName"] for m in self.models["models"]] if self.models else []
+
+
+class StatePoller:
+    """Refreshes a :class:`StateSnapshot` on a daemon thread.
+
+    Readers only ever touch :attr:`snapshot`, which is replaced atomically,
+    so rendering never waits on TorchServe. ``torchserve --version`` starts
+    a JVM and barely changes, so it runs on its own, much slower, schedule.
+
+    ``async_api`` should not cache: every poll asks TorchServe. If ``cache``
+    is given, the poll's responses are written into it, so reads through a
+    :class:`CachedManagementAPI` sharing it see them without a request.
+    """
+
+    def __init__(self,
+                 async_api: AsyncManagementAPI,
+                 ts: LocalTS,
+                 interval: float = 5.0,
+                 version_interval: float = 300.0,
+                 cache: Optional[TTLCache] = None,
+                 describe_concurrency: Optional[int] = DESCRIBE_CONCURRENCY) -> None:
+        self.async_api = async_api
+        self.ts = ts
+        self.cache = cache
+        self.describe_concurrency = describe_concurrency
+        self.interval = interval
+        self.version_interval = version_interval
+        self.snapshot: Optional[StateSnapshot] = None
+        self.last_error: Optional[str] = None
+        self._version = ("", None)
+        self._version_checked_at = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._updated = threading.Condition()
+        self._generation = 0
+        self._collecting = False
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[StateSnapshot], None]] = []
+
+    def add_listener(self, callback: Callable[[StateSnapshot], None]) -> None:
+        """Call ``callback(snapshot)`` on the poller thread after every successful poll."""
+        self._listeners.append(callback)
+
+    async def _collect(self) -> StateSnapshot:
+        if time.time() - self._version_checked_at > self.version_interval or self._version[1]:
+            self._version = await asyncio.get_event_loop().run_in_executor(None, self.ts.check_version)
+            self._version_checked_at = time.time()
+        # The first page doubles as the liveness check, the rest are only fetched if there are more
+        models = await self.async_api.get_loaded_models(PAGE_SIZE)
+        first_page = models
+        if models and models.get("nextPageToken"):
+            models = {"models": [m async for m in self.async_api.iter_models(PAGE_SIZE)]}
+        names = [m["modelName"] for m in models["models"]] if models else []
+        if models:
+            descriptions, all_descriptions = await asyncio.gather(
+                self.async_api.describe_all(names, concurrency=self.describe_concurrency),
+                self.async_api.describe_all(names, list_all=True, concurrency=self.describe_concurrency),
+            )
+        else:
+            descriptions, all_descriptions = {}, {}
+        try:
+            model_store = sorted(self.ts.get_model_store())
+        except OSError:
+            model_store = []
+        if self.cache is not None:
+            self._fill_cache(first_page, descriptions, all_descriptions)
+        return StateSnapshot(time.time(), self._version[0], self._version[1], models, descriptions,
+                             all_descriptions, model_store)
+
+    def _fill_cache(self, first_page: Optional[Dict[str, Any]], descriptions: Dict[str, Any],
+                    all_descriptions: Dict[str, Any]) -> None:
+        # Same keys CachedManagementAPI looks up; errors and unreachable answers aren't cached
+        if first_page:
+            self.cache.put(("get_loaded_models", (PAGE_SIZE, None)), first_page)
+        for list_all, described in ((False, descriptions), (True, all_descriptions)):
+            for name, description in described.items():
+                if isinstance(description, list):
+                    self.cache.put(("get_model", (name, None, list_all, False)), description)
+
+    def _run(self) -> None:
+        # The async client is bound to this thread's loop for its whole life
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._collecting = True
+            try:
+                with POLL_DURATION.time():
+                    snapshot = loop.run_until_complete(self._collect())
+                self.last_error = None
+            except Exception as e:
+                log.info(f"Warn - state poll failed: {e}")
+                self.last_error = str(e)
+                snapshot = None
+            with self._updated:
+                self._collecting = False
+                if snapshot is not None:
+                    self.snapshot = snapshot
+                    self._generation += 1
+                self._updated.notify_all()
+            if snapshot is not None:
+                for callback in self._listeners:
+                    try:
+                        callback(snapshot)
+                    except Exception as e:
+                        log.info(f"Warn - snapshot listener {callback} failed: {e}")
+            self._wake.wait(self.interval)
+        loop.run_until_complete(self.async_api.aclose())
+        loop.close()
+
+    def start(self) -> "StatePoller":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="torchserve-state-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def refresh(self, wait: float = 0) -> Optional[StateSnapshot]:
+        """Poll now instead of at the next interval, waiting up to ``wait``
+        seconds for the new snapshot."""
+        with self._updated:
+            # A poll already in flight may predate the caller's change, so wait for the one after it
+            generation = self._generation + (1 if self._collecting else 0)
+        self._wake.set()
+        if wait:
+            self.wait_for_update(generation, wait)
+        return self.snapshot
+
+    def wait_for_update(self, generation: int = 0, timeout: Optional[float] = None) -> Optional[StateSnapshot]:
+        """Block until a snapshot newer than ``generation`` exists."""
+        with self._updated:
+            self._updated.wait_for(lambda: self._generation > generation, timeout)
+            return self.snapshot
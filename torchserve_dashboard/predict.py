@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from torchserve_dashboard.benchmark import predictions_url
+from torchserve_dashboard.instrumentation import AsyncInstrumentedTransport
+
+import logging
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+# Smaller files are read in one go, larger ones are streamed from disk while uploading
+STREAM_THRESHOLD = 4 * CHUNK_SIZE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    model TEXT NOT NULL,
+    version TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    body BLOB,
+    created REAL NOT NULL,
+    PRIMARY KEY (model, version, digest)
+);
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+"""
+
+
+class Sample(NamedTuple):
+    name: str
+    size: int
+    path: Optional[str] = None  # on disk, streamed
+    data: Optional[bytes] = None  # already in memory, e.g. a browser upload
+
+
+class PredictionResult(NamedTuple):
+    name: str
+    digest: str
+    status: int  # 0 if the request never got a response
+    content_type: Optional[str]
+    body: bytes
+    latency_ms: float
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+    def text(self, limit: int = 200) -> str:
+        text = self.error or self.body[:limit].decode("utf-8", errors="replace")
+        return text + ("..." if not self.error and len(self.body) > limit else "")
+
+    def as_row(self) -> Dict[str, Any]:
+        return {"sample": self.name, "status": self.status, "latency_ms": round(self.latency_ms, 2),
+                "cached": self.cached, "response": self.text()}
+
+    def as_json(self) -> str:
+        try:
+            response = json.loads(self.body) if self.body else None
+        except ValueError:
+            response = self.body.decode("utf-8", errors="replace")
+        return json.dumps({"sample": self.name, "sha256": self.digest, "status": self.status,
+                           "latency_ms": self.latency_ms, "cached": self.cached, "error": self.error,
+                           "response": response})
+
+
+def default_cache_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".cache", "torchserve_dashboard", "predictions.sqlite")
+
+
+def find_samples(paths: Iterable[str]) -> List[Sample]:
+    """Files in ``paths``, recursing into directories; hidden files are skipped."""
+    samples = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                for name in sorted(files):
+                    if not name.startswith("."):
+                        full = os.path.join(root, name)
+                        samples.append(Sample(os.path.relpath(full, path), os.path.getsize(full), path=full))
+        elif os.path.isfile(path):
+            samples.append(Sample(os.path.basename(path), os.path.getsize(path), path=path))
+    return samples
+
+
+def _hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _digest(sample: Sample) -> str:
+    return hashlib.sha256(sample.data).hexdigest() if sample.data is not None else _hash_file(sample.path)
+
+
+class ResponseCache:
+    """SQLite cache of prediction responses keyed by (model, version, sha256 of the input).
+
+    File digests are remembered by path, size and mtime, so rerunning an
+    unchanged sample folder doesn't even re-read the files. Only 200
+    responses are cached.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            log.info(f"Warn - can't open prediction cache {self.path} ({e}), keeping it in memory")
+            self.path = ":memory:"
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+
+    def digest(self, sample: Sample) -> str:
+        if sample.data is not None:
+            return _digest(sample)
+        path = os.path.abspath(sample.path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, digest FROM digests WHERE path = ?", (path,)).fetchone()
+        if row and row[:2] == (st.st_size, st.st_mtime_ns):
+            return row[2]
+        digest = _hash_file(path)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                             (path, st.st_size, st.st_mtime_ns, digest))
+        return digest
+
+    def get(self, model: str, version: str, digest: str) -> Optional[Tuple[int, Optional[str], bytes]]:
+        with self._lock:
+            return self._db.execute("SELECT status, content_type, body FROM responses "
+                                    "WHERE model = ? AND version = ? AND digest = ?",
+                                    (model, version, digest)).fetchone()
+
+    def put(self, model: str, version: str, digest: str, status: int, content_type: Optional[str],
+            body: bytes) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (model, version, digest, status, content_type, body, time.time()))
+
+    def clear(self, model: Optional[str] = None, version: Optional[str] = None) -> int:
+        query, args = "DELETE FROM responses WHERE 1", []
+        if model:
+            query += " AND model = ?"
+            args.append(model)
+        if version:
+            query += " AND version = ?"
+            args.append(version)
+        with self._lock, self._db:
+            return self._db.execute(query, args).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()
+        return {"responses": count, "bytes": size}
+
+
+async def _file_chunks(path: str) -> AsyncIterator[bytes]:
+    loop = asyncio.get_event_loop()
+    with open(path, "rb") as f:
+        while True:
+            # Reads happen off the loop so a slow disk doesn't stall the other uploads
+            chunk = await loop.run_in_executor(None, f.read, CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def _body(sample: Sample) -> Any:
+    if sample.data is not None:
+        return sample.data
+    if sample.size <= STREAM_THRESHOLD:
+        with open(sample.path, "rb") as f:
+            return f.read()
+    return _file_chunks(sample.path)
+
+
+async def run_predictions(inference_address: str,
+                          model_name: str,
+                          version: str,
+                          samples: List[Sample],
+                          concurrency: int = 8,
+                          cache: Optional[ResponseCache] = None,
+                          reuse: bool = True,
+                          timeout: float = 120.0) -> AsyncIterator[PredictionResult]:
+    """POST every sample to ``/predictions/<model>/<version>``, yielding results as they finish.
+
+    At most ``concurrency`` requests are in flight and at most that many
+    samples are open, however many there are. ``version`` must be the
+    concrete version, not "default", since it is part of the cache key.
+    Samples whose content already has a cached response for this
+    model version are answered from ``cache`` without a request, unless
+    ``reuse`` is off, in which case the cache is only written.
+    """
+    queue: "asyncio.Queue[Sample]" = asyncio.Queue()
+    for s in samples:
+        queue.put_nowait(s)
+    results: "asyncio.Queue[PredictionResult]" = asyncio.Queue()
+    url = predictions_url(inference_address, model_name, version)
+    loop = asyncio.get_event_loop()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    transport = AsyncInstrumentedTransport("inference", httpx.AsyncHTTPTransport(limits=limits))
+
+    async with httpx.AsyncClient(timeout=timeout, transport=transport) as client:
+        async def predict(sample: Sample) -> PredictionResult:
+            try:
+                # Hashing reads the whole file, keep it off the loop too
+                digest = await loop.run_in_executor(None, cache.digest if cache else _digest, sample)
+            except OSError as e:
+                return PredictionResult(sample.name, "", 0, None, b"", 0.0, error=str(e))
+            hit = cache.get(model_name, version, digest) if cache and reuse else None
+            if hit:
+                return PredictionResult(sample.name, digest, hit[0], hit[1], hit[2], 0.0, cached=True)
+            started = time.perf_counter()
+            try:
+                res = await client.post(url, content=await _body(sample),
+                                        headers={"Content-Length": str(sample.size)})
+            except (httpx.HTTPError, OSError) as e:
+                return PredictionResult(sample.name, digest, 0, None, b"", (time.perf_counter() - started) * 1000,
+                                        error=f"{type(e).__name__}: {e}")
+            latency_ms = (time.perf_counter() - started) * 1000
+            content_type = res.headers.get("content-type")
+            if cache and res.status_code == 200:
+                cache.put(model_name, version, digest, res.status_code, content_type, res.content)
+            return PredictionResult(sample.name, digest, res.status_code, content_type, res.content, latency_ms)
+
+        async def worker() -> None:
+            while not queue.empty():
+                await results.put(await predict(queue.get_nowait()))
+
+        workers = asyncio.gather(*[worker() for _ in range(min(concurrency, len(samples)) or 1)])
+        for _ in range(len(samples)):
+            yield await results.get()
+        await workers
+
+
+def compare(baseline: Dict[str, PredictionResult], candidate: Dict[str, PredictionResult]) -> List[Dict[str, Any]]:
+    """Samples whose response differs between two runs over the same set (e.g. two model versions)."""
+    rows = []
+    for name, new in candidate.items():
+        old = baseline.get(name)
+        if old is None or (old.status, old.body) != (new.status, new.body):
+            rows.append({"sample": name, "baseline_status": old.status if old else None, "candidate_status": new.status,
+                         "baseline": old.text() if old else "", "candidate": new.text()})
+    return rows
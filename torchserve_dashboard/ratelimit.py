@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from torchserve_dashboard.history import MUTATIONS
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``burst`` calls at once, refilled at ``rate`` per second."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token. Returns 0 if one was available, otherwise the seconds until there is one."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+def rate_limited_response(retry_after: float) -> Dict[str, Any]:
+    # Shaped like a TorchServe error so callers show it like any other failed call
+    return {"code": 429, "type": "TooManyRequestsException",
+            "message": f"Rate limit reached for this session, retry in {retry_after:.1f}s"}
+
+
+class RateLimitedManagementAPI:
+    """Wraps a management client (sync or async) and lets mutating calls
+    through only while ``bucket`` has tokens.
+
+    Rejected calls never reach TorchServe; they return a 429 error body.
+    With ``wait``, async calls sleep until a token is free instead, which
+    suits long-running jobs (bulk register, tuning, rollouts) sharing the
+    bucket with the same session's button clicks. Reads are not limited,
+    they are served from the shared cache anyway.
+    """
+
+    def __init__(self, api: Any, bucket: TokenBucket, name: Optional[str] = None, wait: bool = False) -> None:
+        self.api = api
+        self.bucket = bucket
+        self.name = name
+        self.wait = wait
+        self.rejected = 0
+
+    def _reject(self, item: str) -> Optional[Dict[str, Any]]:
+        retry_after = self.bucket.try_acquire()
+        if not retry_after:
+            return None
+        self.rejected += 1
+        log.info(f"Warn - {item} from {self.name or 'session'} rate limited, retry in {retry_after:.1f}s")
+        return rate_limited_response(retry_after)
+
+    def __getattr__(self, item: str) -> Any:
+        attr = getattr(self.api, item)
+        if item not in MUTATIONS:
+            return attr
+
+        if asyncio.iscoroutinefunction(attr):
+            async def limited_async(*args: Any, **kwargs: Any) -> Any:
+                if self.wait:
+                    retry_after = self.bucket.try_acquire()
+                    while retry_after:
+                        await asyncio.sleep(retry_after)
+                        retry_after = self.bucket.try_acquire()
+                    return await attr(*args, **kwargs)
+                return self._reject(item) or await attr(*args, **kwargs)
+            return limited_async
+
+        def limited(*args: Any, **kwargs: Any) -> Any:
+            return self._reject(item) or attr(*args, **kwargs)
+        return limited
+
+    async def __aenter__(self) -> "RateLimitedManagementAPI":
+        await self.api.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.api.__aexit__(*exc_info)
@@ -0,0 +1,164 @@
+import asyncio
+import math
+import time
+from typing import AsyncIterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from torchserve_dashboard.api import AsyncManagementAPI
+from torchserve_dashboard.benchmark import run_benchmark
+from torchserve_dashboard.bulk import _is_error, wait_until_ready
+from torchserve_dashboard.metrics import DEFAULT_VERSION_LABEL, LATENCY_METRIC, REQUESTS_METRIC, MetricsStore
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class RolloutPolicy(NamedTuple):
+    steps: Sequence[int] = (1, 2, 4)  # canary worker counts, one observation window each
+    step_duration: float = 120.0
+    max_latency_ratio: float = 1.25  # canary mean latency / baseline mean latency
+    max_error_rate: float = 0.01
+    min_requests: int = 20  # per version and step, below this the step is inconclusive
+    probe_rps: float = 2.0  # synthetic requests/s per version when payloads are given
+    retire_baseline: bool = False  # unregister the old version after promotion
+    ready_timeout: float = 300.0
+
+
+class VersionStats(NamedTuple):
+    requests: int = 0
+    mean_latency_ms: float = math.nan
+    # Errors are only known for our own probe requests
+    probe_requests: int = 0
+    probe_errors: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.probe_errors / self.probe_requests if self.probe_requests else 0.0
+
+    def with_probe(self, probe: "VersionStats") -> "VersionStats":
+        # Probe requests also show up in the scraped counters, so don't add them twice
+        if self.requests:
+            return self._replace(probe_requests=probe.requests, probe_errors=probe.probe_errors)
+        return probe._replace(probe_requests=probe.requests)
+
+
+class RolloutEvent(NamedTuple):
+    phase: str  # register, scale, observe, promote, rollback, done, failed
+    message: str
+    workers: int = 0
+    baseline: Optional[VersionStats] = None
+    canary: Optional[VersionStats] = None
+
+    def as_row(self) -> dict:
+        row = {"time": time.time(), "phase": self.phase, "workers": self.workers, "message": self.message}
+        for name, stats in (("baseline", self.baseline), ("canary", self.canary)):
+            if stats is not None:
+                row[f"{name}_requests"] = stats.requests
+                row[f"{name}_latency_ms"] = round(stats.mean_latency_ms, 2)
+                row[f"{name}_probe_error_rate"] = round(stats.error_rate, 4)
+        return row
+
+
+def metrics_stats(store: MetricsStore, model_name: str, versions: Sequence[str], since: float) -> VersionStats:
+    """Requests and mean latency of ``versions`` since ``since`` from scraped counters.
+
+    The metrics API has no per-model error counter, so errors are always 0 here.
+    """
+    requests = sum(store.increase(REQUESTS_METRIC, model_name, v, since) for v in versions)
+    latency_us = sum(store.increase(LATENCY_METRIC, model_name, v, since) for v in versions)
+    return VersionStats(int(requests), latency_us / requests / 1000.0 if requests else math.nan)
+
+
+def judge(baseline: VersionStats, canary: VersionStats, policy: RolloutPolicy) -> Tuple[Optional[bool], str]:
+    """``True`` to continue, ``False`` to roll back, ``None`` if there's too little traffic to tell."""
+    if canary.requests < policy.min_requests or baseline.requests < policy.min_requests:
+        return None, (f"not enough traffic to compare ({canary.requests} canary / "
+                      f"{baseline.requests} baseline requests, need {policy.min_requests})")
+    if canary.error_rate > policy.max_error_rate:
+        return False, f"canary error rate {canary.error_rate:.2%} > {policy.max_error_rate:.2%}"
+    ratio = canary.mean_latency_ms / baseline.mean_latency_ms if baseline.mean_latency_ms else math.inf
+    if ratio > policy.max_latency_ratio:
+        return False, (f"canary latency {canary.mean_latency_ms:.1f} ms is {ratio:.2f}x baseline "
+                       f"{baseline.mean_latency_ms:.1f} ms (max {policy.max_latency_ratio:g}x)")
+    return True, f"canary latency {ratio:.2f}x baseline, error rate {canary.error_rate:.2%}"
+
+
+async def _probe(inference_address: str, model_name: str, version: str, payloads: List[bytes],
+                 policy: RolloutPolicy) -> VersionStats:
+    result = await run_benchmark(inference_address, model_name, payloads, version, concurrency=4,
+                                 rps=policy.probe_rps, duration=policy.step_duration)
+    return VersionStats(result.requests, result.histogram.mean(), probe_errors=result.failures)
+
+
+async def rollout(api: AsyncManagementAPI,
+                  store: MetricsStore,
+                  inference_address: str,
+                  model_name: str,
+                  mar_url: str,
+                  new_version: str,
+                  baseline_version: str,
+                  policy: RolloutPolicy = RolloutPolicy(),
+                  payloads: Optional[List[bytes]] = None,
+                  **register_kwargs) -> AsyncIterator[RolloutEvent]:
+    """Register ``mar_url`` as ``new_version`` next to ``baseline_version`` and canary it.
+
+    The canary is scaled through ``policy.steps``. After each step, live
+    traffic over ``policy.step_duration`` seconds is compared using the
+    metrics API counters in ``store``. With ``payloads``, both versions also
+    get a steady probe load, which is the only source of error rates and
+    guarantees the canary sees traffic even while it isn't the default.
+    Any failed or inconclusive step rolls back by unregistering the canary;
+    if every step passes, the canary becomes the default version.
+    """
+    first = policy.steps[0]
+    res = await api.register_model(mar_url, model_name, initial_workers=first, **register_kwargs)
+    if _is_error(res):
+        yield RolloutEvent("failed", f"register failed: {res.get('message', res)}")
+        return
+    yield RolloutEvent("register", res.get("status", "registered") if isinstance(res, dict) else str(res), first)
+
+    async def roll_back(reason: str) -> RolloutEvent:
+        res = await api.delete_model(model_name, new_version)
+        outcome = "unregistered" if not _is_error(res) else f"unregister failed: {res.get('message', res)}"
+        return RolloutEvent("rollback", f"{reason}; canary {new_version} {outcome}")
+
+    baseline_labels = [baseline_version, DEFAULT_VERSION_LABEL]
+    for workers in policy.steps:
+        if workers != first:
+            res = await api.change_model_workers(model_name, new_version, min_worker=workers, max_worker=workers)
+            if _is_error(res):
+                yield await roll_back(f"scaling to {workers} workers failed: {res.get('message', res)}")
+                return
+        ok, message = await wait_until_ready(api, model_name, new_version, workers, policy.ready_timeout)
+        if not ok:
+            yield await roll_back(f"canary not ready at {workers} workers: {message}")
+            return
+        yield RolloutEvent("scale", message, workers)
+
+        since = time.time()
+        if payloads:
+            baseline_probe, canary_probe = await asyncio.gather(
+                _probe(inference_address, model_name, baseline_version, payloads, policy),
+                _probe(inference_address, model_name, new_version, payloads, policy))
+        else:
+            await asyncio.sleep(policy.step_duration)
+        baseline = metrics_stats(store, model_name, baseline_labels, since)
+        canary = metrics_stats(store, model_name, [new_version], since)
+        if payloads:
+            baseline, canary = baseline.with_probe(baseline_probe), canary.with_probe(canary_probe)
+        verdict, message = judge(baseline, canary, policy)
+        yield RolloutEvent("observe", message, workers, baseline, canary)
+        if not verdict:
+            yield await roll_back(message)
+            return
+
+    res = await api.change_model_default(model_name, new_version)
+    if _is_error(res):
+        yield await roll_back(f"set-default failed: {res.get('message', res)}")
+        return
+    yield RolloutEvent("promote", f"{new_version} is now the default version of {model_name}", policy.steps[-1])
+    if policy.retire_baseline:
+        res = await api.delete_model(model_name, baseline_version)
+        if _is_error(res):
+            log.info(f"Warn - could not retire {model_name} {baseline_version}: {res}")
+    yield RolloutEvent("done", f"rolled out {model_name} {baseline_version} -> {new_version}", policy.steps[-1])
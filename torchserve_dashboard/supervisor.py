@@ -0,0 +1,201 @@
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+import httpx
+
+from torchserve_dashboard.api import LocalTS, port_in_use
+from torchserve_dashboard.instrumentation import InstrumentedTransport
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# ``torchserve --start`` forks the frontend JVM and exits; the JVM's pid ends up here
+PID_FILE = os.path.join(tempfile.gettempdir(), ".model_server.pid")
+
+STOPPED, STARTING, READY, CRASHED, FAILED = "stopped", "starting", "ready", "crashed", "failed"
+
+
+def read_pid(pid_file: str = PID_FILE) -> Optional[int]:
+    try:
+        with open(pid_file) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, just not ours to signal
+        return True
+    return True
+
+
+def probe(client: httpx.Client, inference_address: str, management_address: str) -> Optional[str]:
+    """``None`` if TorchServe is serving, otherwise what isn't ready yet."""
+    try:
+        res = client.get(inference_address + "/ping")
+        if res.status_code != 200 or res.json().get("status") != "Healthy":
+            return f"/ping: {res.status_code} {res.text.strip()}"
+        res = client.get(management_address + "/models")
+        if res.status_code != 200:
+            return f"/models: {res.status_code}"
+    except (httpx.HTTPError, ValueError) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def wait_until_serving(inference_address: str,
+                       management_address: str,
+                       timeout: float = 120.0,
+                       initial_delay: float = 0.1,
+                       max_delay: float = 2.0,
+                       pid: Optional[int] = None) -> Tuple[bool, str]:
+    """Poll ``/ping`` and ``/models`` with exponential backoff until both answer.
+
+    Gives up early if ``pid`` exits, since then nothing will ever answer.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    with httpx.Client(timeout=max(1.0, max_delay), transport=InstrumentedTransport("supervisor")) as client:
+        while True:
+            problem = probe(client, inference_address, management_address)
+            if problem is None:
+                return True, "ready"
+            if pid is not None and not pid_alive(pid):
+                return False, f"TorchServe (PID {pid}) exited before becoming ready"
+            if time.monotonic() + delay > deadline:
+                return False, f"Not ready after {timeout:.0f}s ({problem})"
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+
+class TorchServeSupervisor:
+    """Starts a local TorchServe and keeps an eye on it.
+
+    :meth:`start` launches ``torchserve --start`` and blocks (or, with
+    ``wait=False``, returns immediately) until the inference and management
+    APIs answer, recording the cold-start time. If TorchServe is already
+    running it attaches to it instead. The lock only covers the launch, not
+    the readiness wait, so a slow start doesn't hold up :meth:`stop` or the
+    watchdog. A watchdog thread then
+    checks the frontend PID every ``check_interval`` seconds and starts the
+    server again if it dies, at most ``max_restarts`` times.
+    """
+
+    def __init__(self,
+                 ts: LocalTS,
+                 inference_address: str,
+                 management_address: str,
+                 ready_timeout: float = 120.0,
+                 max_restarts: int = 3,
+                 check_interval: float = 5.0,
+                 pid_file: str = PID_FILE) -> None:
+        self.ts = ts
+        self.inference_address = inference_address
+        self.management_address = management_address
+        self.ready_timeout = ready_timeout
+        self.max_restarts = max_restarts
+        self.check_interval = check_interval
+        self.pid_file = pid_file
+        self.state = STOPPED
+        self.pid: Optional[int] = None
+        self.cold_start: Optional[float] = None
+        self.restarts = 0
+        self.message = ""
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def _launch(self) -> Tuple[bool, str]:
+        with self._lock:
+            if self._stopping.is_set():
+                return False, "Torchserve was stopped"
+            self.state = STARTING
+            started = time.monotonic()
+            out = self.ts.start_torchserve()
+            self.pid = pid = read_pid(self.pid_file)
+        ok, message = wait_until_serving(self.inference_address, self.management_address,
+                                         self.ready_timeout, pid=pid)
+        with self._lock:
+            if self._stopping.is_set():
+                # stop() ran during the wait, its state stands
+                return False, "Torchserve was stopped while starting"
+            if ok:
+                self.cold_start = time.monotonic() - started
+                self.state = READY
+                self.message = f"Torchserve ready in {self.cold_start:.1f}s (PID: {pid})"
+            else:
+                self.state = FAILED
+                self.message = f"{out}: {message}"
+        log.info(self.message)
+        return ok, self.message
+
+    def start(self, wait: bool = True) -> str:
+        with self._lock:
+            if self.state == STARTING:
+                return "Torchserve is already starting"
+            listening = [a for a in (self.inference_address, self.management_address) if port_in_use(a)]
+            if listening:
+                # Nothing to start, and no cold start to record
+                if self.attach():
+                    return f"Torchserve is already running (PID: {self.pid})"
+                return f"Something is already listening on {', '.join(listening)}, not starting Torchserve"
+            self._stopping.clear()
+            self.restarts = 0
+            self.state = STARTING
+        if not wait:
+            threading.Thread(target=self._start_and_watch, daemon=True).start()
+            return "Torchserve is starting"
+        self._start_and_watch()
+        return self.message
+
+    def _start_and_watch(self) -> None:
+        ok, _ = self._launch()
+        if ok and (self._watchdog is None or not self._watchdog.is_alive()):
+            self._watchdog = threading.Thread(target=self._watch, daemon=True)
+            self._watchdog.start()
+
+    def attach(self) -> bool:
+        """Supervise a TorchServe that was started outside the dashboard."""
+        pid = read_pid(self.pid_file)
+        if pid is None or not pid_alive(pid):
+            return False
+        self.pid, self.state, self.message = pid, READY, f"Attached to Torchserve (PID: {pid})"
+        self._stopping.clear()
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch, daemon=True)
+            self._watchdog.start()
+        return True
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.check_interval):
+            if self.state != READY or self.pid is None or pid_alive(self.pid):
+                continue
+            self.state = CRASHED
+            if self.restarts >= self.max_restarts:
+                self.state = FAILED
+                self.message = f"Torchserve (PID {self.pid}) died, giving up after {self.restarts} restarts"
+                log.info(f"Warn - {self.message}")
+                return
+            self.restarts += 1
+            log.info(f"Warn - Torchserve (PID {self.pid}) died, restart {self.restarts}/{self.max_restarts}")
+            # Back off a little more each time in case it dies on startup
+            if self._stopping.wait(min(2 ** self.restarts, 30)):
+                return
+            self._launch()
+
+    def stop(self, timeout: float = 30.0) -> str:
+        self._stopping.set()
+        with self._lock:
+            res = self.ts.stop_torchserve(wait_for=[self.inference_address, self.management_address],
+                                          timeout=timeout)
+            self.state, self.pid = STOPPED, None
+        return str(res)
@@ -0,0 +1,167 @@
+import itertools
+import math
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence
+
+from torchserve_dashboard.api import AsyncManagementAPI
+from torchserve_dashboard.benchmark import BenchmarkResult, run_benchmark
+from torchserve_dashboard.bulk import _is_error, wait_until_ready
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class TuningPoint(NamedTuple):
+    batch_size: int
+    max_batch_delay: int
+    workers: int
+
+
+class TuningResult(NamedTuple):
+    point: TuningPoint
+    throughput: float = 0.0
+    p50_ms: float = math.nan
+    p99_ms: float = math.nan
+    failures: int = 0
+    error: Optional[str] = None
+
+    def meets(self, p99_slo_ms: Optional[float]) -> bool:
+        return self.error is None and self.failures == 0 and (p99_slo_ms is None or self.p99_ms <= p99_slo_ms)
+
+    def as_row(self) -> Dict[str, object]:
+        return {**self.point._asdict(), "throughput_rps": round(self.throughput, 2), "p50_ms": self.p50_ms,
+                "p99_ms": self.p99_ms, "failures": self.failures, "error": self.error}
+
+
+def grid(batch_sizes: Sequence[int], max_batch_delays: Sequence[int], workers: Sequence[int]) -> List[TuningPoint]:
+    return [TuningPoint(*p) for p in itertools.product(sorted(batch_sizes), sorted(max_batch_delays), sorted(workers))]
+
+
+def pareto_front(results: List[TuningResult]) -> List[TuningResult]:
+    """Results no other result beats on both throughput and p99 latency."""
+    # Failing configurations answer fast; they mustn't show up as a trade-off
+    ok = [r for r in results if r.meets(None) and not math.isnan(r.p99_ms)]
+    front = [
+        r for r in ok
+        if not any(o.throughput >= r.throughput and o.p99_ms <= r.p99_ms
+                   and (o.throughput > r.throughput or o.p99_ms < r.p99_ms) for o in ok)
+    ]
+    return sorted(front, key=lambda r: r.p99_ms)
+
+
+def best(results: List[TuningResult], p99_slo_ms: Optional[float] = None) -> Optional[TuningResult]:
+    """Highest throughput among results meeting the p99 SLO."""
+    candidates = [r for r in results if r.meets(p99_slo_ms)]
+    return max(candidates, key=lambda r: r.throughput) if candidates else None
+
+
+async def apply_point(api: AsyncManagementAPI,
+                      model_name: str,
+                      version: Optional[str],
+                      mar_url: str,
+                      point: TuningPoint,
+                      current: Optional[TuningPoint],
+                      ready_timeout: float = 300.0) -> None:
+    """Move the model to ``point``.
+
+    batch_size and max_batch_delay are fixed at registration, so changing
+    them means unregistering and registering again; a worker count change
+    alone is a scale call.
+    """
+    if current is None or current[:2] != point[:2]:
+        res = await api.delete_model(model_name, version)
+        # 404 is fine, the model isn't registered yet on the first point
+        if _is_error(res) and res.get("code") != 404:
+            raise RuntimeError(f"unregister failed: {res.get('message', res)}")
+        res = await api.register_model(mar_url, model_name, batch_size=point.batch_size,
+                                       max_batch_delay=point.max_batch_delay, initial_workers=point.workers)
+    else:
+        res = await api.change_model_workers(model_name, version, min_worker=point.workers,
+                                             max_worker=point.workers)
+    if _is_error(res):
+        raise RuntimeError(res.get("message", str(res)))
+    ok, message = await wait_until_ready(api, model_name, version, point.workers, ready_timeout)
+    if not ok:
+        raise RuntimeError(message)
+
+
+def _neighbours(point: TuningPoint, axes: Dict[str, List[int]]) -> List[TuningPoint]:
+    out = []
+    for field in TuningPoint._fields:
+        values = axes[field]
+        i = values.index(getattr(point, field))
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(values):
+                out.append(point._replace(**{field: values[j]}))
+    return out
+
+
+async def tune(api: AsyncManagementAPI,
+               inference_address: str,
+               model_name: str,
+               version: Optional[str],
+               mar_url: str,
+               payloads: List[bytes],
+               batch_sizes: Sequence[int],
+               max_batch_delays: Sequence[int],
+               workers: Sequence[int],
+               strategy: str = "grid",
+               p99_slo_ms: Optional[float] = None,
+               max_trials: Optional[int] = None,
+               concurrency: int = 16,
+               duration: float = 20.0) -> AsyncIterator[TuningResult]:
+    """Benchmark ``model_name`` under each configuration and yield results as they finish.
+
+    ``grid`` tries every combination. ``guided`` starts in the middle of the
+    grid and hill-climbs: it evaluates the neighbours of the best point on
+    each axis and moves while throughput (within the p99 SLO) improves, which
+    needs far fewer re-registrations than a full grid.
+    """
+    axes = {"batch_size": sorted(set(batch_sizes)), "max_batch_delay": sorted(set(max_batch_delays)),
+            "workers": sorted(set(workers))}
+    evaluated: Dict[TuningPoint, TuningResult] = {}
+    current: Optional[TuningPoint] = None
+
+    async def evaluate(point: TuningPoint) -> TuningResult:
+        nonlocal current
+        try:
+            await apply_point(api, model_name, version, mar_url, point, current)
+            current = point
+            bench: BenchmarkResult = await run_benchmark(inference_address, model_name, payloads, version,
+                                                         concurrency=concurrency, duration=duration)
+            result = TuningResult(point, bench.throughput, bench.histogram.percentile(50),
+                                  bench.histogram.percentile(99), bench.failures)
+        except Exception as e:
+            log.info(f"Warn - tuning {model_name} at {point} failed: {e}")
+            # Unknown state after a failed registration, force a re-register next time
+            current = None
+            result = TuningResult(point, error=str(e))
+        evaluated[point] = result
+        return result
+
+    def budget_left() -> bool:
+        return max_trials is None or len(evaluated) < max_trials
+
+    if strategy == "grid":
+        for point in grid(axes["batch_size"], axes["max_batch_delay"], axes["workers"]):
+            if not budget_left():
+                return
+            yield await evaluate(point)
+        return
+
+    def score(r: TuningResult) -> float:
+        return r.throughput if r.meets(p99_slo_ms) else -1.0
+
+    position = TuningPoint(*(values[len(values) // 2] for values in axes.values()))
+    yield await evaluate(position)
+    while budget_left():
+        improved = False
+        for neighbour in _neighbours(position, axes):
+            if neighbour in evaluated or not budget_left():
+                continue
+            result = await evaluate(neighbour)
+            yield result
+            if score(result) > score(evaluated[position]):
+                position, improved = neighbour, True
+        if not improved:
+            return